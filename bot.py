@@ -12,12 +12,21 @@ from fastapi import FastAPI, Request, status, HTTPException
 from db import create_db_and_tables
 import uvicorn
 from fastapi.responses import JSONResponse
+from middleware.database import CommitBeforeRequestMiddleware
 from services.notification import NotificationService
+from services.dailyStatistics import DailyStatisticsService
+from services.reservation import ReservationService
+from services.stockSummary import StockSummaryService
 from enums.bot_entity import BotEntity
+from utils.catalog_cache import CatalogCache
 from utils.localizator import Localizator
+from utils.user_cache import UserCache
 
 redis = Redis(host=config.REDIS_HOST, password=config.REDIS_PASSWORD)
+UserCache.init(redis)
+CatalogCache.init(redis)
 bot = Bot(config.TOKEN, default=DefaultBotProperties(parse_mode=ParseMode.HTML))
+bot.session.middleware(CommitBeforeRequestMiddleware())
 dp = Dispatcher(storage=RedisStorage(redis))
 app = FastAPI()
 
@@ -40,6 +49,9 @@ async def webhook(request: Request):
 @app.on_event("startup")
 async def on_startup():
     await create_db_and_tables()
+    await StockSummaryService.check_and_rebuild()
+    await DailyStatisticsService.check_and_rebuild()
+    ReservationService.start_sweeper()
     await bot.set_webhook(
         url=config.WEBHOOK_URL,
         secret_token=config.WEBHOOK_SECRET_TOKEN
@@ -54,6 +66,7 @@ async def on_startup():
 @app.on_event("shutdown")
 async def on_shutdown():
     logging.warning('Shutting down..')
+    ReservationService.stop_sweeper()
     await bot.delete_webhook()
     await dp.storage.close()
     logging.warning('Bye!')
@@ -27,7 +27,7 @@ class AllCategoriesCallback(BaseCallback, prefix="all_categories"):
     price: float
     quantity: int
     confirmation: bool
-    page: int
+    page: str
 
     @staticmethod
     def create(level: int,
@@ -36,7 +36,7 @@ class AllCategoriesCallback(BaseCallback, prefix="all_categories"):
                price: float = 0.0,
                quantity: int = 0,
                confirmation: bool = False,
-               page: int = 0) -> 'AllCategoriesCallback':
+               page: str = "") -> 'AllCategoriesCallback':
         return AllCategoriesCallback(level=level, category_id=category_id, subcategory_id=subcategory_id, price=price,
                                      quantity=quantity, confirmation=confirmation, page=page)
 
@@ -44,21 +44,21 @@ class AllCategoriesCallback(BaseCallback, prefix="all_categories"):
 class MyProfileCallback(BaseCallback, prefix="my_profile"):
     action: str
     args_for_action: int | str
-    page: int
+    page: str
 
     @staticmethod
-    def create(level: int, action: str = "", args_for_action="", page=0) -> 'MyProfileCallback':
+    def create(level: int, action: str = "", args_for_action="", page="") -> 'MyProfileCallback':
         return MyProfileCallback(level=level, action=action, args_for_action=args_for_action, page=page)
 
 
 class CartCallback(BaseCallback, prefix="cart"):
-    page: int
+    page: str
     cart_id: int
     cart_item_id: int
     confirmation: bool
 
     @staticmethod
-    def create(level: int = 0, page: int = 0, cart_id: int = -1, cart_item_id: int = -1,
+    def create(level: int = 0, page: str = "", cart_id: int = -1, cart_item_id: int = -1,
                confirmation=False):
         return CartCallback(level=level, page=page, cart_id=cart_id, cart_item_id=cart_item_id,
                             confirmation=confirmation)
@@ -67,10 +67,10 @@ class CartCallback(BaseCallback, prefix="cart"):
 class AdminMenuCallback(BaseCallback, prefix="admin_menu"):
     action: str
     args_to_action: str | int
-    page: int
+    page: str
 
     @staticmethod
-    def create(level: int, action: str = "", args_to_action: str = "", page: int = 0):
+    def create(level: int, action: str = "", args_to_action: str = "", page: str = ""):
         return AdminMenuCallback(level=level, action=action, args_to_action=args_to_action, page=page)
 
 
@@ -103,12 +103,12 @@ class AdminInventoryManagementCallback(BaseCallback, prefix="inventory_managemen
     add_type: AddType | None
     entity_type: EntityType | None
     entity_id: int | None
-    page: int
+    page: str
     confirmation: bool
 
     @staticmethod
     def create(level: int, add_type: AddType | None = None, entity_type: EntityType | None = None,
-               entity_id: int | None = None, page: int = 0, confirmation: bool = False):
+               entity_id: int | None = None, page: str = "", confirmation: bool = False):
         return AdminInventoryManagementCallback(level=level,
                                                 add_type=add_type,
                                                 entity_type=entity_type,
@@ -125,12 +125,12 @@ class UserManagementOperation(IntEnum):
 
 class UserManagementCallback(BaseCallback, prefix="user_management"):
     operation: UserManagementOperation | None
-    page: int
+    page: str
     confirmation: bool
     buy_id: int | None
 
     @staticmethod
-    def create(level: int, operation: UserManagementOperation | None = None, page: int = 0, confirmation: bool = False,
+    def create(level: int, operation: UserManagementOperation | None = None, page: str = "", confirmation: bool = False,
                buy_id: int | None = None):
         return UserManagementCallback(level=level, operation=operation, page=page, confirmation=confirmation,
                                       buy_id=buy_id)
@@ -151,11 +151,11 @@ class StatisticsTimeDelta(IntEnum):
 class StatisticsCallback(BaseCallback, prefix="statistics"):
     statistics_entity: StatisticsEntity | None
     timedelta: StatisticsTimeDelta | None
-    page: int
+    page: str
 
     @staticmethod
     def create(level: int, statistics_entity: StatisticsEntity | None = None,
-               timedelta: StatisticsTimeDelta | None = None, page: int = 0):
+               timedelta: StatisticsTimeDelta | None = None, page: str = ""):
         return StatisticsCallback(level=level, statistics_entity=statistics_entity, timedelta=timedelta, page=page)
 
 
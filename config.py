@@ -24,6 +24,16 @@ SUPPORT_LINK = os.environ.get("SUPPORT_LINK")
 DB_ENCRYPTION = os.environ.get("DB_ENCRYPTION", False) == 'true'
 DB_NAME = os.environ.get("DB_NAME")
 DB_PASS = os.environ.get("DB_PASS")
+DB_ECHO = os.environ.get("DB_ECHO", False) == 'true'
+DB_WAL = os.environ.get("DB_WAL", 'true') == 'true'
+DB_READ_POOL_SIZE = int(os.environ.get("DB_READ_POOL_SIZE", 5))
+DB_CACHE_SIZE_KB = int(os.environ.get("DB_CACHE_SIZE_KB", 16384))
+DB_MMAP_SIZE = int(os.environ.get("DB_MMAP_SIZE", 268435456))
+DB_QUERY_STATISTICS = os.environ.get("DB_QUERY_STATISTICS", 'true') == 'true'
+DB_SLOW_QUERY_THRESHOLD_MS = float(os.environ.get("DB_SLOW_QUERY_THRESHOLD_MS", 100))
+DB_SLOW_QUERY_SAMPLE_RATE = float(os.environ.get("DB_SLOW_QUERY_SAMPLE_RATE", 1.0))
+RESERVATION_TTL_MINUTES = int(os.environ.get("RESERVATION_TTL_MINUTES", 15))
+RESERVATION_SWEEP_INTERVAL_SECONDS = int(os.environ.get("RESERVATION_SWEEP_INTERVAL_SECONDS", 60))
 PAGE_ENTRIES = int(os.environ.get("PAGE_ENTRIES"))
 BOT_LANGUAGE = os.environ.get("BOT_LANGUAGE")
 MULTIBOT = os.environ.get("MULTIBOT", False) == 'true'
@@ -32,3 +42,5 @@ CURRENCY = Currency(os.environ.get("CURRENCY"))
 WEBHOOK_SECRET_TOKEN = os.environ.get("WEBHOOK_SECRET_TOKEN")
 REDIS_HOST = os.environ.get("REDIS_HOST")
 REDIS_PASSWORD = os.environ.get("REDIS_PASSWORD")
+USER_CACHE_TTL_SECONDS = int(os.environ.get("USER_CACHE_TTL_SECONDS", 30))
+CATALOG_CACHE_TTL_SECONDS = int(os.environ.get("CATALOG_CACHE_TTL_SECONDS", 3600))
@@ -1,7 +1,6 @@
 from datetime import datetime, timedelta
 import aiohttp
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import Session
 
 import config
 from enums.cryptocurrency import Cryptocurrency
@@ -22,7 +21,7 @@ class CryptoApiManager:
                     return data
 
     @staticmethod
-    async def get_new_btc_deposits(user_dto: UserDTO, deposits: list[DepositDTO], session: AsyncSession | Session) -> float:
+    async def get_new_btc_deposits(user_dto: UserDTO, deposits: list[DepositDTO], session: AsyncSession) -> float:
         url = f'https://mempool.space/api/address/{user_dto.btc_address}/utxo'
         data = await CryptoApiManager.fetch_api_request(url)
         deposits = [deposit.tx_id for deposit in deposits if deposit.network == "BTC"]
@@ -41,7 +40,7 @@ class CryptoApiManager:
         return deposit_sum
 
     @staticmethod
-    async def get_new_ltc_deposits(user_dto: UserDTO, deposits: list[DepositDTO], session: AsyncSession | Session) -> float:
+    async def get_new_ltc_deposits(user_dto: UserDTO, deposits: list[DepositDTO], session: AsyncSession) -> float:
         url = f"https://api.blockcypher.com/v1/ltc/main/addrs/{user_dto.ltc_address}"
         params = {"unspentOnly": "true"}
         data = await CryptoApiManager.fetch_api_request(url, params=params)
@@ -62,7 +61,7 @@ class CryptoApiManager:
         return deposits_sum
 
     @staticmethod
-    async def get_sol_balance(user_dto: UserDTO, deposits: list[DepositDTO], session: AsyncSession | Session) -> float:
+    async def get_sol_balance(user_dto: UserDTO, deposits: list[DepositDTO], session: AsyncSession) -> float:
         url = f"https://api.solana.fm/v0/accounts/{user_dto.sol_address}/transfers"
         data = await CryptoApiManager.fetch_api_request(url)
         deposits = [deposit.tx_id for deposit in deposits if deposit.network == "SOL"]
@@ -86,7 +85,7 @@ class CryptoApiManager:
         return deposits_sum
 
     @staticmethod
-    async def get_usdt_trc20_balance(user_dto: UserDTO, deposits: list[DepositDTO], session: AsyncSession | Session) -> float:
+    async def get_usdt_trc20_balance(user_dto: UserDTO, deposits: list[DepositDTO], session: AsyncSession) -> float:
         url = f"https://api.trongrid.io/v1/accounts/{user_dto.trx_address}/transactions/trc20"
         params = {"only_confirmed": "true",
                   "min_timestamp": CryptoApiManager.min_timestamp,
@@ -110,7 +109,7 @@ class CryptoApiManager:
         return deposits_sum
 
     @staticmethod
-    async def get_usdt_erc20_balance(user_dto: UserDTO, deposits: list[DepositDTO], session: AsyncSession | Session) -> float:
+    async def get_usdt_erc20_balance(user_dto: UserDTO, deposits: list[DepositDTO], session: AsyncSession) -> float:
         # TODO(Combine the function to obtain erc20 tokens.)
         url = f'https://api.ethplorer.io/getAddressHistory/{user_dto.eth_address}'
         params = {
@@ -137,7 +136,7 @@ class CryptoApiManager:
         return deposits_sum
 
     @staticmethod
-    async def get_usdc_erc20_balance(user_dto: UserDTO, deposits: list[DepositDTO], session: AsyncSession | Session):
+    async def get_usdc_erc20_balance(user_dto: UserDTO, deposits: list[DepositDTO], session: AsyncSession):
         # TODO(Combine the function to obtain erc20 tokens.)
         url = f'https://api.ethplorer.io/getAddressHistory/{user_dto.eth_address}'
         params = {
@@ -179,7 +178,7 @@ class CryptoApiManager:
 
     @staticmethod
     async def get_new_deposits_amount(user_dto: UserDTO, cryptocurrency: Cryptocurrency,
-                                      session: AsyncSession | Session):
+                                      session: AsyncSession):
         deposits = await DepositService.get_by_user_dto(user_dto, session)
         match cryptocurrency:
             case Cryptocurrency.BTC:
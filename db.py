@@ -1,14 +1,17 @@
 from contextlib import asynccontextmanager
+from functools import partial
 from pathlib import Path
-from typing import Any
+from typing import Any, Awaitable, Callable
 
-from sqlalchemy import event, Engine, text, create_engine, Result, CursorResult
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
-from sqlalchemy.orm import sessionmaker, Session
+import aiosqlite
+from sqlalchemy import event, Engine, Result, CursorResult, AsyncAdaptedQueuePool, Executable, TextClause
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession, AsyncEngine
+from sqlalchemy.orm import Session
 
 import config
 from config import DB_NAME
-from models.base import Base
+from migrations import run_migrations
+from utils.sql_statistics import SQLStatistics
 
 if config.DB_ENCRYPTION:
     # Installing sqlcipher3 on windows has some difficulties,
@@ -27,18 +30,92 @@ from models.buyItem import BuyItem
 from models.category import Category
 from models.subcategory import Subcategory
 from models.deposit import Deposit
+from models.stockSummary import StockSummary
+from models.dailyStatistics import DailySales, DailyDeposits, DailyUsers
+
+
+async def create_sqlcipher_connection(read_only: bool = False) -> aiosqlite.Connection:
+    """
+    SQLCipher connections are wrapped into aiosqlite, so every connection gets its own worker thread
+    and blocking SQLCipher calls never run on the event loop.
+    """
+    mode = "ro" if read_only else "rwc"
+    connection = aiosqlite.Connection(
+        lambda: sqlcipher.connect(f"file:data/{DB_NAME}?mode={mode}", uri=True, check_same_thread=False),
+        iter_chunk_size=64)
+    await connection
+    # The key must be set before any other statement is executed on the connection.
+    await connection.execute('PRAGMA key="%s"' % config.DB_PASS)
+    return connection
+
+
+def create_db_engine(read_only: bool = False, **pool_options) -> AsyncEngine:
+    # Connections are pooled instead of aiosqlite's default NullPool, which opens a new connection
+    # and thread per session (and, with SQLCipher, runs the key derivation every time).
+    if config.DB_ENCRYPTION:
+        return create_async_engine(f"sqlite+aiosqlite:///data/{DB_NAME}", echo=config.DB_ECHO,
+                                   async_creator=partial(create_sqlcipher_connection, read_only),
+                                   poolclass=AsyncAdaptedQueuePool, **pool_options)
+    else:
+        mode = "ro" if read_only else "rwc"
+        return create_async_engine(f"sqlite+aiosqlite:///file:data/{DB_NAME}?mode={mode}&uri=true",
+                                   echo=config.DB_ECHO, poolclass=AsyncAdaptedQueuePool, **pool_options)
 
-url = ""
-engine = None
-session_maker = None
-if config.DB_ENCRYPTION:
-    url += f"sqlite+pysqlcipher://:{config.DB_PASS}@/data/{DB_NAME}"
-    engine = create_engine(url, echo=True, module=sqlcipher)
-    session_maker = sessionmaker(engine, expire_on_commit=False)
+
+if config.DB_WAL:
+    # A single writer connection serializes all writes, reads use a pool of read-only connections
+    # that are never blocked by the writer in WAL mode.
+    engine = create_db_engine(pool_size=1, max_overflow=0)
+    read_engine = create_db_engine(read_only=True, pool_size=config.DB_READ_POOL_SIZE)
 else:
-    url += f"sqlite+aiosqlite:///data/{DB_NAME}"
-    engine = create_async_engine(url, echo=True)
-    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    engine = create_db_engine()
+    read_engine = engine
+
+
+class RoutingSession(Session):
+    """
+    Sends reads to read_engine, flushes and INSERT/UPDATE/DELETE statements to the writer engine.
+    Raw SQL goes to the writer unless it is a SELECT, any statement can be sent there
+    with .execution_options(writer=True).
+    After the first write the session stays on the writer until the transaction ends,
+    so it always reads its own uncommitted changes.
+    """
+    uses_writer = False
+    # Set once the session checked out a connection, a session that was never used costs no connection at all.
+    used_connection = False
+
+    @staticmethod
+    def __is_write(clause) -> bool:
+        if getattr(clause, "is_dml", False):
+            return True
+        if isinstance(clause, Executable) and clause.get_execution_options().get("writer", False):
+            return True
+        # A TextClause has no statement type, only a plain SELECT is known to be safe on a read-only connection.
+        return isinstance(clause, TextClause) and not clause.text.lstrip().upper().startswith("SELECT")
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.uses_writer or self._flushing or RoutingSession.__is_write(clause):
+            self.uses_writer = True
+            return engine.sync_engine
+        return read_engine.sync_engine
+
+
+@event.listens_for(RoutingSession, "after_begin")
+def mark_connection_used(session: RoutingSession, transaction, connection):
+    session.used_connection = True
+
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def release_writer(session: RoutingSession, transaction):
+    if transaction.parent is None:
+        session.uses_writer = False
+
+
+session_maker = async_sessionmaker(engine, sync_session_class=RoutingSession, expire_on_commit=False)
+if config.DB_QUERY_STATISTICS:
+    SQLStatistics.register(engine.sync_engine)
+    if read_engine is not engine:
+        SQLStatistics.register(read_engine.sync_engine)
 
 data_folder = Path("data")
 if data_folder.exists() is False:
@@ -46,79 +123,76 @@ if data_folder.exists() is False:
 
 
 @asynccontextmanager
-async def get_db_session() -> AsyncSession | Session:
-    session = None
-    try:
-        if config.DB_ENCRYPTION:
-            with session_maker() as sync_session:
-                session = sync_session
-                yield session
-        else:
-            async with session_maker() as async_session:
-                session = async_session
-                yield session
-    finally:
-        if isinstance(session, AsyncSession):
-            await session.close()
-        elif isinstance(session, Session):
-            session.close()
-
-
-async def session_execute(stmt, session: AsyncSession | Session) -> Result[Any] | CursorResult[Any]:
-    if isinstance(session, AsyncSession):
-        query_result = await session.execute(stmt)
-        return query_result
-    else:
-        query_result = session.execute(stmt)
-        return query_result
+async def get_db_session() -> AsyncSession:
+    async with session_maker() as session:
+        yield session
 
 
-async def session_flush(session: AsyncSession | Session) -> None:
-    if isinstance(session, AsyncSession):
-        await session.flush()
-    else:
-        session.flush()
+async def session_execute(stmt, session: AsyncSession,
+                          params: list[dict] | dict | None = None) -> Result[Any] | CursorResult[Any]:
+    """A list of parameter dicts runs the statement as executemany."""
+    return await session.execute(stmt, params)
 
 
-async def session_commit(session: AsyncSession | Session) -> None:
-    if isinstance(session, AsyncSession):
-        await session.commit()
-    else:
-        session.commit()
+async def session_flush(session: AsyncSession) -> None:
+    await session.flush()
+
+
+def session_mark_dirty(session: AsyncSession) -> None:
+    """
+    Registers changes of the current unit of work, DBSessionMiddleware commits them once,
+    before the handler's first Telegram request or after the handler.
+    """
+    session.info["is_dirty"] = True
+
+
+def session_after_commit(session: AsyncSession, callback: Callable[[], Awaitable[Any]]) -> None:
+    """Runs the callback once the current transaction is committed, it is dropped if the transaction is rolled back."""
+    session.info.setdefault("after_commit", []).append(callback)
+
+
+async def session_commit(session: AsyncSession) -> None:
+    """
+    Explicit unit of work boundary, for changes that must be committed before the update is handled.
+    The state repositories kept in session.info for the transaction ends with it.
+    """
+    session.info.pop("is_dirty", None)
+    after_commit = session.info.pop("after_commit", [])
+    await session.commit()
+    session.info.clear()
+    for callback in after_commit:
+        await callback()
+
+
+async def session_rollback(session: AsyncSession) -> None:
+    session.info.clear()
+    await session.rollback()
 
 
 @event.listens_for(Engine, "connect")
 def set_sqlite_pragma(dbapi_connection, connection_record):
     cursor = dbapi_connection.cursor()
     cursor.execute("PRAGMA foreign_keys=ON")
-    if config.DB_ENCRYPTION:
-        cursor.execute("PRAGMA journal_mode=WAL")
+    if config.DB_WAL:
+        # synchronous=NORMAL is durable against application crashes in WAL mode
+        # and saves an fsync per commit.
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA cache_size=-{config.DB_CACHE_SIZE_KB}")
+        cursor.execute(f"PRAGMA mmap_size={config.DB_MMAP_SIZE}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
     cursor.close()
 
 
-async def check_all_tables_exist(session: AsyncSession | Session):
-    for table in Base.metadata.tables.values():
-        sql_query = f"SELECT name FROM sqlite_master WHERE type='table' AND name='{table.name}';"
-        if isinstance(session, AsyncSession):
-            result = await session.execute(text(sql_query))
-            if result.scalar() is None:
-                return False
-        else:
-            result = session.execute(text(sql_query))
-            if result.scalar() is None:
-                return False
-    return True
+@event.listens_for(engine.sync_engine, "connect")
+def set_journal_mode(dbapi_connection, connection_record):
+    # journal_mode is persistent and can't be changed from read-only connections, the writer sets it.
+    if config.DB_WAL:
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.close()
 
 
 async def create_db_and_tables():
-    async with get_db_session() as session:
-        if await check_all_tables_exist(session):
-            pass
-        else:
-            if isinstance(session, AsyncSession):
-                async with engine.begin() as conn:
-                    await conn.run_sync(Base.metadata.drop_all)
-                    await conn.run_sync(Base.metadata.create_all)
-            else:
-                Base.metadata.drop_all(bind=engine)
-                Base.metadata.create_all(bind=engine)
+    # Runs on the writer engine, read-only connections can't open a database file that doesn't exist yet.
+    async with engine.connect() as conn:
+        await conn.run_sync(run_migrations)
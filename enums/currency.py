@@ -147,3 +147,5 @@ NOT_AMEX = {
     Currency.SHP, Currency.SRD, Currency.STD, Currency.UYU, Currency.XOF,
     Currency.XPF
 }
+
+CURRENCY_CODES = frozenset(currency.value for currency in Currency)
@@ -1,5 +1,4 @@
-import inspect
-from aiogram import types, Router, F
+from aiogram import types, Router
 from aiogram.fsm.context import FSMContext
 from aiogram.types import Message, CallbackQuery
 from aiogram.utils.keyboard import InlineKeyboardBuilder
@@ -11,7 +10,7 @@ from handlers.admin.inventory_management import inventory_management
 from handlers.admin.statistics import statistics
 from handlers.admin.user_management import user_management
 from handlers.admin.wallet import wallet
-from utils.custom_filters import AdminIdFilter
+from utils.custom_filters import AdminIdFilter, ReplyButtonFilter
 from utils.localizator import Localizator
 
 admin_router = Router()
@@ -22,7 +21,7 @@ admin_router.include_router(statistics)
 admin_router.include_router(wallet)
 
 
-@admin_router.message(lambda message: message.text == Localizator.get_text(BotEntity.ADMIN, "menu"),
+@admin_router.message(ReplyButtonFilter(BotEntity.ADMIN, "menu"),
                       AdminIdFilter())
 async def admin_command_handler(message: types.message):
     await admin(message=message)
@@ -3,7 +3,6 @@ from aiogram.filters import StateFilter
 from aiogram.fsm.context import FSMContext
 from aiogram.types import CallbackQuery, Message
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import Session
 
 from callbacks import AdminAnnouncementCallback, AnnouncementType
 from enums.bot_entity import BotEntity
@@ -46,11 +45,13 @@ async def send_generated_msg(**kwargs):
     unpacked_cb = AdminAnnouncementCallback.unpack(callback.data)
     kb_builder = AdminAnnouncementsConstants.get_confirmation_builder(unpacked_cb.announcement_type)
     if unpacked_cb.announcement_type == AnnouncementType.RESTOCKING:
-        msg = await NewItemsManager.generate_restocking_message(session)
-        await callback.message.answer(msg, reply_markup=kb_builder.as_markup())
+        msg_parts = await NewItemsManager.generate_restocking_message(session)
     else:
-        msg = await NewItemsManager.generate_in_stock_message(session)
-        await callback.message.answer(msg, reply_markup=kb_builder.as_markup())
+        msg_parts = await NewItemsManager.generate_in_stock_message(session)
+    # The confirmation buttons go under the last part, send_announcement() generates the parts again.
+    for msg in msg_parts[:-1]:
+        await callback.message.answer(msg)
+    await callback.message.answer(msg_parts[-1], reply_markup=kb_builder.as_markup())
 
 
 async def send_confirmation(**kwargs):
@@ -66,7 +67,7 @@ async def send_confirmation(**kwargs):
 
 @announcement_router.callback_query(AdminIdFilter(), AdminAnnouncementCallback.filter())
 async def announcement_navigation(callback: CallbackQuery, state: FSMContext, callback_data: AdminAnnouncementCallback,
-                                  session: AsyncSession | Session):
+                                  session: AsyncSession):
     current_level = callback_data.level
 
     levels = {
@@ -4,13 +4,16 @@ from aiogram.utils.keyboard import InlineKeyboardBuilder
 
 from callbacks import AdminMenuCallback, AdminAnnouncementCallback, AnnouncementType
 from enums.bot_entity import BotEntity
+from utils.keyboard_cache import KeyboardCache
 from utils.localizator import Localizator
 
 
 class AdminConstants:
-    back_to_main_button = types.InlineKeyboardButton(text=Localizator.get_text(BotEntity.ADMIN,
-                                                                               "back_to_menu"),
-                                                     callback_data=AdminMenuCallback.create(level=0).pack())
+    @staticmethod
+    def get_back_to_main_button() -> types.InlineKeyboardButton:
+        return KeyboardCache.get("admin_back_to_menu", lambda: types.InlineKeyboardButton(
+            text=Localizator.get_text(BotEntity.ADMIN, "back_to_menu"),
+            callback_data=AdminMenuCallback.create(level=0).pack()), True)
 
 
 class AdminAnnouncementsConstants:
@@ -35,3 +38,7 @@ class AdminAnnouncementStates(StatesGroup):
 class UserManagementStates(StatesGroup):
     balance_amount = State()
     user_entity = State()
+
+
+class StatisticsStates(StatesGroup):
+    date_range = State()
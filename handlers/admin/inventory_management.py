@@ -3,7 +3,6 @@ from aiogram.filters import StateFilter
 from aiogram.fsm.context import FSMContext
 from aiogram.types import CallbackQuery, Message
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import Session
 
 from callbacks import AdminInventoryManagementCallback, AddType
 from enums.bot_entity import BotEntity
@@ -56,7 +55,7 @@ async def confirm_delete(**kwargs):
 
 
 @inventory_management.message(AdminIdFilter(), F.document, StateFilter(AdminInventoryManagementStates.document))
-async def add_items_document(message: Message, state: FSMContext, session: AsyncSession | Session):
+async def add_items_document(message: Message, state: FSMContext, session: AsyncSession):
     if message.text and message.text.lower() == 'cancel':
         await state.clear()
         await message.answer(Localizator.get_text(BotEntity.COMMON, "cancelled"))
@@ -74,7 +73,7 @@ async def add_items_document(message: Message, state: FSMContext, session: Async
 @inventory_management.callback_query(AdminIdFilter(), AdminInventoryManagementCallback.filter())
 async def inventory_management_navigation(callback: CallbackQuery, state: FSMContext,
                                           callback_data: AdminInventoryManagementCallback,
-                                          session: AsyncSession | Session):
+                                          session: AsyncSession):
     current_level = callback_data.level
 
     levels = {
@@ -1,15 +1,18 @@
 import inspect
+import tempfile
+from pathlib import Path
 
-from aiogram import Router, types
+from aiogram import Router, types, F
+from aiogram.filters import StateFilter
 from aiogram.fsm.context import FSMContext
-from aiogram.types import CallbackQuery
+from aiogram.types import CallbackQuery, Message
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import Session
 
-import config
 from callbacks import StatisticsCallback
+from handlers.admin.constants import StatisticsStates
 from services.admin import AdminService
 from utils.custom_filters import AdminIdFilter
+from utils.db_export import DBExporter
 
 statistics = Router()
 
@@ -38,21 +41,42 @@ async def entity_statistics(**kwargs):
 async def get_db_file(**kwargs):
     callback = kwargs.get("callback")
     await callback.answer()
-    with open(f"./data/{config.DB_NAME}", "rb") as f:
-        await callback.message.bot.send_document(callback.from_user.id,
-                                                 types.BufferedInputFile(file=f.read(), filename="database.db"))
+    with tempfile.TemporaryDirectory() as export_dir:
+        for part in await DBExporter.export(Path(export_dir)):
+            await callback.message.bot.send_document(callback.from_user.id, types.FSInputFile(part))
+
+
+async def sql_statistics(**kwargs):
+    callback = kwargs.get("callback")
+    msg, kb_builder = await AdminService.get_sql_statistics(callback)
+    await callback.message.edit_text(text=msg, reply_markup=kb_builder.as_markup())
+
+
+async def date_range_request(**kwargs):
+    callback = kwargs.get("callback")
+    state = kwargs.get("state")
+    msg, kb_builder = await AdminService.request_date_range(state)
+    await callback.message.edit_text(text=msg, reply_markup=kb_builder.as_markup())
+
+
+@statistics.message(AdminIdFilter(), F.text, StateFilter(StatisticsStates.date_range))
+async def date_range_statistics(message: Message, state: FSMContext, session: AsyncSession):
+    msg, kb_builder = await AdminService.get_date_range_statistics(message, state, session)
+    await message.answer(text=msg, reply_markup=kb_builder.as_markup())
 
 
 @statistics.callback_query(AdminIdFilter(), StatisticsCallback.filter())
 async def statistics_navigation(callback: CallbackQuery, state: FSMContext, callback_data: StatisticsCallback,
-                                session: AsyncSession | Session):
+                                session: AsyncSession):
     current_level = callback_data.level
 
     levels = {
         0: statistics_menu,
         1: timedelta_picker,
         2: entity_statistics,
-        3: get_db_file
+        3: get_db_file,
+        4: sql_statistics,
+        5: date_range_request
     }
     current_level_function = levels[current_level]
 
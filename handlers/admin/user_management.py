@@ -3,7 +3,6 @@ from aiogram.filters import StateFilter
 from aiogram.fsm.context import FSMContext
 from aiogram.types import CallbackQuery, Message
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import Session
 
 from callbacks import UserManagementCallback
 from handlers.admin.constants import UserManagementStates
@@ -37,7 +36,7 @@ async def credit_management(**kwargs):
 
 @user_management.message(AdminIdFilter(), F.text, StateFilter(UserManagementStates.user_entity,
                                                               UserManagementStates.balance_amount))
-async def balance_management(message: Message, state: FSMContext, session: AsyncSession | Session):
+async def balance_management(message: Message, state: FSMContext, session: AsyncSession):
     current_state = await state.get_state()
     match current_state:
         case UserManagementStates.user_entity:
@@ -69,7 +68,7 @@ async def refund_confirmation(**kwargs):
 
 @user_management.callback_query(AdminIdFilter(), UserManagementCallback.filter())
 async def inventory_management_navigation(callback: CallbackQuery, state: FSMContext,
-                                          callback_data: UserManagementCallback, session: Session | AsyncSession):
+                                          callback_data: UserManagementCallback, session: AsyncSession):
     current_level = callback_data.level
 
     levels = {
@@ -2,31 +2,33 @@ from aiogram import types
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
 from enums.bot_entity import BotEntity
+from utils.keyset_pagination import KeysetPagination
 from utils.localizator import Localizator
 
 
-async def add_pagination_buttons(keyboard_builder: InlineKeyboardBuilder, unpacked_cb, max_page_function,
+async def add_pagination_buttons(keyboard_builder: InlineKeyboardBuilder, unpacked_cb, pagination: KeysetPagination,
                                  back_button) -> InlineKeyboardBuilder:
-    maximum_page = await max_page_function
+    """The buttons carry the page tokens of the neighbouring pages, see KeysetPagination."""
     buttons = []
-    if unpacked_cb.page > 0:
-        back_page_callback = unpacked_cb.__copy__()
-        back_page_callback.page -= 1
+    if pagination.has_previous:
         first_page_callback = unpacked_cb.__copy__()
-        first_page_callback.page = 0
+        first_page_callback.page = KeysetPagination.FIRST_PAGE
+        previous_page_callback = unpacked_cb.__copy__()
+        previous_page_callback.page = pagination.previous_page
         buttons.append(
             types.InlineKeyboardButton(text=Localizator.get_text(BotEntity.COMMON, "pagination_first"),
                                        callback_data=first_page_callback.pack()))
         buttons.append(
             types.InlineKeyboardButton(text=Localizator.get_text(BotEntity.COMMON, "pagination_previous"),
-                                       callback_data=back_page_callback.pack()))
-    if unpacked_cb.page < maximum_page:
+                                       callback_data=previous_page_callback.pack()))
+    if pagination.has_next:
+        next_page_callback = unpacked_cb.__copy__()
+        next_page_callback.page = pagination.next_page
         last_page_callback = unpacked_cb.__copy__()
-        last_page_callback.page = maximum_page
-        unpacked_cb.page += 1
+        last_page_callback.page = KeysetPagination.LAST_PAGE
         buttons.append(
             types.InlineKeyboardButton(text=Localizator.get_text(BotEntity.COMMON, "pagination_next"),
-                                       callback_data=unpacked_cb.pack()))
+                                       callback_data=next_page_callback.pack()))
         buttons.append(
             types.InlineKeyboardButton(text=Localizator.get_text(BotEntity.COMMON, "pagination_last"),
                                        callback_data=last_page_callback.pack()))
@@ -1,22 +1,20 @@
-from aiogram import types, Router, F
+from aiogram import types, Router
 from aiogram.types import Message, CallbackQuery
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import Session
 
 from callbacks import AllCategoriesCallback
 from enums.bot_entity import BotEntity
 from services.cart import CartService
 from services.category import CategoryService
 from services.subcategory import SubcategoryService
-from utils.custom_filters import IsUserExistFilter
-from utils.localizator import Localizator
+from utils.custom_filters import IsUserExistFilter, ReplyButtonFilter
 
 all_categories_router = Router()
 
 
-@all_categories_router.message(lambda message: message.text == Localizator.get_text(BotEntity.USER, "all_categories"),
+@all_categories_router.message(ReplyButtonFilter(BotEntity.USER, "all_categories"),
                                IsUserExistFilter())
-async def all_categories_text_message(message: types.message, session: AsyncSession | Session):
+async def all_categories_text_message(message: types.message, session: AsyncSession):
     await all_categories(callback=message, session=session)
 
 
@@ -56,13 +54,13 @@ async def add_to_cart_confirmation(**kwargs):
 async def add_to_cart(**kwargs):
     callback = kwargs.get("callback")
     session = kwargs.get("session")
-    await CartService.add_to_cart(callback, session)
-    await callback.message.edit_text(text=Localizator.get_text(BotEntity.USER, "item_added_to_cart"))
+    msg = await CartService.add_to_cart(callback, session)
+    await callback.message.edit_text(text=msg)
 
 
 @all_categories_router.callback_query(AllCategoriesCallback.filter(), IsUserExistFilter())
 async def navigate_categories(callback: CallbackQuery, callback_data: AllCategoriesCallback,
-                              session: AsyncSession | Session):
+                              session: AsyncSession):
     current_level = callback_data.level
 
     levels = {
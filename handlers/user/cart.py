@@ -1,22 +1,18 @@
-import inspect
-
-from aiogram import types, F, Router
+from aiogram import types, Router
 from aiogram.types import CallbackQuery, Message
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import Session
 
 from callbacks import CartCallback
 from enums.bot_entity import BotEntity
 from services.cart import CartService
-from utils.custom_filters import IsUserExistFilter
-from utils.localizator import Localizator
+from utils.custom_filters import IsUserExistFilter, ReplyButtonFilter
 
 cart_router = Router()
 
 
-@cart_router.message(lambda message: message.text == Localizator.get_text(BotEntity.USER, "cart"),
+@cart_router.message(ReplyButtonFilter(BotEntity.USER, "cart"),
                      IsUserExistFilter())
-async def cart_text_message(message: types.message, session: AsyncSession | Session):
+async def cart_text_message(message: types.message, session: AsyncSession):
     await show_cart(message=message, session=session)
 
 
@@ -54,7 +50,7 @@ async def buy_processing(**kwargs):
 
 
 @cart_router.callback_query(CartCallback.filter(), IsUserExistFilter())
-async def navigate_cart_process(callback: CallbackQuery, callback_data: CartCallback, session: AsyncSession | Session):
+async def navigate_cart_process(callback: CallbackQuery, callback_data: CartCallback, session: AsyncSession):
     current_level = callback_data.level
 
     levels = {
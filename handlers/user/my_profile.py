@@ -1,7 +1,6 @@
-from aiogram import types, Router, F
+from aiogram import types, Router
 from aiogram.types import CallbackQuery, Message
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import Session
 
 from callbacks import MyProfileCallback
 from enums.bot_entity import BotEntity
@@ -9,22 +8,25 @@ from enums.user import UserResponse
 from models.user import UserDTO
 from services.buy import BuyService
 from services.user import UserService
-from utils.custom_filters import IsUserExistFilter
+from utils.custom_filters import IsUserExistFilter, ReplyButtonFilter
+from utils.keyboard_cache import KeyboardCache
 from utils.localizator import Localizator
 
 my_profile_router = Router()
 
 
-@my_profile_router.message(lambda message: message.text == Localizator.get_text(BotEntity.USER, "my_profile"),
+@my_profile_router.message(ReplyButtonFilter(BotEntity.USER, "my_profile"),
                            IsUserExistFilter())
-async def my_profile_text_message(message: types.message, session: Session | AsyncSession):
+async def my_profile_text_message(message: types.message, session: AsyncSession):
     await my_profile(message=message, session=session)
 
 
 class MyProfileConstants:
-    back_to_main_menu = types.InlineKeyboardButton(
-        text=Localizator.get_text(BotEntity.USER, "back_to_my_profile"),
-        callback_data=MyProfileCallback.create(level=0).pack())
+    @staticmethod
+    def get_back_to_main_menu() -> types.InlineKeyboardButton:
+        return KeyboardCache.get("back_to_my_profile", lambda: types.InlineKeyboardButton(
+            text=Localizator.get_text(BotEntity.USER, "back_to_my_profile"),
+            callback_data=MyProfileCallback.create(level=0).pack()))
 
 
 async def my_profile(**kwargs):
@@ -58,7 +60,7 @@ async def get_order_from_history(**kwargs):
 
 
 @my_profile_router.callback_query(MyProfileCallback.filter(), IsUserExistFilter())
-async def navigate(callback: CallbackQuery, callback_data: MyProfileCallback, session: AsyncSession | Session):
+async def navigate(callback: CallbackQuery, callback_data: MyProfileCallback, session: AsyncSession):
     current_level = callback_data.level
 
     levels = {
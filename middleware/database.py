@@ -1,10 +1,25 @@
+from contextvars import ContextVar
 from typing import Callable, Dict, Any, Awaitable
-from aiogram import BaseMiddleware
+from aiogram import BaseMiddleware, Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.methods import TelegramMethod, Response
+from aiogram.methods.base import TelegramType
 from aiogram.types import TelegramObject
-from db import get_db_session
+from sqlalchemy.ext.asyncio import AsyncSession
+from db import get_db_session, session_commit
+from utils.sql_statistics import SQLStatistics
+
+# The session of the update handled in the current task, read by CommitBeforeRequestMiddleware.
+update_session: ContextVar[AsyncSession | None] = ContextVar("update_session", default=None)
 
 
 class DBSessionMiddleware(BaseMiddleware):
+    """
+    Injects a session that checks out a connection only when the first statement is executed
+    and returns it when the handler finishes, so updates which never touch the database don't hold a connection.
+    Changes marked with session_mark_dirty are committed in one transaction before the handler's first
+    Telegram request (see CommitBeforeRequestMiddleware), or after the handler if it sends nothing.
+    """
     async def __call__(
             self,
             handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
@@ -13,4 +28,30 @@ class DBSessionMiddleware(BaseMiddleware):
     ) -> Awaitable[Any]:
         async with get_db_session() as session:
             data["session"] = session
-            return await handler(event, data)
+            token = update_session.set(session)
+            try:
+                result = await handler(event, data)
+                if session.info.get("is_dirty"):
+                    await session_commit(session)
+                return result
+            finally:
+                update_session.reset(token)
+                SQLStatistics.count_update(session.sync_session.used_connection)
+
+
+class CommitBeforeRequestMiddleware(BaseRequestMiddleware):
+    """
+    Commits the changes of the current update before it calls the Bot API, so the write transaction
+    and the writer connection aren't held across Telegram I/O, and a failed commit is raised
+    before the user is told that the change succeeded.
+    """
+    async def __call__(
+            self,
+            make_request: NextRequestMiddlewareType[TelegramType],
+            bot: Bot,
+            method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        session = update_session.get()
+        if session is not None and session.info.get("is_dirty"):
+            await session_commit(session)
+        return await make_request(bot, method)
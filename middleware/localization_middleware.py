@@ -24,7 +24,9 @@ class LocalizationMiddleware(BaseMiddleware):
         language = "en"
         currency = config.CURRENCY.value
         if telegram_id and session:
+            # The user is shared with the handler, the handler's lookups of the same user cost no query.
             user = await UserRepository.get_by_tgid(telegram_id, session)
+            data["user"] = user
             if user:
                 if user.language:
                     language = user.language
@@ -0,0 +1,48 @@
+import logging
+
+from sqlalchemy import Connection, text
+
+from migrations import m0001_initial_schema, m0002_hot_path_indexes, m0003_unique_cart_lines, \
+    m0004_item_reservations, m0005_buy_subcategory, m0006_stock_summary, m0007_new_items_index, \
+    m0008_daily_statistics
+
+# Ordered list of schema migrations, the version of a migration is its position in the list (starting from 1).
+# Never reorder or edit released migrations, append a new one instead. The first migration creates a new
+# database from the current models, so later migrations must skip changes that already exist.
+MIGRATIONS = [
+    m0001_initial_schema,
+    m0002_hot_path_indexes,
+    m0003_unique_cart_lines,
+    m0004_item_reservations,
+    m0005_buy_subcategory,
+    m0006_stock_summary,
+    m0007_new_items_index,
+    m0008_daily_statistics,
+]
+
+logger = logging.getLogger("migrations")
+
+
+def get_schema_version(connection: Connection) -> int:
+    connection.exec_driver_sql("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)")
+    version = connection.execute(text("SELECT version FROM schema_version")).scalar()
+    if version is None:
+        connection.execute(text("INSERT INTO schema_version (version) VALUES (0)"))
+        version = 0
+    return version
+
+
+def run_migrations(connection: Connection) -> None:
+    """
+    Applies the migrations newer than the version stored in the schema_version row.
+    Every migration is committed together with its version bump, so an interrupted run continues where it stopped.
+    """
+    current_version = get_schema_version(connection)
+    connection.commit()
+    for version, migration in enumerate(MIGRATIONS, start=1):
+        if version <= current_version:
+            continue
+        logger.info(f"Applying database migration {version}: {migration.__name__}")
+        migration.upgrade(connection)
+        connection.execute(text("UPDATE schema_version SET version = :version"), {"version": version})
+        connection.commit()
@@ -0,0 +1,8 @@
+from sqlalchemy import Connection
+
+from models.base import Base
+
+
+def upgrade(connection: Connection) -> None:
+    # Creates only the missing tables, databases created before versioned migrations keep their data.
+    Base.metadata.create_all(connection, checkfirst=True)
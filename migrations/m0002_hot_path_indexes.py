@@ -0,0 +1,16 @@
+from sqlalchemy import Connection
+
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_items_category_subcategory_sold ON items (category_id, subcategory_id, is_sold)",
+    "CREATE INDEX IF NOT EXISTS ix_buys_buyer_id ON buys (buyer_id)",
+    "CREATE INDEX IF NOT EXISTS ix_buys_buy_datetime ON buys (buy_datetime)",
+    "CREATE INDEX IF NOT EXISTS ix_deposits_user_id ON deposits (user_id)",
+    "CREATE INDEX IF NOT EXISTS ix_deposits_deposit_datetime ON deposits (deposit_datetime)",
+    "CREATE INDEX IF NOT EXISTS ix_cart_items_cart_id ON cart_items (cart_id)",
+    'CREATE INDEX IF NOT EXISTS "ix_buyItem_buy_id" ON "buyItem" (buy_id)',
+]
+
+
+def upgrade(connection: Connection) -> None:
+    for create_index in INDEXES:
+        connection.exec_driver_sql(create_index)
@@ -0,0 +1,21 @@
+from sqlalchemy import Connection
+
+
+def upgrade(connection: Connection) -> None:
+    # Merge duplicated cart lines into the oldest one before the unique index is created.
+    connection.exec_driver_sql("""
+        UPDATE cart_items
+        SET quantity = (SELECT SUM(duplicate.quantity)
+                        FROM cart_items AS duplicate
+                        WHERE duplicate.cart_id = cart_items.cart_id
+                          AND duplicate.category_id = cart_items.category_id
+                          AND duplicate.subcategory_id = cart_items.subcategory_id)
+        WHERE id IN (SELECT MIN(id) FROM cart_items
+                     GROUP BY cart_id, category_id, subcategory_id HAVING COUNT(*) > 1)""")
+    connection.exec_driver_sql("""
+        DELETE FROM cart_items
+        WHERE id NOT IN (SELECT MIN(id) FROM cart_items GROUP BY cart_id, category_id, subcategory_id)""")
+    connection.exec_driver_sql("CREATE UNIQUE INDEX IF NOT EXISTS ix_cart_items_cart_category_subcategory "
+                               "ON cart_items (cart_id, category_id, subcategory_id)")
+    # Covered by the unique index, which starts with cart_id.
+    connection.exec_driver_sql("DROP INDEX IF EXISTS ix_cart_items_cart_id")
@@ -0,0 +1,17 @@
+from sqlalchemy import Connection
+
+
+def column_exists(connection: Connection, table: str, column: str) -> bool:
+    columns = connection.exec_driver_sql(f"PRAGMA table_info({table})").all()
+    return any(row[1] == column for row in columns)
+
+
+def upgrade(connection: Connection) -> None:
+    if not column_exists(connection, "items", "reserved_cart_item_id"):
+        connection.exec_driver_sql("ALTER TABLE items ADD COLUMN reserved_cart_item_id INTEGER "
+                                   "REFERENCES cart_items (id) ON DELETE SET NULL")
+    if not column_exists(connection, "items", "reserved_until"):
+        connection.exec_driver_sql("ALTER TABLE items ADD COLUMN reserved_until DATETIME")
+    connection.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_items_reserved_cart_item_id "
+                               "ON items (reserved_cart_item_id)")
+    connection.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_items_reserved_until ON items (reserved_until)")
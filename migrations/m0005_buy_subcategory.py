@@ -0,0 +1,19 @@
+from sqlalchemy import Connection
+
+from migrations.m0004_item_reservations import column_exists
+
+
+def upgrade(connection: Connection) -> None:
+    for column, table in (("category_id", "categories"), ("subcategory_id", "subcategories")):
+        if not column_exists(connection, "buys", column):
+            connection.exec_driver_sql(f"ALTER TABLE buys ADD COLUMN {column} INTEGER REFERENCES {table} (id)")
+    # Every item of a buy belongs to the same (sub-)category, the first one is enough.
+    connection.exec_driver_sql("""
+        UPDATE buys
+        SET category_id = (SELECT items.category_id FROM "buyItem"
+                           JOIN items ON items.id = "buyItem".item_id
+                           WHERE "buyItem".buy_id = buys.id LIMIT 1),
+            subcategory_id = (SELECT items.subcategory_id FROM "buyItem"
+                              JOIN items ON items.id = "buyItem".item_id
+                              WHERE "buyItem".buy_id = buys.id LIMIT 1)
+        WHERE subcategory_id IS NULL""")
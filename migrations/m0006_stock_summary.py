@@ -0,0 +1,18 @@
+from sqlalchemy import Connection
+
+
+def upgrade(connection: Connection) -> None:
+    connection.exec_driver_sql("""
+        CREATE TABLE IF NOT EXISTS stock_summary (
+            category_id INTEGER NOT NULL REFERENCES categories (id) ON DELETE CASCADE,
+            subcategory_id INTEGER NOT NULL REFERENCES subcategories (id) ON DELETE CASCADE,
+            available_qty INTEGER NOT NULL,
+            price FLOAT NOT NULL,
+            PRIMARY KEY (category_id, subcategory_id))""")
+    connection.exec_driver_sql("DELETE FROM stock_summary")
+    # The price is taken from the first unsold item, SQLite picks the bare column from the min() row.
+    connection.exec_driver_sql("""
+        INSERT INTO stock_summary (category_id, subcategory_id, available_qty, price)
+        SELECT category_id, subcategory_id, available_qty, price
+        FROM (SELECT category_id, subcategory_id, COUNT(id) AS available_qty, price, MIN(id)
+              FROM items WHERE is_sold = 0 GROUP BY category_id, subcategory_id)""")
@@ -0,0 +1,6 @@
+from sqlalchemy import Connection
+
+
+def upgrade(connection: Connection) -> None:
+    connection.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_items_new ON items (category_id, subcategory_id) "
+                               "WHERE is_new = 1")
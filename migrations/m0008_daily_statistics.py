@@ -0,0 +1,39 @@
+from sqlalchemy import Connection
+
+
+def upgrade(connection: Connection) -> None:
+    connection.exec_driver_sql("""
+        CREATE TABLE IF NOT EXISTS daily_sales (
+            day DATE NOT NULL PRIMARY KEY,
+            buys_count INTEGER NOT NULL,
+            items_sold INTEGER NOT NULL,
+            revenue FLOAT NOT NULL)""")
+    connection.exec_driver_sql("""
+        CREATE TABLE IF NOT EXISTS daily_deposits (
+            day DATE NOT NULL,
+            network VARCHAR NOT NULL,
+            token_name VARCHAR NOT NULL,
+            deposits_count INTEGER NOT NULL,
+            amount BIGINT NOT NULL,
+            PRIMARY KEY (day, network, token_name))""")
+    connection.exec_driver_sql("""
+        CREATE TABLE IF NOT EXISTS daily_users (
+            day DATE NOT NULL PRIMARY KEY,
+            new_users INTEGER NOT NULL)""")
+    # Backfill from the existing rows, refunded buys are not counted.
+    connection.exec_driver_sql("DELETE FROM daily_sales")
+    connection.exec_driver_sql("""
+        INSERT INTO daily_sales (day, buys_count, items_sold, revenue)
+        SELECT date(buy_datetime), COUNT(*), SUM(quantity), SUM(total_price)
+        FROM buys WHERE is_refunded = 0 AND buy_datetime IS NOT NULL GROUP BY date(buy_datetime)""")
+    connection.exec_driver_sql("DELETE FROM daily_deposits")
+    connection.exec_driver_sql("""
+        INSERT INTO daily_deposits (day, network, token_name, deposits_count, amount)
+        SELECT date(deposit_datetime), network, COALESCE(token_name, ''), COUNT(*), SUM(amount)
+        FROM deposits WHERE deposit_datetime IS NOT NULL
+        GROUP BY date(deposit_datetime), network, COALESCE(token_name, '')""")
+    connection.exec_driver_sql("DELETE FROM daily_users")
+    connection.exec_driver_sql("""
+        INSERT INTO daily_users (day, new_users)
+        SELECT date(registered_at), COUNT(*)
+        FROM users WHERE registered_at IS NOT NULL GROUP BY date(registered_at)""")
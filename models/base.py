@@ -1,6 +1,78 @@
+from typing import Any, Iterable, Sequence, TypeVar
+
+from pydantic import BaseModel, PrivateAttr
+from sqlalchemy import Column
 from sqlalchemy.ext.asyncio import AsyncAttrs
 from sqlalchemy.orm import DeclarativeBase
 
 
 class Base(AsyncAttrs, DeclarativeBase):
     pass
+
+
+DTO = TypeVar("DTO", bound=BaseModel)
+
+
+class TrackedDTO(BaseModel):
+    """
+    Records the fields that were assigned a different value since the DTO was created,
+    so repositories update only these columns. Constructing or validating a DTO changes nothing,
+    model_copy(update=...) counts the updated fields as changed.
+    """
+    _changed_fields: set[str] = PrivateAttr(default_factory=set)
+
+    def __setattr__(self, name: str, value: Any):
+        if name in type(self).model_fields and getattr(self, name) != value:
+            self._changed_fields.add(name)
+        super().__setattr__(name, value)
+
+    def __copy__(self):
+        copied = super().__copy__()
+        # The copy tracks its own changes, the shallow copy of the private attributes would share the set.
+        copied._changed_fields = set(self._changed_fields)
+        return copied
+
+    def model_copy(self, *, update: dict[str, Any] | None = None, deep: bool = False):
+        copied = super().model_copy(update=update, deep=deep)
+        copied._changed_fields = self._changed_fields | {name for name in update or () if name in self.model_fields}
+        return copied
+
+    def get_changes(self, *exclude: str) -> dict[str, Any]:
+        return {name: getattr(self, name) for name in self._changed_fields if name not in exclude}
+
+    def clear_changes(self):
+        self._changed_fields = set()
+
+
+def dto_columns(model: type[Base], dto_class: type[BaseModel]) -> list[Column]:
+    """The columns of the model the DTO has fields for, selecting them instead of the model skips the ORM objects."""
+    return [model.__table__.c[name] for name in dto_class.model_fields if name in model.__table__.c]
+
+
+def construct_dtos(dto_class: type[DTO], keys: Iterable[str], rows: Iterable[Sequence]) -> list[DTO]:
+    """
+    Builds DTOs from selected rows without validation, for the trusted rows of list queries.
+    The values are used as SQLAlchemy returned them, fields that weren't selected get their defaults
+    and columns that aren't fields of the DTO are skipped.
+    """
+    fields = dto_class.model_fields
+    selected = [(index, key) for index, key in enumerate(keys) if key in fields]
+    selected_keys = {key for _, key in selected}
+    # Every field in the order of the DTO, the selected values replace the placeholders in place.
+    defaults = {name: None if name in selected_keys else field.get_default(call_default_factory=True)
+                for name, field in fields.items()}
+    private_attributes = dto_class.__private_attributes__.items()
+    dtos = []
+    for row in rows:
+        values = dict(defaults)
+        for index, key in selected:
+            values[key] = row[index]
+        # The same state model_construct() leaves, without its per-field lookups.
+        dto = dto_class.__new__(dto_class)
+        object.__setattr__(dto, "__dict__", values)
+        object.__setattr__(dto, "__pydantic_fields_set__", set(selected_keys))
+        object.__setattr__(dto, "__pydantic_extra__", None)
+        object.__setattr__(dto, "__pydantic_private__",
+                           {name: attribute.get_default() for name, attribute in private_attributes} or None)
+        dtos.append(dto)
+    return dtos
@@ -1,10 +1,10 @@
 from datetime import datetime
 
 from pydantic import BaseModel
-from sqlalchemy import Column, Integer, Float, DateTime, Boolean, ForeignKey, func, CheckConstraint
+from sqlalchemy import Column, Integer, Float, DateTime, Boolean, ForeignKey, func, CheckConstraint, Index
 from sqlalchemy.orm import relationship
 
-from models.base import Base
+from models.base import Base, TrackedDTO
 
 
 class Buy(Base):
@@ -17,20 +17,39 @@ class Buy(Base):
     total_price = Column(Float, nullable=False)
     buy_datetime = Column(DateTime, default=func.now())
     is_refunded = Column(Boolean, default=False)
+    # A buy is a single cart line, the (sub-)category is stored so the purchase history doesn't look up the items.
+    category_id = Column(Integer, ForeignKey('categories.id'), nullable=True)
+    subcategory_id = Column(Integer, ForeignKey('subcategories.id'), nullable=True)
 
     __table_args__ = (
         CheckConstraint('quantity > 0', name='check_quantity_positive'),
         CheckConstraint('total_price > 0', name='check_total_price_positive'),
+        # The purchase history is paginated by id, SQLite appends the id to the index entries.
+        Index('ix_buys_buyer_id', 'buyer_id'),
+        Index('ix_buys_buy_datetime', 'buy_datetime'),
     )
 
 
-class BuyDTO(BaseModel):
+class BuyDTO(TrackedDTO):
     id: int | None = None
     buyer_id: int | None = None
     quantity: int | None = None
     total_price: float | None = None
     buy_datetime: datetime | None = None
     is_refunded: bool | None = None
+    category_id: int | None = None
+    subcategory_id: int | None = None
+
+
+class BuyHistoryDTO(BuyDTO):
+    subcategory_name: str
+    subcategory_name_translations: dict | None = None
+
+
+class SalesStatisticsDTO(BaseModel):
+    buys_count: int
+    items_sold: int
+    total_profit: float
 
 
 class RefundDTO(BaseModel):
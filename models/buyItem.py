@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from sqlalchemy import Column, Integer, ForeignKey
+from sqlalchemy import Column, Integer, ForeignKey, Index
 from sqlalchemy.orm import relationship, backref
 
 from models.base import Base
@@ -14,6 +14,10 @@ class BuyItem(Base):
     item_id = Column(Integer, ForeignKey("items.id", ondelete="CASCADE"), nullable=False)
     item = relationship("Item", backref=backref("items", cascade="all"), passive_deletes="all")
 
+    __table_args__ = (
+        Index('ix_buyItem_buy_id', 'buy_id'),
+    )
+
 
 class BuyItemDTO(BaseModel):
     id: int | None = None
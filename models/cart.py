@@ -2,8 +2,9 @@
 # to be able to checkout this cart at once together with a shipment fee. Only the
 # quantity, category, subcategory is stored because the unique item is not yet sold
 #
-# note that the item is NOT reserved or blocked so that the availability of the item
-# needs to be checked again during checkout
+# unique items are held for a cart line for RESERVATION_TTL_MINUTES when the line is added
+# and again when the checkout starts, the checkout only sells the items held for its lines.
+# Expired holds are released by the reservation sweeper.
 from pydantic import BaseModel
 from sqlalchemy import Column, Integer, ForeignKey
 from models.base import Base
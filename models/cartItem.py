@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from sqlalchemy import Column, Integer, ForeignKey, CheckConstraint
+from sqlalchemy import Column, Integer, ForeignKey, CheckConstraint, Index
 
 from models.base import Base
 
@@ -15,6 +15,8 @@ class CartItem(Base):
 
     __table_args__ = (
         CheckConstraint('quantity > 0', name='check_quantity_positive'),
+        # One line per (sub-)category in a cart, adding the same subcategory again is an upsert on this index.
+        Index('ix_cart_items_cart_category_subcategory', 'cart_id', 'category_id', 'subcategory_id', unique=True),
     )
 
 
@@ -24,3 +26,12 @@ class CartItemDTO(BaseModel):
     category_id: int | None = None
     subcategory_id: int | None = None
     quantity: int | None = None
+
+
+class CartItemPricedDTO(CartItemDTO):
+    category_name: str
+    category_name_translations: dict | None = None
+    subcategory_name: str
+    subcategory_name_translations: dict | None = None
+    price: float
+    line_total: float
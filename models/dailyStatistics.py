@@ -0,0 +1,36 @@
+from sqlalchemy import Column, Integer, Float, String, Date, BigInteger
+
+from models.base import Base
+
+
+# Daily rollups of the statistics, updated in the same transaction as the buys, refunds, deposits and users,
+# so statistics for any date range are summed up from one row per day instead of the raw rows.
+# The day is the UTC date, the same as CURRENT_TIMESTAMP the datetime columns are filled with.
+class DailySales(Base):
+    __tablename__ = "daily_sales"
+
+    day = Column(Date, primary_key=True)
+    # Refunded buys are subtracted again.
+    buys_count = Column(Integer, nullable=False, default=0)
+    items_sold = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)
+
+
+class DailyDeposits(Base):
+    __tablename__ = "daily_deposits"
+
+    day = Column(Date, primary_key=True)
+    network = Column(String, primary_key=True)
+    # "" for the native coin of the network, a primary key column can't be compared with NULL on conflict.
+    token_name = Column(String, primary_key=True, default="")
+    deposits_count = Column(Integer, nullable=False, default=0)
+    # In the smallest units of the network.
+    amount = Column(BigInteger, nullable=False, default=0)
+
+
+class DailyUsers(Base):
+    __tablename__ = "daily_users"
+
+    day = Column(Date, primary_key=True)
+    new_users = Column(Integer, nullable=False, default=0)
+
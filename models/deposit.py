@@ -1,7 +1,7 @@
 from datetime import datetime
 
 from pydantic import BaseModel
-from sqlalchemy import Integer, Column, String, ForeignKey, Boolean, BigInteger, DateTime, func, CheckConstraint
+from sqlalchemy import Integer, Column, String, ForeignKey, Boolean, BigInteger, DateTime, func, CheckConstraint, Index
 
 from models.base import Base
 
@@ -20,6 +20,8 @@ class Deposit(Base):
 
     __table_args__ = (
         CheckConstraint('amount > 0', name='check_amount_positive'),
+        Index('ix_deposits_user_id', 'user_id'),
+        Index('ix_deposits_deposit_datetime', 'deposit_datetime'),
     )
 
 
@@ -33,3 +35,10 @@ class DepositDTO(BaseModel):
     is_withdrawn: bool | None = None
     vout: int | None = None
     deposit_datetime: datetime | None = None
+
+
+class DepositStatisticsDTO(BaseModel):
+    network: str
+    token_name: str | None = None
+    deposits_count: int
+    amount: int
@@ -1,10 +1,10 @@
 from datetime import datetime
 
-from pydantic import BaseModel
-from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, CheckConstraint, JSON
+from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, CheckConstraint, JSON, Index, DateTime, \
+    text
 from sqlalchemy.orm import relationship, backref
 
-from models.base import Base
+from models.base import Base, TrackedDTO
 
 
 # Item is a unique good which can only be sold once
@@ -24,13 +24,22 @@ class Item(Base):
     is_new = Column(Boolean, nullable=False, default=True)
     description = Column(String, nullable=False)
     description_translations = Column(JSON, nullable=False, default={})
+    # An item is held for a cart line until reserved_until, an expired hold can be taken by any other line.
+    # Deleting the cart line releases the hold.
+    reserved_cart_item_id = Column(Integer, ForeignKey("cart_items.id", ondelete="SET NULL"), nullable=True)
+    reserved_until = Column(DateTime, nullable=True)
 
     __table_args__ = (
         CheckConstraint('price > 0', name='check_price_positive'),
+        Index('ix_items_category_subcategory_sold', 'category_id', 'subcategory_id', 'is_sold'),
+        Index('ix_items_reserved_cart_item_id', 'reserved_cart_item_id'),
+        Index('ix_items_reserved_until', 'reserved_until'),
+        # Only the items that were not announced yet.
+        Index('ix_items_new', 'category_id', 'subcategory_id', sqlite_where=text('is_new = 1')),
     )
 
 
-class ItemDTO(BaseModel):
+class ItemDTO(TrackedDTO):
     id: int | None = None
     category_id: int | None = None
     subcategory_id: int | None = None
@@ -0,0 +1,28 @@
+from pydantic import BaseModel
+from sqlalchemy import Column, Integer, Float, ForeignKey
+
+from models.base import Base
+
+
+# Unsold stock per (sub-)category, kept in the same transaction as every change of the items,
+# so the catalog is browsed without scanning the items table.
+class StockSummary(Base):
+    __tablename__ = "stock_summary"
+
+    category_id = Column(Integer, ForeignKey("categories.id", ondelete="CASCADE"), primary_key=True)
+    subcategory_id = Column(Integer, ForeignKey("subcategories.id", ondelete="CASCADE"), primary_key=True)
+    available_qty = Column(Integer, nullable=False, default=0)
+    # The price of the first unsold item, the price shown in the catalog.
+    price = Column(Float, nullable=False)
+
+
+class StockSummaryDTO(BaseModel):
+    category_id: int | None = None
+    subcategory_id: int | None = None
+    available_qty: int | None = None
+    price: float | None = None
+
+
+class StockSummaryNamedDTO(StockSummaryDTO):
+    category_name: str
+    subcategory_name: str
@@ -16,3 +16,8 @@ class SubcategoryDTO(BaseModel):
     id: int | None
     name: str | None
     name_translations: dict | None = None
+
+
+class SubcategoryStockDTO(SubcategoryDTO):
+    price: float
+    available_qty: int
@@ -1,10 +1,9 @@
 from datetime import datetime
 
-from pydantic import BaseModel
 from sqlalchemy import Column, Integer, DateTime, String, Boolean, Float, func, CheckConstraint
 import config
 
-from models.base import Base
+from models.base import Base, TrackedDTO
 
 
 class User(Base):
@@ -45,7 +44,7 @@ class User(Base):
     )
 
 
-class UserDTO(BaseModel):
+class UserDTO(TrackedDTO):
     id: int | None = None
     telegram_username: str | None = None
     telegram_id: int | None = None
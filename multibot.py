@@ -17,6 +17,10 @@ from aiogram.webhook.aiohttp_server import (
     setup_application,
 )
 from db import create_db_and_tables
+from middleware.database import CommitBeforeRequestMiddleware
+from services.dailyStatistics import DailyStatisticsService
+from services.reservation import ReservationService
+from services.stockSummary import StockSummaryService
 from utils.custom_filters import AdminIdFilter
 from enums.bot_entity import BotEntity
 from utils.localizator import Localizator
@@ -57,6 +61,9 @@ async def command_add_bot(message: Message, command: CommandObject, bot: Bot) ->
 async def on_startup(dispatcher: Dispatcher, bot: Bot):
     await bot.set_webhook(f"{BASE_URL}{MAIN_BOT_PATH}")
     await create_db_and_tables()
+    await StockSummaryService.check_and_rebuild()
+    await DailyStatisticsService.check_and_rebuild()
+    ReservationService.start_sweeper()
     for admin in config.ADMIN_ID_LIST:
         try:
             await bot.send_message(admin, Localizator.get_text(BotEntity.COMMON, "bot_working"))
@@ -67,6 +74,8 @@ async def on_startup(dispatcher: Dispatcher, bot: Bot):
 def main(main_router):
     logging.basicConfig(level=logging.INFO, stream=sys.stdout)
     session = AiohttpSession()
+    # Shared by the bots added with /add.
+    session.middleware(CommitBeforeRequestMiddleware())
     bot_settings = {"session": session, "parse_mode": ParseMode.HTML}
     bot = Bot(token=MAIN_BOT_TOKEN, **bot_settings)
     storage = MemoryStorage()
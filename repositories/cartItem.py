@@ -1,47 +1,83 @@
-import math
-
-from sqlalchemy import select, delete
+from sqlalchemy import select, delete, func, Select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import Session
 
-import config
 from db import session_flush, session_execute
+from models.base import construct_dtos, dto_columns
 from models.cart import Cart
-from models.cartItem import CartItemDTO, CartItem
+from models.cartItem import CartItemDTO, CartItem, CartItemPricedDTO
+from models.category import Category
+from models.item import Item
+from models.subcategory import Subcategory
+from utils.keyset_pagination import KeysetPagination
 
 
 class CartItemRepository:
     @staticmethod
-    async def create(cart_item: CartItemDTO, session: AsyncSession | Session) -> int:
+    async def create(cart_item: CartItemDTO, session: AsyncSession) -> int:
         cart_item = CartItem(**cart_item.model_dump())
         session.add(cart_item)
         await session_flush(session)
         return cart_item.id
 
     @staticmethod
-    async def get_by_user_id(user_id: int, page: int, session: AsyncSession | Session) -> list[CartItemDTO]:
-        stmt = select(CartItem).join(Cart, CartItem.cart_id == Cart.id).where(Cart.user_id == user_id).limit(
-            config.PAGE_ENTRIES).offset(config.PAGE_ENTRIES * page)
-        cart_items = await session_execute(stmt, session)
-        return [CartItemDTO.model_validate(cart_item, from_attributes=True) for cart_item in
-                cart_items.scalars().all()]
+    def __select_priced(user_id: int) -> Select:
+        # The unit price is the price of the first item of the (sub-)category, the same as ItemRepository.get_price.
+        price = (select(Item.price)
+                 .where(Item.category_id == CartItem.category_id, Item.subcategory_id == CartItem.subcategory_id)
+                 .limit(1)
+                 .scalar_subquery())
+        return (select(CartItem.id,
+                       CartItem.cart_id,
+                       CartItem.category_id,
+                       CartItem.subcategory_id,
+                       CartItem.quantity,
+                       Category.name.label("category_name"),
+                       Category.name_translations.label("category_name_translations"),
+                       Subcategory.name.label("subcategory_name"),
+                       Subcategory.name_translations.label("subcategory_name_translations"),
+                       price.label("price"),
+                       (price * CartItem.quantity).label("line_total"))
+                .join(Cart, CartItem.cart_id == Cart.id)
+                .join(Category, CartItem.category_id == Category.id)
+                .join(Subcategory, CartItem.subcategory_id == Subcategory.id)
+                .where(Cart.user_id == user_id))
+
+    @staticmethod
+    async def get_priced_by_user_id(user_id: int, session: AsyncSession) -> tuple[list[CartItemPricedDTO], float]:
+        """
+        Returns all cart lines of the user with (sub-)category names, unit prices and line totals,
+        together with the grand total of the cart.
+        """
+        stmt = CartItemRepository.__select_priced(user_id)
+        stmt = stmt.add_columns(func.sum(stmt.selected_columns.line_total).over().label("grand_total"))
+        rows = (await session_execute(stmt.order_by(CartItem.id), session)).all()
+        if len(rows) == 0:
+            return [], 0.0
+        cart_items = [CartItemPricedDTO.model_validate(row, from_attributes=True) for row in rows]
+        return cart_items, rows[0].grand_total
 
     @staticmethod
-    async def get_maximum_page(user_id: int, session: AsyncSession | Session) -> int:
-        max_page = len(await CartItemRepository.get_all_by_user_id(user_id, session))
-        if max_page % config.PAGE_ENTRIES == 0:
-            return max_page / config.PAGE_ENTRIES - 1
-        else:
-            return math.trunc(max_page / config.PAGE_ENTRIES)
+    async def get_priced_page_by_user_id(user_id: int, page: str,
+                                         session: AsyncSession) -> tuple[list[CartItemPricedDTO], KeysetPagination]:
+        pagination = KeysetPagination(page, CartItem.id)
+        stmt = pagination.apply(CartItemRepository.__select_priced(user_id))
+        rows = pagination.build((await session_execute(stmt, session)).all())
+        return [CartItemPricedDTO.model_validate(row, from_attributes=True) for row in rows], pagination
 
     @staticmethod
-    async def get_all_by_user_id(user_id: int, session: AsyncSession | Session) -> list[CartItemDTO]:
-        stmt = select(CartItem).join(Cart, CartItem.cart_id == Cart.id).where(Cart.user_id == user_id)
+    async def get_all_by_user_id(user_id: int, session: AsyncSession) -> list[CartItemDTO]:
+        stmt = (select(*dto_columns(CartItem, CartItemDTO))
+                .join(Cart, CartItem.cart_id == Cart.id)
+                .where(Cart.user_id == user_id))
         cart_items = await session_execute(stmt, session)
-        return [CartItemDTO.model_validate(cart_item, from_attributes=True) for cart_item in
-                cart_items.scalars().all()]
+        return construct_dtos(CartItemDTO, cart_items.keys(), cart_items)
 
     @staticmethod
-    async def remove_from_cart(cart_item_id: int, session: AsyncSession | Session):
+    async def remove_from_cart(cart_item_id: int, session: AsyncSession):
         stmt = delete(CartItem).where(CartItem.id == cart_item_id)
         await session_execute(stmt, session)
+
+    @staticmethod
+    async def remove_many_from_cart(cart_item_id_list: list[int], session: AsyncSession):
+        stmt = delete(CartItem).where(CartItem.id.in_(cart_item_id_list))
+        await session_execute(stmt, session)
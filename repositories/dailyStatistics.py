@@ -0,0 +1,153 @@
+import datetime
+
+from sqlalchemy import select, func, update, delete, Date, Select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db import session_execute
+from models.buy import Buy, BuyDTO, SalesStatisticsDTO
+from models.dailyStatistics import DailySales, DailyDeposits, DailyUsers
+from models.deposit import Deposit, DepositDTO, DepositStatisticsDTO
+from models.user import User
+
+REVENUE_TOLERANCE = 0.005
+
+
+class DailyStatisticsRepository:
+
+    @staticmethod
+    async def add_buys(buy_dto_list: list[BuyDTO], session: AsyncSession):
+        # The buys were just created, their buy_datetime is CURRENT_TIMESTAMP.
+        stmt = insert(DailySales).values(day=func.current_date(),
+                                         buys_count=len(buy_dto_list),
+                                         items_sold=sum(buy_dto.quantity for buy_dto in buy_dto_list),
+                                         revenue=sum(buy_dto.total_price for buy_dto in buy_dto_list))
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[DailySales.day],
+            set_={"buys_count": DailySales.buys_count + stmt.excluded.buys_count,
+                  "items_sold": DailySales.items_sold + stmt.excluded.items_sold,
+                  "revenue": DailySales.revenue + stmt.excluded.revenue})
+        await session_execute(stmt, session)
+
+    @staticmethod
+    async def subtract_refunded_buy(buy_dto: BuyDTO, session: AsyncSession):
+        stmt = (update(DailySales)
+                .where(DailySales.day == buy_dto.buy_datetime.date())
+                .values(buys_count=DailySales.buys_count - 1,
+                        items_sold=DailySales.items_sold - buy_dto.quantity,
+                        revenue=DailySales.revenue - buy_dto.total_price))
+        await session_execute(stmt, session)
+
+    @staticmethod
+    async def add_deposit(deposit_dto: DepositDTO, session: AsyncSession):
+        stmt = insert(DailyDeposits).values(day=func.current_date(),
+                                            network=deposit_dto.network,
+                                            token_name=deposit_dto.token_name or "",
+                                            deposits_count=1,
+                                            amount=deposit_dto.amount)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[DailyDeposits.day, DailyDeposits.network, DailyDeposits.token_name],
+            set_={"deposits_count": DailyDeposits.deposits_count + stmt.excluded.deposits_count,
+                  "amount": DailyDeposits.amount + stmt.excluded.amount})
+        await session_execute(stmt, session)
+
+    @staticmethod
+    async def add_user(session: AsyncSession):
+        stmt = insert(DailyUsers).values(day=func.current_date(), new_users=1)
+        stmt = stmt.on_conflict_do_update(index_elements=[DailyUsers.day],
+                                          set_={"new_users": DailyUsers.new_users + 1})
+        await session_execute(stmt, session)
+
+    @staticmethod
+    async def get_sales(start: datetime.date, end: datetime.date, session: AsyncSession) -> SalesStatisticsDTO:
+        stmt = (select(func.coalesce(func.sum(DailySales.buys_count), 0).label("buys_count"),
+                       func.coalesce(func.sum(DailySales.items_sold), 0).label("items_sold"),
+                       func.coalesce(func.sum(DailySales.revenue), 0.0).label("total_profit"))
+                .where(DailySales.day.between(start, end)))
+        sales = await session_execute(stmt, session)
+        return SalesStatisticsDTO.model_validate(sales.one(), from_attributes=True)
+
+    @staticmethod
+    async def get_deposits(start: datetime.date, end: datetime.date,
+                           session: AsyncSession) -> list[DepositStatisticsDTO]:
+        stmt = (select(DailyDeposits.network,
+                       func.nullif(DailyDeposits.token_name, "").label("token_name"),
+                       func.sum(DailyDeposits.deposits_count).label("deposits_count"),
+                       func.sum(DailyDeposits.amount).label("amount"))
+                .where(DailyDeposits.day.between(start, end))
+                .group_by(DailyDeposits.network, DailyDeposits.token_name))
+        deposits = await session_execute(stmt, session)
+        return [DepositStatisticsDTO.model_validate(row, from_attributes=True) for row in deposits.all()]
+
+    @staticmethod
+    async def get_new_users_count(start: datetime.date, end: datetime.date, session: AsyncSession) -> int:
+        stmt = (select(func.coalesce(func.sum(DailyUsers.new_users), 0))
+                .where(DailyUsers.day.between(start, end)))
+        new_users = await session_execute(stmt, session)
+        return new_users.scalar_one()
+
+    @staticmethod
+    def __sales_by_day() -> Select:
+        buy_day = func.date(Buy.buy_datetime, type_=Date)
+        return (select(buy_day, func.count(), func.sum(Buy.quantity), func.sum(Buy.total_price))
+                .where(Buy.is_refunded == False, Buy.buy_datetime != None)
+                .group_by(buy_day))
+
+    @staticmethod
+    def __deposits_by_day() -> Select:
+        deposit_day = func.date(Deposit.deposit_datetime, type_=Date)
+        token_name = func.coalesce(Deposit.token_name, "")
+        return (select(deposit_day, Deposit.network, token_name, func.count(), func.sum(Deposit.amount))
+                .where(Deposit.deposit_datetime != None)
+                .group_by(deposit_day, Deposit.network, token_name))
+
+    @staticmethod
+    def __users_by_day() -> Select:
+        registration_day = func.date(User.registered_at, type_=Date)
+        return (select(registration_day, func.count())
+                .where(User.registered_at != None)
+                .group_by(registration_day))
+
+    @staticmethod
+    async def __rows_by_key(stmt: Select, key_length: int, session: AsyncSession) -> dict[tuple, tuple]:
+        rows = await session_execute(stmt, session)
+        return {tuple(row[:key_length]): tuple(row[key_length:]) for row in rows.all()}
+
+    @staticmethod
+    async def is_consistent(session: AsyncSession) -> bool:
+        """
+        Compares every rollup row with the aggregate of the raw rows of its day (and network and token).
+        A missing row counts as zeros, a day whose buys were all refunded keeps a rollup row of zeros.
+        """
+        rollups = [
+            (DailyStatisticsRepository.__sales_by_day(),
+             select(DailySales.day, DailySales.buys_count, DailySales.items_sold, DailySales.revenue), 1),
+            (DailyStatisticsRepository.__deposits_by_day(),
+             select(DailyDeposits.day, DailyDeposits.network, DailyDeposits.token_name,
+                    DailyDeposits.deposits_count, DailyDeposits.amount), 3),
+            (DailyStatisticsRepository.__users_by_day(), select(DailyUsers.day, DailyUsers.new_users), 1),
+        ]
+        for actual, rollup, key_length in rollups:
+            zeros = (0,) * (len(rollup.selected_columns) - key_length)
+            actual = await DailyStatisticsRepository.__rows_by_key(actual, key_length, session)
+            rollup = await DailyStatisticsRepository.__rows_by_key(rollup, key_length, session)
+            for key in actual.keys() | rollup.keys():
+                # The revenue is a float the rollup added up in a different order than SUM() does.
+                if any(abs(actual_value - rollup_value) >= REVENUE_TOLERANCE
+                       for actual_value, rollup_value in zip(actual.get(key, zeros), rollup.get(key, zeros))):
+                    return False
+        return True
+
+    @staticmethod
+    async def rebuild(session: AsyncSession):
+        """Backfills the rollups from the buys, deposits and users."""
+        for table in [DailySales, DailyDeposits, DailyUsers]:
+            await session_execute(delete(table), session)
+        stmt = insert(DailySales).from_select(["day", "buys_count", "items_sold", "revenue"],
+                                              DailyStatisticsRepository.__sales_by_day())
+        await session_execute(stmt, session)
+        stmt = insert(DailyDeposits).from_select(["day", "network", "token_name", "deposits_count", "amount"],
+                                                 DailyStatisticsRepository.__deposits_by_day())
+        await session_execute(stmt, session)
+        stmt = insert(DailyUsers).from_select(["day", "new_users"], DailyStatisticsRepository.__users_by_day())
+        await session_execute(stmt, session)
@@ -1,16 +1,38 @@
-from sqlalchemy import select, func, update, delete
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, func, update, delete, or_, ColumnElement, bindparam, Subquery
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import Session
 
+import config
 from db import session_execute
+from models.base import construct_dtos, dto_columns
 from models.buyItem import BuyItem
+from models.category import Category
 from models.item import Item, ItemDTO
+from models.stockSummary import StockSummaryNamedDTO
+from models.subcategory import Subcategory
 
 
 class ItemRepository:
 
     @staticmethod
-    async def get_price(item_dto: ItemDTO, session: Session | AsyncSession) -> float:
+    def is_available(now: datetime) -> ColumnElement[bool]:
+        """Unsold and not held for a cart line, an expired hold doesn't block the item."""
+        return (Item.is_sold == False) & or_(Item.reserved_cart_item_id == None, Item.reserved_until < now)
+
+    @staticmethod
+    def select_held_qty(now: datetime) -> Subquery:
+        """
+        The number of unsold items per (sub-)category held for cart lines, which are not available.
+        The stock summary counts them as unsold, its readers subtract them.
+        """
+        return (select(Item.category_id, Item.subcategory_id, func.count(Item.id).label("held_qty"))
+                .where(Item.is_sold == False, Item.reserved_cart_item_id != None, Item.reserved_until >= now)
+                .group_by(Item.category_id, Item.subcategory_id)
+                .subquery())
+
+    @staticmethod
+    async def get_price(item_dto: ItemDTO, session: AsyncSession) -> float:
         stmt = (select(Item.price)
                 .where(Item.category_id == item_dto.category_id,
                        Item.subcategory_id == item_dto.subcategory_id)
@@ -19,17 +41,17 @@ class ItemRepository:
         return price.scalar()
 
     @staticmethod
-    async def get_available_qty(item_dto: ItemDTO, session: Session | AsyncSession) -> int:
+    async def get_available_qty(item_dto: ItemDTO, session: AsyncSession) -> int:
         sub_stmt = (select(Item)
                     .where(Item.category_id == item_dto.category_id,
                            Item.subcategory_id == item_dto.subcategory_id,
-                           Item.is_sold == False))
-        stmt = select(func.count()).select_from(sub_stmt)
+                           ItemRepository.is_available(datetime.now())))
+        stmt = select(func.count()).select_from(sub_stmt.subquery())
         available_qty = await session_execute(stmt, session)
         return available_qty.scalar()
 
     @staticmethod
-    async def get_single(category_id: int, subcategory_id: int, session: Session | AsyncSession):
+    async def get_single(category_id: int, subcategory_id: int, session: AsyncSession):
         stmt = (select(Item)
                 .where(Item.category_id == category_id,
                        Item.subcategory_id == subcategory_id,
@@ -39,65 +61,159 @@ class ItemRepository:
         return ItemDTO.model_validate(item.scalar(), from_attributes=True)
 
     @staticmethod
-    async def get_by_id(item_id: int, session: Session | AsyncSession) -> ItemDTO:
+    async def get_by_id(item_id: int, session: AsyncSession) -> ItemDTO:
         stmt = select(Item).where(Item.id == item_id)
         item = await session_execute(stmt, session)
         return ItemDTO.model_validate(item.scalar(), from_attributes=True)
 
     @staticmethod
-    async def get_purchased_items(category_id: int, subcategory_id: int, quantity: int, session: Session | AsyncSession) -> list[ItemDTO]:
-        stmt = (select(Item)
-                .where(Item.category_id == category_id, Item.subcategory_id == subcategory_id,
-                       Item.is_sold == False).limit(quantity))
+    async def claim_unsold(category_id: int, subcategory_id: int, quantity: int,
+                           session: AsyncSession) -> list[ItemDTO]:
+        """
+        Marks up to quantity available items of the (sub-)category as sold in one statement and returns them,
+        fewer items are returned if there are not enough in stock.
+        """
+        now = datetime.now()
+        available_ids = (select(Item.id)
+                         .where(Item.category_id == category_id, Item.subcategory_id == subcategory_id,
+                                ItemRepository.is_available(now))
+                         .order_by(Item.id)
+                         .limit(quantity))
+        stmt = (update(Item)
+                # The availability is checked again on the updated rows, an item taken by a concurrent
+                # transaction after the subquery ran is skipped.
+                .where(Item.id.in_(available_ids), ItemRepository.is_available(now))
+                .values(is_sold=True, reserved_cart_item_id=None, reserved_until=None)
+                .returning(*dto_columns(Item, ItemDTO))
+                .execution_options(synchronize_session=False))
+        items = await session_execute(stmt, session)
+        return construct_dtos(ItemDTO, items.keys(), sorted(items.all(), key=lambda item: item.id))
+
+    @staticmethod
+    async def reserve(cart_item_id: int, category_id: int, subcategory_id: int, quantity: int,
+                      session: AsyncSession) -> int:
+        """
+        Holds quantity items of the (sub-)category for the cart line until the reservation TTL expires.
+        Existing holds of the line are extended and only the missing items are reserved.
+        Returns the number of held items, which is less than quantity if there are not enough in stock.
+        """
+        now = datetime.now()
+        reserved_until = now + timedelta(minutes=config.RESERVATION_TTL_MINUTES)
+        stmt = (update(Item)
+                .where(Item.reserved_cart_item_id == cart_item_id, Item.is_sold == False)
+                .values(reserved_until=reserved_until)
+                .execution_options(synchronize_session=False))
+        held_qty = (await session_execute(stmt, session)).rowcount
+        if held_qty < quantity:
+            available_ids = (select(Item.id)
+                             .where(Item.category_id == category_id, Item.subcategory_id == subcategory_id,
+                                    ItemRepository.is_available(now))
+                             .order_by(Item.id)
+                             .limit(quantity - held_qty))
+            stmt = (update(Item)
+                    .where(Item.id.in_(available_ids), ItemRepository.is_available(now))
+                    .values(reserved_cart_item_id=cart_item_id, reserved_until=reserved_until)
+                    .execution_options(synchronize_session=False))
+            held_qty += (await session_execute(stmt, session)).rowcount
+        return held_qty
+
+    @staticmethod
+    async def sell_reserved(cart_item_id: int, session: AsyncSession) -> list[ItemDTO]:
+        """
+        Marks the items held for the cart line as sold and returns them.
+        A hold that expired but wasn't taken by another line still belongs to the cart line.
+        """
+        stmt = (update(Item)
+                .where(Item.reserved_cart_item_id == cart_item_id, Item.is_sold == False)
+                .values(is_sold=True, reserved_cart_item_id=None, reserved_until=None)
+                .returning(*dto_columns(Item, ItemDTO))
+                .execution_options(synchronize_session=False))
         items = await session_execute(stmt, session)
-        return [ItemDTO.model_validate(item, from_attributes=True) for item in items.scalars().all()]
+        return construct_dtos(ItemDTO, items.keys(), sorted(items.all(), key=lambda item: item.id))
+
+    @staticmethod
+    async def release_expired_reservations(session: AsyncSession) -> int:
+        stmt = (update(Item)
+                .where(Item.reserved_until < datetime.now())
+                .values(reserved_cart_item_id=None, reserved_until=None)
+                .execution_options(synchronize_session=False))
+        result = await session_execute(stmt, session)
+        return result.rowcount
 
     @staticmethod
-    async def update(item_dto_list: list[ItemDTO], session: Session | AsyncSession):
+    async def update(item_dto_list: list[ItemDTO], session: AsyncSession):
+        """
+        Writes only the changed fields. Items with the same changes are updated by one WHERE id IN statement,
+        items that changed the same fields to different values by one executemany.
+        """
+        changes_by_fields = {}
         for item in item_dto_list:
-            stmt = update(Item).where(Item.id == item.id).values(**item.model_dump())
-            await session_execute(stmt, session)
+            changes = item.get_changes("id")
+            if changes:
+                changes_by_fields.setdefault(tuple(sorted(changes)), []).append((item.id, changes))
+            item.clear_changes()
+        # The Core table runs the statement as a plain executemany instead of an ORM bulk update by primary key.
+        table = Item.__table__
+        for fields, id_changes_list in changes_by_fields.items():
+            first_changes = id_changes_list[0][1]
+            if all(changes == first_changes for _, changes in id_changes_list):
+                stmt = (update(table)
+                        .where(table.c.id.in_([item_id for item_id, _ in id_changes_list]))
+                        .values(**first_changes))
+                await session_execute(stmt, session)
+            else:
+                stmt = (update(table)
+                        .where(table.c.id == bindparam("b_id"))
+                        .values({field: bindparam(f"b_{field}", type_=table.c[field].type) for field in fields}))
+                await session_execute(stmt, session, [{"b_id": item_id, **{f"b_{k}": v for k, v in changes.items()}}
+                                                      for item_id, changes in id_changes_list])
 
     @staticmethod
-    async def get_by_buy_id(buy_id: int, session: Session | AsyncSession) -> list[ItemDTO]:
+    async def get_by_buy_id(buy_id: int, session: AsyncSession) -> list[ItemDTO]:
         stmt = (
-            select(Item)
+            select(*dto_columns(Item, ItemDTO))
             .join(BuyItem, BuyItem.item_id == Item.id)
             .where(BuyItem.buy_id == buy_id)
         )
         result = await session_execute(stmt, session)
-        return [ItemDTO.model_validate(item, from_attributes=True) for item in result.scalars().all()]
+        return construct_dtos(ItemDTO, result.keys(), result)
 
     @staticmethod
-    async def set_not_new(session: Session | AsyncSession):
-        stmt = update(Item).values(is_new=False)
+    async def set_not_new(session: AsyncSession):
+        stmt = update(Item).where(Item.is_new == True).values(is_new=False)
         await session_execute(stmt, session)
 
     @staticmethod
-    async def delete_unsold_by_category_id(entity_id: int, session: Session | AsyncSession):
+    async def delete_unsold_by_category_id(entity_id: int, session: AsyncSession):
         stmt = delete(Item).where(Item.category_id == entity_id, Item.is_sold == False)
         await session_execute(stmt, session)
 
     @staticmethod
-    async def delete_unsold_by_subcategory_id(entity_id: int, session: Session | AsyncSession):
+    async def delete_unsold_by_subcategory_id(entity_id: int, session: AsyncSession):
         stmt = delete(Item).where(Item.subcategory_id == entity_id, Item.is_sold == False)
         await session_execute(stmt, session)
 
     @staticmethod
-    async def add_many(items: list[ItemDTO], session: Session | AsyncSession):
+    async def add_many(items: list[ItemDTO], session: AsyncSession):
         items = [Item(**item.model_dump()) for item in items]
         session.add_all(items)
 
     @staticmethod
-    async def get_new(session: Session | AsyncSession) -> list[ItemDTO]:
-        stmt = select(Item).where(Item.is_new == True)
-        items = await session_execute(stmt, session)
-        return [ItemDTO.model_validate(item, from_attributes=True) for item in items.scalars().all()]
-
-    @staticmethod
-    async def get_in_stock(session: Session | AsyncSession) -> list[ItemDTO]:
-        stmt = select(Item).where(Item.is_sold == False)
-        items = await session_execute(stmt, session)
-        return [ItemDTO.model_validate(item, from_attributes=True) for item in items.scalars().all()]
+    async def get_new_stock(session: AsyncSession) -> list[StockSummaryNamedDTO]:
+        """Counts the new items per (sub-)category, the price is the price of the first new item."""
+        stmt = (select(Item.category_id,
+                       Item.subcategory_id,
+                       Category.name.label("category_name"),
+                       Subcategory.name.label("subcategory_name"),
+                       func.count(Item.id).label("available_qty"),
+                       Item.price,
+                       func.min(Item.id))
+                .join(Category, Category.id == Item.category_id)
+                .join(Subcategory, Subcategory.id == Item.subcategory_id)
+                .where(Item.is_new == True)
+                .group_by(Item.category_id, Item.subcategory_id)
+                .order_by(Item.category_id, Item.subcategory_id))
+        stock = await session_execute(stmt, session)
+        return construct_dtos(StockSummaryNamedDTO, stock.keys(), stock)
 
 
@@ -0,0 +1,136 @@
+from datetime import datetime
+
+from sqlalchemy import select, func, update, delete, bindparam, union_all, and_, case, Select, ColumnElement
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db import session_execute
+from models.base import construct_dtos
+from models.category import Category
+from models.item import Item, ItemDTO
+from models.stockSummary import StockSummary, StockSummaryDTO, StockSummaryNamedDTO
+from models.subcategory import Subcategory
+from repositories.item import ItemRepository
+
+
+class StockSummaryRepository:
+
+    @staticmethod
+    async def add_items(item_dto_list: list[ItemDTO], session: AsyncSession):
+        stock = {}
+        for item in item_dto_list:
+            key = (item.category_id, item.subcategory_id)
+            if key in stock:
+                stock[key].available_qty += 1
+            else:
+                stock[key] = StockSummaryDTO(category_id=item.category_id, subcategory_id=item.subcategory_id,
+                                             available_qty=1, price=item.price)
+        if len(stock) == 0:
+            return
+        stmt = insert(StockSummary)
+        # New items are added after the unsold ones, their price is only used when nothing was in stock.
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[StockSummary.category_id, StockSummary.subcategory_id],
+            set_={"available_qty": StockSummary.available_qty + stmt.excluded.available_qty,
+                  "price": case((StockSummary.available_qty > 0, StockSummary.price), else_=stmt.excluded.price)})
+        await session_execute(stmt, session, [stock_dto.model_dump() for stock_dto in stock.values()])
+
+    @staticmethod
+    async def subtract(stock_dto_list: list[StockSummaryDTO], session: AsyncSession):
+        """
+        Decreases the available quantity of every (sub-)category by the quantity of its DTO
+        and takes the price of the first item that is still unsold.
+        """
+        # The Core table runs the statement as a plain executemany instead of an ORM bulk update by primary key.
+        table = StockSummary.__table__
+        first_unsold_price = (select(Item.price)
+                              .where(Item.category_id == table.c.category_id,
+                                     Item.subcategory_id == table.c.subcategory_id,
+                                     Item.is_sold == False)
+                              .order_by(Item.id)
+                              .limit(1)
+                              .scalar_subquery())
+        stmt = (update(table)
+                .where(table.c.category_id == bindparam("b_category_id"),
+                       table.c.subcategory_id == bindparam("b_subcategory_id"))
+                .values(available_qty=table.c.available_qty - bindparam("b_available_qty"),
+                        price=func.coalesce(first_unsold_price, table.c.price)))
+        await session_execute(stmt, session, [{"b_category_id": stock_dto.category_id,
+                                               "b_subcategory_id": stock_dto.subcategory_id,
+                                               "b_available_qty": stock_dto.available_qty}
+                                              for stock_dto in stock_dto_list])
+
+    @staticmethod
+    async def delete_by_category_id(category_id: int, session: AsyncSession):
+        stmt = delete(StockSummary).where(StockSummary.category_id == category_id)
+        await session_execute(stmt, session)
+
+    @staticmethod
+    async def delete_by_subcategory_id(subcategory_id: int, session: AsyncSession):
+        stmt = delete(StockSummary).where(StockSummary.subcategory_id == subcategory_id)
+        await session_execute(stmt, session)
+
+    @staticmethod
+    def join_available_qty(stmt: Select) -> tuple[Select, ColumnElement[int]]:
+        """
+        Joins the items held for cart lines to a select from the summary and returns the available quantity,
+        the unsold items which are not held, the same count ItemRepository.get_available_qty returns.
+        """
+        held = ItemRepository.select_held_qty(datetime.now())
+        stmt = stmt.outerjoin(held, and_(held.c.category_id == StockSummary.category_id,
+                                         held.c.subcategory_id == StockSummary.subcategory_id))
+        return stmt, StockSummary.available_qty - func.coalesce(held.c.held_qty, 0)
+
+    @staticmethod
+    async def get_in_stock(session: AsyncSession) -> list[StockSummaryNamedDTO]:
+        stmt, available_qty = StockSummaryRepository.join_available_qty(
+            select(StockSummary.category_id,
+                   StockSummary.subcategory_id,
+                   Category.name.label("category_name"),
+                   Subcategory.name.label("subcategory_name"),
+                   StockSummary.price)
+            .join(Category, Category.id == StockSummary.category_id)
+            .join(Subcategory, Subcategory.id == StockSummary.subcategory_id))
+        stmt = (stmt.add_columns(available_qty.label("available_qty"))
+                .where(available_qty > 0)
+                .order_by(StockSummary.category_id, StockSummary.subcategory_id))
+        stock = await session_execute(stmt, session)
+        return construct_dtos(StockSummaryNamedDTO, stock.keys(), stock)
+
+    @staticmethod
+    def __select_actual():
+        # SQLite takes the bare price column from the row picked by min(), the first unsold item.
+        actual = (select(Item.category_id,
+                         Item.subcategory_id,
+                         func.count(Item.id).label("available_qty"),
+                         Item.price,
+                         func.min(Item.id))
+                  .where(Item.is_sold == False)
+                  .group_by(Item.category_id, Item.subcategory_id)
+                  .subquery())
+        return select(actual.c.category_id, actual.c.subcategory_id, actual.c.available_qty, actual.c.price)
+
+    @staticmethod
+    async def count_inconsistent(session: AsyncSession) -> int:
+        """Counts the (sub-)categories whose summary differs from the unsold items."""
+        actual = StockSummaryRepository.__select_actual().subquery()
+        summary_matches = and_(StockSummary.category_id == actual.c.category_id,
+                               StockSummary.subcategory_id == actual.c.subcategory_id)
+        missing_or_stale = (select(actual.c.category_id)
+                            .outerjoin(StockSummary, summary_matches)
+                            .where(StockSummary.available_qty.is_distinct_from(actual.c.available_qty)
+                                   | StockSummary.price.is_distinct_from(actual.c.price)))
+        sold_out = (select(StockSummary.category_id)
+                    .outerjoin(actual, summary_matches)
+                    .where(StockSummary.available_qty != 0, actual.c.category_id == None))
+        stmt = select(func.count()).select_from(union_all(missing_or_stale, sold_out).subquery())
+        inconsistent = await session_execute(stmt, session)
+        return inconsistent.scalar_one()
+
+    @staticmethod
+    async def rebuild(session: AsyncSession):
+        await session_execute(delete(StockSummary), session)
+        stmt = insert(StockSummary).from_select(
+            ["category_id", "subcategory_id", "available_qty", "price"],
+            StockSummaryRepository.__select_actual())
+        await session_execute(stmt, session)
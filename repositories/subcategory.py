@@ -1,51 +1,46 @@
-import math
-
-from sqlalchemy import select, func
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import Session
 
-import config
 from db import session_execute, session_flush
-from models.item import Item
-from models.subcategory import Subcategory, SubcategoryDTO
+from models.stockSummary import StockSummary
+from models.subcategory import Subcategory, SubcategoryDTO, SubcategoryStockDTO
+from repositories.stockSummary import StockSummaryRepository
+from utils.keyset_pagination import KeysetPagination
 
 
 class SubcategoryRepository:
     @staticmethod
-    async def get_paginated_by_category_id(category_id: int, page: int, session: Session | AsyncSession) -> list[SubcategoryDTO]:
-        stmt = (select(Subcategory)
-                .join(Item, Item.subcategory_id == Subcategory.id)
-                .where(Item.category_id == category_id, Item.is_sold == False)
-                .distinct()
-                .limit(config.PAGE_ENTRIES)
-                .offset(page * config.PAGE_ENTRIES))
-        subcategories = await session_execute(stmt, session)
-        subcategories = subcategories.scalars().all()
-        return [SubcategoryDTO.model_validate(subcategory, from_attributes=True) for subcategory in subcategories]
-
-    @staticmethod
-    async def max_page(category_id: int, session: Session | AsyncSession) -> int:
-        subquery = (select(Subcategory.id)
-                    .join(Item, Item.subcategory_id == Subcategory.id)
-                    .where(Item.category_id == category_id,
-                           Item.is_sold == False)
-                    .distinct())
-        stmt = select(func.count()).select_from(subquery)
-        maximum_page = await session_execute(stmt, session)
-        maximum_page = maximum_page.scalar_one()
-        if maximum_page % config.PAGE_ENTRIES == 0:
-            return maximum_page / config.PAGE_ENTRIES - 1
-        else:
-            return math.trunc(maximum_page / config.PAGE_ENTRIES)
+    async def get_paginated_with_stock(category_id: int, page: str,
+                                       session: AsyncSession) -> tuple[list[SubcategoryStockDTO], KeysetPagination]:
+        """
+        Returns a page of subcategories with available items in the category together with the price and
+        the number of available items.
+        """
+        pagination = KeysetPagination(page, Subcategory.id)
+        stmt, available_qty = StockSummaryRepository.join_available_qty(
+            select(Subcategory.id,
+                   Subcategory.name,
+                   Subcategory.name_translations,
+                   StockSummary.price)
+            .join(StockSummary, StockSummary.subcategory_id == Subcategory.id))
+        stmt = (stmt.add_columns(available_qty.label("available_qty"))
+                .where(StockSummary.category_id == category_id, available_qty > 0))
+        rows = pagination.build((await session_execute(pagination.apply(stmt), session)).all())
+        subcategories = [SubcategoryStockDTO(id=row.id,
+                                             name=row.name,
+                                             name_translations=row.name_translations,
+                                             price=row.price,
+                                             available_qty=row.available_qty) for row in rows]
+        return subcategories, pagination
 
     @staticmethod
-    async def get_by_id(subcategory_id: int, session: Session | AsyncSession) -> SubcategoryDTO:
+    async def get_by_id(subcategory_id: int, session: AsyncSession) -> SubcategoryDTO:
         stmt = select(Subcategory).where(Subcategory.id == subcategory_id)
         subcategory = await session_execute(stmt, session)
         return SubcategoryDTO.model_validate(subcategory.scalar(), from_attributes=True)
 
     @staticmethod
-    async def get_by_name(name: str, session: Session | AsyncSession) -> SubcategoryDTO | None:
+    async def get_by_name(name: str, session: AsyncSession) -> SubcategoryDTO | None:
         stmt = select(Subcategory).where(Subcategory.name == name)
         result = await session_execute(stmt, session)
         subcategory = result.scalar()
@@ -54,33 +49,18 @@ class SubcategoryRepository:
         return None
 
     @staticmethod
-    async def get_to_delete(page: int, session: Session | AsyncSession) -> list[SubcategoryDTO]:
-        stmt = select(Subcategory).join(Item,
-                                        Item.subcategory_id == Subcategory.id).where(
-            Item.is_sold == 0).distinct().limit(config.PAGE_ENTRIES).offset(
-            page * config.PAGE_ENTRIES).group_by(Subcategory.name)
-        subcategories = await session_execute(stmt, session=session)
+    async def get_to_delete(page: str, session: AsyncSession) -> tuple[list[SubcategoryDTO], KeysetPagination]:
+        pagination = KeysetPagination(page, Subcategory.id)
+        stmt = select(Subcategory).join(StockSummary,
+                                        StockSummary.subcategory_id == Subcategory.id).where(
+            StockSummary.available_qty > 0).distinct()
+        subcategories = await session_execute(pagination.apply(stmt), session=session)
+        subcategories = pagination.build(subcategories.scalars().all())
         return [SubcategoryDTO.model_validate(subcategory, from_attributes=True) for subcategory in
-                subcategories.scalars().all()]
-
-    @staticmethod
-    async def get_maximum_page_to_delete(session: Session | AsyncSession) -> int:
-        unique_categories_subquery = (
-            select(Subcategory.id)
-            .join(Item, Item.subcategory_id == Subcategory.id)
-            .filter(Item.is_sold == 0)
-            .distinct()
-        ).alias('unique_categories')
-        stmt = select(func.count()).select_from(unique_categories_subquery)
-        max_page = await session_execute(stmt, session)
-        max_page = max_page.scalar_one()
-        if max_page % config.PAGE_ENTRIES == 0:
-            return max_page / config.PAGE_ENTRIES - 1
-        else:
-            return math.trunc(max_page / config.PAGE_ENTRIES)
+                subcategories], pagination
 
     @staticmethod
-    async def get_or_create(subcategory_data: dict | str, session: Session | AsyncSession):
+    async def get_or_create(subcategory_data: dict | str, session: AsyncSession):
         if isinstance(subcategory_data, dict):
             sub_name = subcategory_data.get("en")
             translations = {k: v for k, v in subcategory_data.items() if k != "en"}
@@ -1,40 +1,74 @@
 import datetime
-import math
+from functools import partial
 
 from sqlalchemy import select, update, func, or_
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import Session
 
-import config
 from callbacks import StatisticsTimeDelta
-from db import session_execute, session_flush
+from db import session_execute, session_flush, session_after_commit
 
+from models.base import construct_dtos, dto_columns
 from models.user import UserDTO, User
 from utils.CryptoAddressGenerator import CryptoAddressGenerator
+from utils.keyset_pagination import KeysetPagination
+from utils.user_cache import UserCache
 
 
 class UserRepository:
     @staticmethod
-    async def get_by_tgid(telegram_id: int, session: AsyncSession | Session) -> UserDTO | None:
-        stmt = select(User).where(User.telegram_id == telegram_id)
-        user = await session_execute(stmt, session)
-        user = user.scalar()
-        if user is not None:
-            return UserDTO.model_validate(user, from_attributes=True)
+    def __forget(telegram_id_list: list[int], session: AsyncSession, user_dto: UserDTO | None = None):
+        """
+        Drops the changed users from the users loaded in the session, unless the loaded DTO itself was updated.
+        The session reads them from the database until the transaction is committed,
+        then their cached copies are deleted.
+        """
+        users = session.info.setdefault("users", {})
+        for telegram_id in telegram_id_list:
+            if users.get(telegram_id) is not user_dto:
+                users.pop(telegram_id, None)
+        session.info.setdefault("changed_users", set()).update(telegram_id_list)
+        session_after_commit(session, partial(UserCache.delete, list(telegram_id_list)))
+
+    @staticmethod
+    async def get_by_tgid(telegram_id: int, session: AsyncSession, use_cache: bool = True) -> UserDTO | None:
+        """
+        A user is loaded once per session and shared by the middlewares, filters and handlers of the update.
+        Users the transaction didn't change are looked up in the user cache before the database.
+        Users from the cache have no balances and no seed, paths that read them pass use_cache=False
+        and get the user from the database, even if the session already holds its cached copy.
+        """
+        users = session.info.setdefault("users", {})
+        cached_users = session.info.setdefault("cached_users", set())
+        if telegram_id in users and (use_cache or telegram_id not in cached_users):
+            return users[telegram_id]
+        is_changed = telegram_id in session.info.get("changed_users", ())
+        user = None if is_changed or not use_cache else await UserCache.get(telegram_id)
+        if user is None:
+            cached_users.discard(telegram_id)
+            stmt = select(User).where(User.telegram_id == telegram_id)
+            user = await session_execute(stmt, session)
+            user = user.scalar()
+            if user is not None:
+                user = UserDTO.model_validate(user, from_attributes=True)
+                if not is_changed:
+                    await UserCache.set(user)
         else:
-            return user
+            cached_users.add(telegram_id)
+        users[telegram_id] = user
+        return user
 
     @staticmethod
-    async def update(user_dto: UserDTO, session: Session | AsyncSession) -> None:
-        user_dto_dict = user_dto.model_dump()
-        none_keys = [k for k, v in user_dto_dict.items() if v is None]
-        for k in none_keys:
-            user_dto_dict.pop(k)
-        stmt = update(User).where(User.telegram_id == user_dto.telegram_id).values(**user_dto_dict)
-        await session_execute(stmt, session)
+    async def update(user_dto: UserDTO, session: AsyncSession) -> None:
+        """Writes only the fields changed since the user was loaded, nothing if none changed."""
+        changes = user_dto.get_changes("id", "telegram_id")
+        if changes:
+            stmt = update(User).where(User.telegram_id == user_dto.telegram_id).values(**changes)
+            await session_execute(stmt, session)
+            UserRepository.__forget([user_dto.telegram_id], session, user_dto)
+        user_dto.clear_changes()
 
     @staticmethod
-    async def create(user_dto: UserDTO, session: Session | AsyncSession) -> int:
+    async def create(user_dto: UserDTO, session: AsyncSession) -> int:
         crypto_addr_gen = CryptoAddressGenerator()
         crypto_addresses = crypto_addr_gen.get_addresses()
         user_dto.btc_address = crypto_addresses['btc']
@@ -46,22 +80,57 @@ class UserRepository:
         user = User(**user_dto.__dict__)
         session.add(user)
         await session_flush(session)
+        UserRepository.__forget([user_dto.telegram_id], session)
         return user.id
 
     @staticmethod
-    async def get_active(session: Session | AsyncSession) -> list[UserDTO]:
-        stmt = select(User).where(User.can_receive_messages == True)
+    async def charge(user_id: int, amount: float, session: AsyncSession) -> bool:
+        """
+        Adds amount to the consumed balance if the user's balance covers it, checked and updated in one statement
+        so concurrent checkouts can't spend the same balance twice.
+        """
+        stmt = (update(User)
+                .where(User.id == user_id, User.top_up_amount - User.consume_records >= amount)
+                .values(consume_records=User.consume_records + amount)
+                .returning(User.telegram_id))
+        telegram_id = await session_execute(stmt, session)
+        telegram_id = telegram_id.scalar()
+        if telegram_id is None:
+            return False
+        UserRepository.__forget([telegram_id], session)
+        return True
+
+    @staticmethod
+    async def refund(user_id: int, amount: float, session: AsyncSession) -> None:
+        """Subtracts amount from the consumed balance in one statement, a cached copy of the user can't be stale."""
+        stmt = (update(User)
+                .where(User.id == user_id)
+                .values(consume_records=User.consume_records - amount)
+                .returning(User.telegram_id))
+        telegram_id = await session_execute(stmt, session)
+        UserRepository.__forget([telegram_id.scalar_one()], session)
+
+    @staticmethod
+    async def disable_messages(telegram_id_list: list[int], session: AsyncSession) -> None:
+        stmt = update(User).where(User.telegram_id.in_(telegram_id_list)).values(can_receive_messages=False)
+        await session_execute(stmt, session)
+        UserRepository.__forget(telegram_id_list, session)
+
+    @staticmethod
+    async def get_active(session: AsyncSession) -> list[UserDTO]:
+        """Only id and telegram_id are loaded, an announcement needs nothing else."""
+        stmt = select(User.id, User.telegram_id).where(User.can_receive_messages == True)
         users = await session_execute(stmt, session)
-        return [UserDTO.model_validate(user, from_attributes=True) for user in users.scalars().all()]
+        return construct_dtos(UserDTO, users.keys(), users)
 
     @staticmethod
-    async def get_all_count(session: Session | AsyncSession) -> int:
+    async def get_all_count(session: AsyncSession) -> int:
         stmt = func.count(User.id)
         users_count = await session_execute(stmt, session)
         return users_count.scalar_one()
 
     @staticmethod
-    async def get_user_entity(user_entity: int | str, session: Session | AsyncSession) -> UserDTO | None:
+    async def get_user_entity(user_entity: int | str, session: AsyncSession) -> UserDTO | None:
         stmt = select(User).where(or_(User.telegram_id == user_entity, User.telegram_username == user_entity,
                                       User.id == user_entity))
         user = await session_execute(stmt, session)
@@ -72,30 +141,13 @@ class UserRepository:
             return UserDTO.model_validate(user, from_attributes=True)
 
     @staticmethod
-    async def get_by_timedelta(timedelta: StatisticsTimeDelta, page: int, session: Session | AsyncSession) -> tuple[list[UserDTO], int]:
+    async def get_by_timedelta(timedelta: StatisticsTimeDelta, page: str,
+                               session: AsyncSession) -> tuple[list[UserDTO], KeysetPagination]:
         current_time = datetime.datetime.now()
         timedelta = datetime.timedelta(days=timedelta.value)
         time_interval = current_time - timedelta
-        users_stmt = (select(User)
-                      .where(User.registered_at >= time_interval, User.telegram_username != None)
-                      .limit(config.PAGE_ENTRIES)
-                      .offset(config.PAGE_ENTRIES * page))
-        users_count_stmt = select(func.count(User.id)).where(User.registered_at >= time_interval)
-        users = await session_execute(users_stmt, session)
-        users = [UserDTO.model_validate(user, from_attributes=True) for user in users.scalars().all()]
-        users_count = await session_execute(users_count_stmt, session)
-        return users, users_count.scalar_one()
-
-    @staticmethod
-    async def get_max_page_by_timedelta(timedelta: StatisticsTimeDelta, session: Session | AsyncSession) -> int:
-        current_time = datetime.datetime.now()
-        timedelta = datetime.timedelta(days=timedelta.value)
-        time_interval = current_time - timedelta
-        stmt = select(func.count(User.id)).where(User.registered_at >= time_interval,
-                                                 User.telegram_username != None)
-        users = await session_execute(stmt, session)
-        users = users.scalar_one()
-        if users % config.PAGE_ENTRIES == 0:
-            return users / config.PAGE_ENTRIES - 1
-        else:
-            return math.trunc(users / config.PAGE_ENTRIES)
+        pagination = KeysetPagination(page, User.id)
+        users_stmt = (select(*dto_columns(User, UserDTO))
+                      .where(User.registered_at >= time_interval, User.telegram_username != None))
+        users = await session_execute(pagination.apply(users_stmt), session)
+        return construct_dtos(UserDTO, users.keys(), pagination.build(users.all())), pagination
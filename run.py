@@ -3,9 +3,7 @@ from aiogram import types, F, Router
 from aiogram.filters import Command
 from aiogram.types import ErrorEvent, Message, BufferedInputFile
 from aiogram.utils.keyboard import InlineKeyboardBuilder
-from pathlib import Path
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import Session
 
 import config
 from config import SUPPORT_LINK
@@ -24,18 +22,19 @@ from handlers.user.all_categories import all_categories_router
 from handlers.user.my_profile import my_profile_router
 from services.notification import NotificationService
 from services.user import UserService
-from utils.custom_filters import IsUserExistFilter
+from utils.custom_filters import IsUserExistFilter, ReplyButtonFilter
+from utils.keyboard_cache import KeyboardCache
 from utils.localizator import Localizator
-from db import session_commit
+from db import session_mark_dirty
 from callbacks import LanguageCallback
 from callbacks import LanguageCallback, CurrencyCallback
-from enums.currency import Currency
+from enums.currency import Currency, CURRENCY_CODES
 
 logging.basicConfig(level=logging.INFO)
 main_router = Router()
 
 
-def get_currency_keyboard() -> types.ReplyKeyboardMarkup:
+def build_currency_keyboard() -> types.ReplyKeyboardMarkup:
     buttons = [types.KeyboardButton(text=c.value) for c in Currency]
     keyboard: list[list[types.KeyboardButton]] = []
     row: list[types.KeyboardButton] = []
@@ -49,7 +48,11 @@ def get_currency_keyboard() -> types.ReplyKeyboardMarkup:
     return types.ReplyKeyboardMarkup(resize_keyboard=True, keyboard=keyboard)
 
 
-def get_main_menu(telegram_id: int) -> types.ReplyKeyboardMarkup:
+def get_currency_keyboard() -> types.ReplyKeyboardMarkup:
+    return KeyboardCache.get("currency", build_currency_keyboard)
+
+
+def build_main_menu(is_admin: bool) -> types.ReplyKeyboardMarkup:
     all_categories_button = types.KeyboardButton(text=Localizator.get_text(BotEntity.USER, "all_categories"))
     my_profile_button = types.KeyboardButton(text=Localizator.get_text(BotEntity.USER, "my_profile"))
     faq_button = types.KeyboardButton(text=Localizator.get_text(BotEntity.USER, "faq"))
@@ -57,30 +60,41 @@ def get_main_menu(telegram_id: int) -> types.ReplyKeyboardMarkup:
     admin_menu_button = types.KeyboardButton(text=Localizator.get_text(BotEntity.ADMIN, "menu"))
     cart_button = types.KeyboardButton(text=Localizator.get_text(BotEntity.USER, "cart"))
     keyboard = [[all_categories_button, my_profile_button], [faq_button, help_button], [cart_button]]
-    if telegram_id in config.ADMIN_ID_LIST:
+    if is_admin:
         keyboard.append([admin_menu_button])
     return types.ReplyKeyboardMarkup(resize_keyboard=True, row_width=2, keyboard=keyboard)
 
 
-@main_router.message(Command(commands=["start"]))
-async def start(message: types.message):
+def get_main_menu(telegram_id: int) -> types.ReplyKeyboardMarkup:
+    is_admin = telegram_id in config.ADMIN_ID_LIST
+    return KeyboardCache.get("main_menu", lambda: build_main_menu(is_admin), is_admin)
+
+
+def build_language_keyboard() -> types.InlineKeyboardMarkup:
     kb_builder = InlineKeyboardBuilder()
-    for lang_file in Path("l10n").glob("*.json"):
-        code = lang_file.stem
+    for code in Localizator.get_languages():
         kb_builder.button(text=code, callback_data=LanguageCallback.create(code).pack())
-    await message.answer(Localizator.get_text(BotEntity.COMMON, "choose_language"), reply_markup=kb_builder.as_markup())
+    return kb_builder.as_markup()
+
+
+@main_router.message(Command(commands=["start"]))
+async def start(message: types.message):
+    await message.answer(Localizator.get_text(BotEntity.COMMON, "choose_language"),
+                         reply_markup=KeyboardCache.get("language", build_language_keyboard))
 
 
 @main_router.callback_query(LanguageCallback.filter())
-async def set_language(callback: types.CallbackQuery, callback_data: LanguageCallback, session: AsyncSession | Session):
+async def set_language(callback: types.CallbackQuery, callback_data: LanguageCallback, session: AsyncSession):
     telegram_id = callback.from_user.id
     await UserService.create_if_not_exist(UserDTO(
         telegram_username=callback.from_user.username,
         telegram_id=telegram_id,
         language=callback_data.code
     ), session)
-    await UserRepository.update(UserDTO(telegram_id=telegram_id, language=callback_data.code), session)
-    await session_commit(session)
+    user = await UserRepository.get_by_tgid(telegram_id, session)
+    user.language = callback_data.code
+    await UserRepository.update(user, session)
+    session_mark_dirty(session)
     Localizator.set_language(callback_data.code)
     currency_list = Localizator.get_currency_list_text()
     msg = Localizator.get_text(BotEntity.COMMON, "choose_currency").format(
@@ -92,18 +106,21 @@ async def set_language(callback: types.CallbackQuery, callback_data: LanguageCal
     )
 
 
-@main_router.message(lambda message: message.text in [c.value for c in Currency])
-async def set_currency(message: types.Message, session: AsyncSession | Session):
+@main_router.message(lambda message: message.text in CURRENCY_CODES)
+async def set_currency(message: types.Message, session: AsyncSession):
     currency_code = message.text
-    await UserRepository.update(UserDTO(telegram_id=message.from_user.id, currency=currency_code), session)
-    await session_commit(session)
+    user = await UserRepository.get_by_tgid(message.from_user.id, session)
+    if user is not None:
+        user.currency = currency_code
+        await UserRepository.update(user, session)
+        session_mark_dirty(session)
     Localizator.set_currency(currency_code)
     start_markup = get_main_menu(message.from_user.id)
     await message.answer(Localizator.get_text(BotEntity.COMMON, "start_message"), reply_markup=start_markup)
 
 
 @main_router.message(Command(commands=["help"]))
-async def cmd_help(message: types.Message, session: AsyncSession | Session):
+async def cmd_help(message: types.Message, session: AsyncSession):
     telegram_id = message.from_user.id
     await UserService.create_if_not_exist(UserDTO(
         telegram_username=message.from_user.username,
@@ -113,13 +130,13 @@ async def cmd_help(message: types.Message, session: AsyncSession | Session):
     await message.answer(Localizator.get_text(BotEntity.COMMON, "start_message"), reply_markup=start_markup)
 
 
-@main_router.message(lambda message: message.text == Localizator.get_text(BotEntity.USER, "faq"),
+@main_router.message(ReplyButtonFilter(BotEntity.USER, "faq"),
                      IsUserExistFilter())
 async def faq(message: types.message):
     await message.answer(Localizator.get_text(BotEntity.USER, "faq_string"))
 
 
-@main_router.message(lambda message: message.text == Localizator.get_text(BotEntity.USER, "help"),
+@main_router.message(ReplyButtonFilter(BotEntity.USER, "help"),
                      IsUserExistFilter())
 async def support(message: types.message):
     admin_keyboard_builder = InlineKeyboardBuilder()
@@ -157,8 +174,9 @@ main_router.include_routers(users_routers)
 
 dp.message.outer_middleware(DBSessionMiddleware())
 dp.callback_query.outer_middleware(DBSessionMiddleware())
-dp.message.outer_middleware(LocalizationMiddleware())
-dp.callback_query.outer_middleware(LocalizationMiddleware())
+# Inner middleware, the user's language is looked up only for updates that matched a handler.
+dp.message.middleware(LocalizationMiddleware())
+dp.callback_query.middleware(LocalizationMiddleware())
 
 if __name__ == '__main__':
     if config.MULTIBOT:
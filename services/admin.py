@@ -1,30 +1,48 @@
 import asyncio
+import datetime
 import logging
 from aiogram.exceptions import TelegramForbiddenError
 from aiogram.fsm.context import FSMContext
 from aiogram.types import CallbackQuery, Message
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import Session
 
 from callbacks import AdminAnnouncementCallback, AnnouncementType, AdminInventoryManagementCallback, EntityType, \
     AddType, UserManagementCallback, UserManagementOperation, StatisticsCallback, StatisticsEntity, StatisticsTimeDelta, \
     WalletCallback
 from crypto_api.CryptoApiManager import CryptoApiManager
-from db import session_commit
+from db import session_commit, session_mark_dirty
 from enums.bot_entity import BotEntity
 from enums.cryptocurrency import Cryptocurrency
-from handlers.admin.constants import AdminConstants, AdminInventoryManagementStates, UserManagementStates
+from handlers.admin.constants import AdminConstants, AdminInventoryManagementStates, UserManagementStates, \
+    StatisticsStates
 from handlers.common.common import add_pagination_buttons
+from models.deposit import DepositStatisticsDTO
 from repositories.buy import BuyRepository
 from repositories.category import CategoryRepository
-from repositories.deposit import DepositRepository
+from repositories.dailyStatistics import DailyStatisticsRepository
 from repositories.item import ItemRepository
+from repositories.stockSummary import StockSummaryRepository
 from repositories.subcategory import SubcategoryRepository
 from repositories.user import UserRepository
+from utils.catalog_cache import CatalogCache
 from utils.localizator import Localizator
+from utils.new_items_manager import NewItemsManager
+from utils.sql_statistics import SQLStatistics
 from utils.translation_helper import get_translated
 
+# Users that blocked the bot during an announcement are written to the database once per this many recipients.
+ANNOUNCEMENT_BATCH_SIZE = 50
+# Deposit amounts of the statistics and the names they are shown with.
+DEPOSIT_AMOUNT_NAMES = {
+    "btc_amount": "BTC",
+    "ltc_amount": "LTC",
+    "sol_amount": "SOL",
+    "usdt_trc20_amount": "USDT TRC20",
+    "usdt_erc20_amount": "USDT ERC20",
+    "usdc_erc20_amount": "USDC ERC20",
+}
+
 
 class AdminService:
 
@@ -37,35 +55,47 @@ class AdminService:
                           callback_data=AdminAnnouncementCallback.create(2, AnnouncementType.RESTOCKING))
         kb_builder.button(text=Localizator.get_text(BotEntity.ADMIN, "stock"),
                           callback_data=AdminAnnouncementCallback.create(2, AnnouncementType.CURRENT_STOCK))
-        kb_builder.row(AdminConstants.back_to_main_button)
+        kb_builder.row(AdminConstants.get_back_to_main_button())
         kb_builder.adjust(1)
         return Localizator.get_text(BotEntity.ADMIN, "announcements"), kb_builder
 
     @staticmethod
-    async def send_announcement(callback: CallbackQuery, session: AsyncSession | Session):
+    async def send_announcement(callback: CallbackQuery, session: AsyncSession):
         unpacked_cb = AdminAnnouncementCallback.unpack(callback.data)
         await callback.message.edit_reply_markup()
         active_users = await UserRepository.get_active(session)
         all_users_count = await UserRepository.get_all_count(session)
+        # Generated announcements may consist of several messages, only the last one is under the confirmation.
+        if unpacked_cb.announcement_type == AnnouncementType.RESTOCKING:
+            msg_parts = await NewItemsManager.generate_restocking_message(session)
+            await ItemRepository.set_not_new(session)
+        elif unpacked_cb.announcement_type == AnnouncementType.CURRENT_STOCK:
+            msg_parts = await NewItemsManager.generate_in_stock_message(session)
+        else:
+            msg_parts = None
+        # Also ends the read transaction, so the session doesn't hold a connection during the broadcast.
+        await session_commit(session)
         counter = 0
-        for user in active_users:
+        unreachable_telegram_ids = []
+        for i, user in enumerate(active_users, start=1):
             try:
-                await callback.message.copy_to(user.telegram_id, reply_markup=None)
+                if msg_parts is None:
+                    await callback.message.copy_to(user.telegram_id, reply_markup=None)
+                else:
+                    for msg in msg_parts:
+                        await callback.bot.send_message(user.telegram_id, msg)
                 counter += 1
                 await asyncio.sleep(1.5)
             except TelegramForbiddenError as e:
                 logging.error(f"TelegramForbiddenError: {e.message}")
-                if "user is deactivated" in e.message.lower():
-                    user.can_receive_messages = False
-                elif "bot was blocked by the user" in e.message.lower():
-                    user.can_receive_messages = False
-                    await UserRepository.update(user, session)
+                if "user is deactivated" in e.message.lower() or "bot was blocked by the user" in e.message.lower():
+                    unreachable_telegram_ids.append(user.telegram_id)
             except Exception as e:
                 logging.error(e)
-            finally:
-                if unpacked_cb.announcement_type == AnnouncementType.RESTOCKING:
-                    await ItemRepository.set_not_new(session)
+            if unreachable_telegram_ids and (i % ANNOUNCEMENT_BATCH_SIZE == 0 or i == len(active_users)):
+                await UserRepository.disable_messages(unreachable_telegram_ids, session)
                 await session_commit(session)
+                unreachable_telegram_ids = []
         return Localizator.get_text(BotEntity.ADMIN, "sending_result").format(counter=counter,
                                                                               len=len(active_users),
                                                                               users_count=all_users_count)
@@ -82,7 +112,7 @@ class AdminService:
                           callback_data=AdminInventoryManagementCallback.create(level=2,
                                                                                 entity_type=EntityType.SUBCATEGORY))
         kb_builder.adjust(1)
-        kb_builder.row(AdminConstants.back_to_main_button)
+        kb_builder.row(AdminConstants.get_back_to_main_button())
         return Localizator.get_text(BotEntity.ADMIN, "inventory_management"), kb_builder
 
     @staticmethod
@@ -98,37 +128,35 @@ class AdminService:
         return Localizator.get_text(BotEntity.ADMIN, "add_items_msg"), kb_builder
 
     @staticmethod
-    async def get_delete_entity_menu(callback: CallbackQuery, session: AsyncSession | Session):
+    async def get_delete_entity_menu(callback: CallbackQuery, session: AsyncSession):
         unpacked_cb = AdminInventoryManagementCallback.unpack(callback.data)
         kb_builder = InlineKeyboardBuilder()
         match unpacked_cb.entity_type:
             case EntityType.CATEGORY:
-                categories = await CategoryRepository.get_to_delete(unpacked_cb.page, session)
+                categories, pagination = await CategoryRepository.get_to_delete(unpacked_cb.page, session)
                 [kb_builder.button(text=get_translated(category.name, category.name_translations), callback_data=AdminInventoryManagementCallback.create(
                     level=3,
                     entity_type=unpacked_cb.entity_type,
                     entity_id=category.id
                 )) for category in categories]
                 kb_builder.adjust(1)
-                kb_builder = await add_pagination_buttons(kb_builder, unpacked_cb,
-                                                          CategoryRepository.get_maximum_page(session),
+                kb_builder = await add_pagination_buttons(kb_builder, unpacked_cb, pagination,
                                                           unpacked_cb.get_back_button(0))
                 return Localizator.get_text(BotEntity.ADMIN, "delete_category"), kb_builder
             case EntityType.SUBCATEGORY:
-                subcategories = await SubcategoryRepository.get_to_delete(unpacked_cb.page, session)
+                subcategories, pagination = await SubcategoryRepository.get_to_delete(unpacked_cb.page, session)
                 [kb_builder.button(text=get_translated(subcategory.name, subcategory.name_translations), callback_data=AdminInventoryManagementCallback.create(
                     level=3,
                     entity_type=unpacked_cb.entity_type,
                     entity_id=subcategory.id
                 )) for subcategory in subcategories]
                 kb_builder.adjust(1)
-                kb_builder = await add_pagination_buttons(kb_builder, unpacked_cb,
-                                                          SubcategoryRepository.get_maximum_page_to_delete(session),
+                kb_builder = await add_pagination_buttons(kb_builder, unpacked_cb, pagination,
                                                           unpacked_cb.get_back_button(0))
                 return Localizator.get_text(BotEntity.ADMIN, "delete_subcategory"), kb_builder
 
     @staticmethod
-    async def delete_confirmation(callback: CallbackQuery, session: AsyncSession | Session) -> tuple[str, InlineKeyboardBuilder]:
+    async def delete_confirmation(callback: CallbackQuery, session: AsyncSession) -> tuple[str, InlineKeyboardBuilder]:
         unpacked_cb = AdminInventoryManagementCallback.unpack(callback.data)
         unpacked_cb.confirmation = True
         kb_builder = InlineKeyboardBuilder()
@@ -151,22 +179,26 @@ class AdminService:
                 ), kb_builder
 
     @staticmethod
-    async def delete_entity(callback: CallbackQuery, session: AsyncSession | Session) -> tuple[str, InlineKeyboardBuilder]:
+    async def delete_entity(callback: CallbackQuery, session: AsyncSession) -> tuple[str, InlineKeyboardBuilder]:
         unpacked_cb = AdminInventoryManagementCallback.unpack(callback.data)
         kb_builder = InlineKeyboardBuilder()
-        kb_builder.row(AdminConstants.back_to_main_button)
+        kb_builder.row(AdminConstants.get_back_to_main_button())
         match unpacked_cb.entity_type:
             case EntityType.CATEGORY:
                 category = await CategoryRepository.get_by_id(unpacked_cb.entity_id, session)
                 await ItemRepository.delete_unsold_by_category_id(unpacked_cb.entity_id, session)
-                await session_commit(session)
+                await StockSummaryRepository.delete_by_category_id(unpacked_cb.entity_id, session)
+                CatalogCache.invalidate(session)
+                session_mark_dirty(session)
                 return Localizator.get_text(BotEntity.ADMIN, "successfully_deleted").format(
                     entity_name=get_translated(category.name, category.name_translations),
                     entity_to_delete=unpacked_cb.entity_type.name.capitalize()), kb_builder
             case EntityType.SUBCATEGORY:
                 subcategory = await SubcategoryRepository.get_by_id(unpacked_cb.entity_id, session)
                 await ItemRepository.delete_unsold_by_subcategory_id(unpacked_cb.entity_id, session)
-                await session_commit(session)
+                await StockSummaryRepository.delete_by_subcategory_id(unpacked_cb.entity_id, session)
+                CatalogCache.invalidate(session)
+                session_mark_dirty(session)
                 return Localizator.get_text(BotEntity.ADMIN, "successfully_deleted").format(
                     entity_name=get_translated(subcategory.name, subcategory.name_translations),
                     entity_to_delete=unpacked_cb.entity_type.name.capitalize()), kb_builder
@@ -195,7 +227,7 @@ class AdminService:
         kb_builder.button(text=Localizator.get_text(BotEntity.ADMIN, "make_refund"),
                           callback_data=UserManagementCallback.create(2))
         kb_builder.adjust(1)
-        kb_builder.row(AdminConstants.back_to_main_button)
+        kb_builder.row(AdminConstants.get_back_to_main_button())
         return Localizator.get_text(BotEntity.ADMIN, "user_management"), kb_builder
 
     @staticmethod
@@ -237,7 +269,7 @@ class AdminService:
                     currency_text=Localizator.get_currency_text()), kb_builder
 
     @staticmethod
-    async def balance_management(message: Message, state: FSMContext, session: AsyncSession | Session) -> str:
+    async def balance_management(message: Message, state: FSMContext, session: AsyncSession) -> str:
         data = await state.get_data()
         await state.clear()
         user = await UserRepository.get_user_entity(data['user_entity'], session)
@@ -247,7 +279,7 @@ class AdminService:
         elif operation == UserManagementOperation.ADD_BALANCE:
             user.top_up_amount += float(message.text)
             await UserRepository.update(user, session)
-            await session_commit(session)
+            session_mark_dirty(session)
             return Localizator.get_text(BotEntity.ADMIN, "credit_management_added_success").format(
                 amount=message.text,
                 telegram_id=user.telegram_id,
@@ -255,17 +287,17 @@ class AdminService:
         else:
             user.consume_records += float(message.text)
             await UserRepository.update(user, session)
-            await session_commit(session)
+            session_mark_dirty(session)
             return Localizator.get_text(BotEntity.ADMIN, "credit_management_reduced_success").format(
                 amount=message.text,
                 telegram_id=user.telegram_id,
                 currency_text=Localizator.get_currency_text())
 
     @staticmethod
-    async def get_refund_menu(callback: CallbackQuery, session: AsyncSession | Session) -> tuple[str, InlineKeyboardBuilder]:
+    async def get_refund_menu(callback: CallbackQuery, session: AsyncSession) -> tuple[str, InlineKeyboardBuilder]:
         unpacked_cb = UserManagementCallback.unpack(callback.data)
         kb_builder = InlineKeyboardBuilder()
-        refund_data = await BuyRepository.get_refund_data(unpacked_cb.page, session)
+        refund_data, pagination = await BuyRepository.get_refund_data(unpacked_cb.page, session)
         for refund_item in refund_data:
             callback = UserManagementCallback.create(
                 unpacked_cb.level + 1,
@@ -288,12 +320,11 @@ class AdminService:
                     currency_sym=Localizator.get_currency_symbol()),
                     callback_data=callback)
         kb_builder.adjust(1)
-        kb_builder = await add_pagination_buttons(kb_builder, unpacked_cb,
-                                                  BuyRepository.get_max_refund_page(session), unpacked_cb.get_back_button(0))
+        kb_builder = await add_pagination_buttons(kb_builder, unpacked_cb, pagination, unpacked_cb.get_back_button(0))
         return Localizator.get_text(BotEntity.ADMIN, "refund_menu"), kb_builder
 
     @staticmethod
-    async def refund_confirmation(callback: CallbackQuery, session: AsyncSession | Session):
+    async def refund_confirmation(callback: CallbackQuery, session: AsyncSession):
         unpacked_cb = UserManagementCallback.unpack(callback.data)
         unpacked_cb.confirmation = True
         kb_builder = InlineKeyboardBuilder()
@@ -328,10 +359,14 @@ class AdminService:
                           callback_data=StatisticsCallback.create(1, StatisticsEntity.BUYS))
         kb_builder.button(text=Localizator.get_text(BotEntity.ADMIN, "deposits_statistics"),
                           callback_data=StatisticsCallback.create(1, StatisticsEntity.DEPOSITS))
+        kb_builder.button(text=Localizator.get_text(BotEntity.ADMIN, "date_range_statistics"),
+                          callback_data=StatisticsCallback.create(5))
         kb_builder.button(text=Localizator.get_text(BotEntity.ADMIN, "get_database_file"),
                           callback_data=StatisticsCallback.create(3))
+        kb_builder.button(text=Localizator.get_text(BotEntity.ADMIN, "sql_statistics"),
+                          callback_data=StatisticsCallback.create(4))
         kb_builder.adjust(1)
-        kb_builder.row(AdminConstants.back_to_main_button)
+        kb_builder.row(AdminConstants.get_back_to_main_button())
         return Localizator.get_text(BotEntity.ADMIN, "pick_statistics_entity"), kb_builder
 
     @staticmethod
@@ -354,88 +389,149 @@ class AdminService:
         return Localizator.get_text(BotEntity.ADMIN, "statistics_timedelta"), kb_builder
 
     @staticmethod
-    async def get_statistics(callback: CallbackQuery, session: AsyncSession | Session):
+    async def get_statistics(callback: CallbackQuery, session: AsyncSession):
         unpacked_cb = StatisticsCallback.unpack(callback.data)
         kb_builder = InlineKeyboardBuilder()
         match unpacked_cb.statistics_entity:
             case StatisticsEntity.USERS:
-                users, users_count = await UserRepository.get_by_timedelta(unpacked_cb.timedelta, unpacked_cb.page, session)
+                users, pagination = await UserRepository.get_by_timedelta(unpacked_cb.timedelta, unpacked_cb.page, session)
                 [kb_builder.button(text=user.telegram_username, url=f't.me/{user.telegram_username}') for user in users
                  if user.telegram_username]
                 kb_builder.adjust(1)
-                kb_builder = await add_pagination_buttons(
-                    kb_builder,
-                    unpacked_cb,
-                    UserRepository.get_max_page_by_timedelta(unpacked_cb.timedelta, session),
-                    None)
-                kb_builder.row(AdminConstants.back_to_main_button, unpacked_cb.get_back_button())
+                kb_builder = await add_pagination_buttons(kb_builder, unpacked_cb, pagination, None)
+                kb_builder.row(AdminConstants.get_back_to_main_button(), unpacked_cb.get_back_button())
                 return Localizator.get_text(BotEntity.ADMIN, "new_users_msg").format(
                     users_count=len(users),
                     timedelta=unpacked_cb.timedelta.value
                 ), kb_builder
             case StatisticsEntity.BUYS:
-                buys = await BuyRepository.get_by_timedelta(unpacked_cb.timedelta, session)
-                total_profit = 0.0
-                items_sold = 0
-                for buy in buys:
-                    total_profit += buy.total_price
-                    items_sold += buy.quantity
-                kb_builder.row(AdminConstants.back_to_main_button, unpacked_cb.get_back_button())
+                start, end = AdminService.__get_statistics_range(unpacked_cb.timedelta)
+                sales = await DailyStatisticsRepository.get_sales(start, end, session)
+                kb_builder.row(AdminConstants.get_back_to_main_button(), unpacked_cb.get_back_button())
                 return Localizator.get_text(BotEntity.ADMIN, "sales_statistics").format(
                     timedelta=unpacked_cb.timedelta,
-                    total_profit=total_profit, items_sold=items_sold,
-                    buys_count=len(buys), currency_sym=Localizator.get_currency_symbol()), kb_builder
+                    total_profit=sales.total_profit, items_sold=sales.items_sold,
+                    buys_count=sales.buys_count, currency_sym=Localizator.get_currency_symbol()), kb_builder
             case StatisticsEntity.DEPOSITS:
-                deposits = await DepositRepository.get_by_timedelta(unpacked_cb.timedelta, session)
-                fiat_amount = 0.0
-                btc_amount = 0.0
-                ltc_amount = 0.0
-                sol_amount = 0.0
-                usdt_trc20_amount = 0.0
-                usdt_erc20_amount = 0.0
-                usdc_erc20_amount = 0.0
-                for deposit in deposits:
-                    match deposit.network:
-                        case "BTC":
-                            btc_amount += deposit.amount / pow(10, 8)
-                        case "LTC":
-                            ltc_amount += deposit.amount / pow(10, 8)
-                        case "SOL":
-                            sol_amount += deposit.amount / pow(10, 9)
-                        case "TRX":
-                            divided_amount = deposit.amount / pow(10, 6)
-                            fiat_amount += divided_amount
-                            usdt_trc20_amount += divided_amount
-                        case "ETH":
-                            divided_amount = deposit.amount / pow(10, 6)
-                            fiat_amount += divided_amount
-                            match deposit.token_name:
-                                case "USDT_ERC20":
-                                    usdt_erc20_amount += divided_amount
-                                case "USDC_ERC20":
-                                    usdc_erc20_amount += divided_amount
+                start, end = AdminService.__get_statistics_range(unpacked_cb.timedelta)
+                deposits = await DailyStatisticsRepository.get_deposits(start, end, session)
+                amounts = AdminService.__sum_deposit_amounts(deposits)
                 btc_price = await CryptoApiManager.get_crypto_prices(Cryptocurrency.BTC)
                 ltc_price = await CryptoApiManager.get_crypto_prices(Cryptocurrency.LTC)
                 sol_price = await CryptoApiManager.get_crypto_prices(Cryptocurrency.SOL)
-                fiat_amount += (btc_amount * btc_price) + (ltc_amount * ltc_price) + (sol_amount * sol_price)
-                kb_builder.row(AdminConstants.back_to_main_button, unpacked_cb.get_back_button())
+                fiat_amount = (amounts["usdt_trc20_amount"] + amounts["usdt_erc20_amount"]
+                               + amounts["usdc_erc20_amount"] + (amounts["btc_amount"] * btc_price)
+                               + (amounts["ltc_amount"] * ltc_price) + (amounts["sol_amount"] * sol_price))
+                kb_builder.row(AdminConstants.get_back_to_main_button(), unpacked_cb.get_back_button())
                 return Localizator.get_text(BotEntity.ADMIN, "deposits_statistics_msg").format(
-                    timedelta=unpacked_cb.timedelta, deposits_count=len(deposits),
-                    btc_amount=btc_amount, ltc_amount=ltc_amount,
-                    sol_amount=sol_amount, usdt_trc20_amount=usdt_trc20_amount,
-                    usdt_erc20_amount=usdt_erc20_amount, usdc_erc20_amount=usdc_erc20_amount, fiat_amount=fiat_amount,
-                    currency_text=Localizator.get_currency_text()), kb_builder
+                    timedelta=unpacked_cb.timedelta,
+                    deposits_count=sum(deposit.deposits_count for deposit in deposits),
+                    fiat_amount=fiat_amount, currency_text=Localizator.get_currency_text(), **amounts), kb_builder
+
+    @staticmethod
+    def __get_statistics_range(timedelta: StatisticsTimeDelta) -> tuple[datetime.date, datetime.date]:
+        # The last timedelta days including today, in UTC like the daily statistics.
+        today = datetime.datetime.now(datetime.timezone.utc).date()
+        return today - datetime.timedelta(days=timedelta.value - 1), today
+
+    @staticmethod
+    def __sum_deposit_amounts(deposits: list[DepositStatisticsDTO]) -> dict[str, float]:
+        """Converts the amounts in the smallest units to coins, keyed by the fields of deposits_statistics_msg."""
+        amounts = dict.fromkeys(DEPOSIT_AMOUNT_NAMES, 0.0)
+        for deposit in deposits:
+            match deposit.network:
+                case "BTC":
+                    amounts["btc_amount"] += deposit.amount / pow(10, 8)
+                case "LTC":
+                    amounts["ltc_amount"] += deposit.amount / pow(10, 8)
+                case "SOL":
+                    amounts["sol_amount"] += deposit.amount / pow(10, 9)
+                case "TRX":
+                    amounts["usdt_trc20_amount"] += deposit.amount / pow(10, 6)
+                case "ETH":
+                    match deposit.token_name:
+                        case "USDT_ERC20":
+                            amounts["usdt_erc20_amount"] += deposit.amount / pow(10, 6)
+                        case "USDC_ERC20":
+                            amounts["usdc_erc20_amount"] += deposit.amount / pow(10, 6)
+        return amounts
+
+    @staticmethod
+    async def request_date_range(state: FSMContext) -> tuple[str, InlineKeyboardBuilder]:
+        kb_builder = InlineKeyboardBuilder()
+        kb_builder.button(text=Localizator.get_text(BotEntity.COMMON, "cancel"),
+                          callback_data=StatisticsCallback.create(0))
+        await state.set_state(StatisticsStates.date_range)
+        return Localizator.get_text(BotEntity.ADMIN, "date_range_request"), kb_builder
+
+    @staticmethod
+    async def get_date_range_statistics(message: Message, state: FSMContext,
+                                        session: AsyncSession) -> tuple[str, InlineKeyboardBuilder]:
+        """Statistics for the sent date range compared with the same range a year earlier."""
+        kb_builder = InlineKeyboardBuilder()
+        try:
+            dates = [datetime.date.fromisoformat(date) for date in message.text.split()]
+        except ValueError:
+            dates = []
+        if len(dates) not in (1, 2) or dates[0] > dates[-1]:
+            kb_builder.button(text=Localizator.get_text(BotEntity.COMMON, "cancel"),
+                              callback_data=StatisticsCallback.create(0))
+            return Localizator.get_text(BotEntity.ADMIN, "date_range_invalid"), kb_builder
+        await state.clear()
+        start, end = dates[0], dates[-1]
+        previous_start, previous_end = AdminService.__year_earlier(start), AdminService.__year_earlier(end)
+        statistics = []
+        for range_start, range_end in [(start, end), (previous_start, previous_end)]:
+            sales = await DailyStatisticsRepository.get_sales(range_start, range_end, session)
+            deposits = await DailyStatisticsRepository.get_deposits(range_start, range_end, session)
+            new_users = await DailyStatisticsRepository.get_new_users_count(range_start, range_end, session)
+            statistics.append({"buys_count": sales.buys_count,
+                               "items_sold": sales.items_sold,
+                               "total_profit": sales.total_profit,
+                               "new_users": new_users,
+                               "deposits_count": sum(deposit.deposits_count for deposit in deposits),
+                               **AdminService.__sum_deposit_amounts(deposits)})
+        current, previous = statistics
+        changes = {f"{key}_change": AdminService.__format_change(value, previous[key]) for key, value in current.items()}
+        deposit_lines = "".join(Localizator.get_text(BotEntity.ADMIN, "date_range_deposit_line").format(
+            crypto_name=crypto_name, amount=current[key], change=changes[f"{key}_change"])
+                                for key, crypto_name in DEPOSIT_AMOUNT_NAMES.items()
+                                if current[key] > 0 or previous[key] > 0)
+        kb_builder.row(AdminConstants.get_back_to_main_button(), StatisticsCallback.create(0).get_back_button(0))
+        return Localizator.get_text(BotEntity.ADMIN, "date_range_statistics_msg").format(
+            start=start, end=end, previous_start=previous_start, previous_end=previous_end,
+            deposit_lines=deposit_lines, currency_sym=Localizator.get_currency_symbol(),
+            **current, **changes), kb_builder
+
+    @staticmethod
+    def __year_earlier(date: datetime.date) -> datetime.date:
+        if date.month == 2 and date.day == 29:
+            return date.replace(year=date.year - 1, day=28)
+        return date.replace(year=date.year - 1)
+
+    @staticmethod
+    def __format_change(value: float, previous_value: float) -> str:
+        if previous_value == 0:
+            return "—"
+        return f"{(value - previous_value) / previous_value * 100:+.1f}%"
+
+    @staticmethod
+    async def get_sql_statistics(callback: CallbackQuery) -> tuple[str, InlineKeyboardBuilder]:
+        unpacked_cb = StatisticsCallback.unpack(callback.data)
+        kb_builder = InlineKeyboardBuilder()
+        kb_builder.row(AdminConstants.get_back_to_main_button(), unpacked_cb.get_back_button(0))
+        return SQLStatistics.get_summary(), kb_builder
 
     @staticmethod
     async def get_wallet_menu() -> tuple[str, InlineKeyboardBuilder]:
         kb_builder = InlineKeyboardBuilder()
         kb_builder.button(text=Localizator.get_text(BotEntity.ADMIN, "withdraw_funds"),
                           callback_data=WalletCallback.create(1))
-        kb_builder.row(AdminConstants.back_to_main_button)
+        kb_builder.row(AdminConstants.get_back_to_main_button())
         return Localizator.get_text(BotEntity.ADMIN, "crypto_withdraw"), kb_builder
 
     @staticmethod
     async def get_withdraw_menu():
         kb_builder = InlineKeyboardBuilder()
-        kb_builder.row(AdminConstants.back_to_main_button)
+        kb_builder.row(AdminConstants.get_back_to_main_button())
         return Localizator.get_text(BotEntity.ADMIN, "choose_crypto_to_withdraw"), kb_builder
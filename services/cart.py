@@ -1,25 +1,29 @@
 from aiogram.types import CallbackQuery, Message
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import Session
 
 from callbacks import AllCategoriesCallback, CartCallback
-from db import session_commit
+from db import session_commit, session_mark_dirty, session_rollback
 from enums.bot_entity import BotEntity
 from handlers.common.common import add_pagination_buttons
 from models.buy import BuyDTO
 from models.buyItem import BuyItemDTO
-from models.cartItem import CartItemDTO
+from models.cartItem import CartItemDTO, CartItemPricedDTO
 from models.item import ItemDTO
+from models.stockSummary import StockSummaryDTO
 from repositories.buy import BuyRepository
 from repositories.buyItem import BuyItemRepository
 from repositories.cart import CartRepository
 from repositories.cartItem import CartItemRepository
+from repositories.dailyStatistics import DailyStatisticsRepository
 from repositories.item import ItemRepository
-from repositories.subcategory import SubcategoryRepository
+from repositories.stockSummary import StockSummaryRepository
 from repositories.user import UserRepository
 from services.message import MessageService
 from services.notification import NotificationService
+from services.reservation import ReservationService
+from utils.catalog_cache import CatalogCache
+from utils.keyset_pagination import KeysetPagination
 from utils.localizator import Localizator
 from utils.translation_helper import get_translated
 
@@ -27,7 +31,7 @@ from utils.translation_helper import get_translated
 class CartService:
 
     @staticmethod
-    async def add_to_cart(callback: CallbackQuery, session: AsyncSession | Session):
+    async def add_to_cart(callback: CallbackQuery, session: AsyncSession) -> str:
         unpacked_cb = AllCategoriesCallback.unpack(callback.data)
         user = await UserRepository.get_by_tgid(callback.from_user.id, session)
         cart = await CartRepository.get_or_create(user.id, session)
@@ -37,46 +41,52 @@ class CartService:
             quantity=unpacked_cb.quantity,
             cart_id=cart.id
         )
-        await CartRepository.add_to_cart(cart_item, cart, session)
-        await session_commit(session)
+        cart_item = await CartRepository.add_to_cart(cart_item, session)
+        out_of_stock = await ReservationService.hold([cart_item], session)
+        if len(out_of_stock) > 0:
+            # A line is only added if all of its items can be held, the user is told how many are left.
+            await session_rollback(session)
+            available_qty = await ItemRepository.get_available_qty(ItemDTO(category_id=unpacked_cb.category_id,
+                                                                           subcategory_id=unpacked_cb.subcategory_id),
+                                                                   session)
+            return Localizator.get_text(BotEntity.USER, "not_enough_items_to_add").format(available_qty=available_qty)
+        # The catalog shows the available quantities, the held items are no longer available.
+        CatalogCache.invalidate(session)
+        session_mark_dirty(session)
+        return Localizator.get_text(BotEntity.USER, "item_added_to_cart")
 
     @staticmethod
-    async def create_buttons(message: Message | CallbackQuery, session: AsyncSession | Session):
+    async def create_buttons(message: Message | CallbackQuery, session: AsyncSession):
         user = await UserRepository.get_by_tgid(message.from_user.id, session)
-        page = 0 if isinstance(message, Message) else CartCallback.unpack(message.data).page
-        cart_items = await CartItemRepository.get_by_user_id(user.id, page, session)
+        page = KeysetPagination.FIRST_PAGE if isinstance(message, Message) else CartCallback.unpack(message.data).page
+        cart_items, pagination = await CartItemRepository.get_priced_page_by_user_id(user.id, page, session)
         kb_builder = InlineKeyboardBuilder()
         for cart_item in cart_items:
-            item_dto = ItemDTO(category_id=cart_item.category_id, subcategory_id=cart_item.subcategory_id)
-            price = await ItemRepository.get_price(item_dto, session)
-            subcategory = await SubcategoryRepository.get_by_id(cart_item.subcategory_id, session)
             kb_builder.button(text=Localizator.get_text(BotEntity.USER, "cart_item_button").format(
-                subcategory_name=get_translated(subcategory.name, subcategory.name_translations),
+                subcategory_name=get_translated(cart_item.subcategory_name, cart_item.subcategory_name_translations),
                 qty=cart_item.quantity,
-                total_price=cart_item.quantity * price,
+                total_price=cart_item.line_total,
                 currency_sym=Localizator.get_currency_symbol()),
                 callback_data=CartCallback.create(1, page, cart_item_id=cart_item.id))
-        if len(kb_builder.as_markup().inline_keyboard) > 0:
-            cart = await CartRepository.get_or_create(user.id, session)
+        if len(cart_items) > 0:
             unpacked_cb = CartCallback.create(0) if isinstance(message, Message) else CartCallback.unpack(message.data)
             kb_builder.button(text=Localizator.get_text(BotEntity.USER, "checkout"),
-                              callback_data=CartCallback.create(2, page, cart.id))
+                              callback_data=CartCallback.create(2, page, cart_items[0].cart_id))
             kb_builder.adjust(1)
-            kb_builder = await add_pagination_buttons(kb_builder, unpacked_cb,
-                                                      CartItemRepository.get_maximum_page(user.id, session),
-                                                      None)
+            kb_builder = await add_pagination_buttons(kb_builder, unpacked_cb, pagination, None)
             return Localizator.get_text(BotEntity.USER, "cart"), kb_builder
         else:
             return Localizator.get_text(BotEntity.USER, "no_cart_items"), kb_builder
 
     @staticmethod
-    async def delete_cart_item(callback: CallbackQuery, session: AsyncSession | Session):
+    async def delete_cart_item(callback: CallbackQuery, session: AsyncSession):
         unpacked_cb = CartCallback.unpack(callback.data)
         cart_item_id = unpacked_cb.cart_item_id
         kb_builder = InlineKeyboardBuilder()
         if unpacked_cb.confirmation:
             await CartItemRepository.remove_from_cart(cart_item_id, session)
-            await session_commit(session)
+            CatalogCache.invalidate(session)
+            session_mark_dirty(session)
             return Localizator.get_text(BotEntity.USER, "delete_cart_item_confirmation_text"), kb_builder
         else:
             kb_builder.button(text=Localizator.get_text(BotEntity.COMMON, "confirm"),
@@ -87,32 +97,28 @@ class CartService:
             return Localizator.get_text(BotEntity.USER, "delete_cart_item_confirmation"), kb_builder
 
     @staticmethod
-    async def __create_checkout_msg(cart_items: list[CartItemDTO], session: AsyncSession | Session) -> str:
+    def __create_checkout_msg(cart_items: list[CartItemPricedDTO], cart_grand_total: float) -> str:
         message_text = Localizator.get_text(BotEntity.USER, "cart_confirm_checkout_process")
         message_text += "<b>\n\n"
-        cart_grand_total = 0.0
-
         for cart_item in cart_items:
-            item_dto = ItemDTO(category_id=cart_item.category_id, subcategory_id=cart_item.subcategory_id)
-            price = await ItemRepository.get_price(item_dto, session)
-            subcategory = await SubcategoryRepository.get_by_id(cart_item.subcategory_id, session)
-            line_item_total = price * cart_item.quantity
-            cart_line_item = Localizator.get_text(BotEntity.USER, "cart_item_button").format(
-                subcategory_name=get_translated(subcategory.name, subcategory.name_translations), qty=cart_item.quantity,
-                total_price=line_item_total, currency_sym=Localizator.get_currency_symbol()
+            message_text += Localizator.get_text(BotEntity.USER, "cart_item_button").format(
+                subcategory_name=get_translated(cart_item.subcategory_name, cart_item.subcategory_name_translations),
+                qty=cart_item.quantity, total_price=cart_item.line_total, currency_sym=Localizator.get_currency_symbol()
             )
-            cart_grand_total += line_item_total
-            message_text += cart_line_item
         message_text += Localizator.get_text(BotEntity.USER, "cart_grand_total_string").format(
             cart_grand_total=cart_grand_total, currency_sym=Localizator.get_currency_symbol())
         message_text += "</b>"
         return message_text
 
     @staticmethod
-    async def checkout_processing(callback: CallbackQuery, session: AsyncSession | Session) -> tuple[str, InlineKeyboardBuilder]:
+    async def checkout_processing(callback: CallbackQuery, session: AsyncSession) -> tuple[str, InlineKeyboardBuilder]:
         user = await UserRepository.get_by_tgid(callback.from_user.id, session)
-        cart_items = await CartItemRepository.get_all_by_user_id(user.id, session)
-        message_text = await CartService.__create_checkout_msg(cart_items, session)
+        cart_items, cart_grand_total = await CartItemRepository.get_priced_by_user_id(user.id, session)
+        # The holds are renewed, so the items stay reserved while the user confirms the purchase.
+        await ReservationService.hold(cart_items, session)
+        CatalogCache.invalidate(session)
+        session_mark_dirty(session)
+        message_text = CartService.__create_checkout_msg(cart_items, cart_grand_total)
         kb_builder = InlineKeyboardBuilder()
         kb_builder.button(text=Localizator.get_text(BotEntity.COMMON, "confirm"),
                           callback_data=CartCallback.create(3,
@@ -122,45 +128,55 @@ class CartService:
         return message_text, kb_builder
 
     @staticmethod
-    async def buy_processing(callback: CallbackQuery, session: AsyncSession | Session) -> tuple[str, InlineKeyboardBuilder]:
+    async def buy_processing(callback: CallbackQuery, session: AsyncSession) -> tuple[str, InlineKeyboardBuilder]:
         unpacked_cb = CartCallback.unpack(callback.data)
-        user = await UserRepository.get_by_tgid(callback.from_user.id, session)
-        cart_items = await CartItemRepository.get_all_by_user_id(user.id, session)
-        cart_total = 0.0
-        out_of_stock = []
-        for cart_item in cart_items:
-            item_dto = ItemDTO(category_id=cart_item.category_id, subcategory_id=cart_item.subcategory_id)
-            price = await ItemRepository.get_price(item_dto, session)
-            cart_total += price * cart_item.quantity
-            is_in_stock = await ItemRepository.get_available_qty(item_dto, session) >= cart_item.quantity
-            if is_in_stock is False:
-                out_of_stock.append(cart_item)
+        user = await UserRepository.get_by_tgid(callback.from_user.id, session, use_cache=False)
+        cart_items, cart_total = await CartItemRepository.get_priced_by_user_id(user.id, session)
         is_enough_money = (user.top_up_amount - user.consume_records) >= cart_total
+        out_of_stock = []
         kb_builder = InlineKeyboardBuilder()
-        if unpacked_cb.confirmation and len(out_of_stock) == 0 and is_enough_money:
-            sold_items = []
-            msg = ""
-            for cart_item in cart_items:
-                price = await ItemRepository.get_price(ItemDTO(category_id=cart_item.category_id,
-                                                               subcategory_id=cart_item.subcategory_id), session)
-                purchased_items = await ItemRepository.get_purchased_items(cart_item.category_id,
-                                                                           cart_item.subcategory_id, cart_item.quantity, session)
-                buy_dto = BuyDTO(buyer_id=user.id, quantity=cart_item.quantity, total_price=cart_item.quantity * price)
-                buy_id = await BuyRepository.create(buy_dto, session)
-                buy_item_dto_list = [BuyItemDTO(item_id=item.id, buy_id=buy_id) for item in purchased_items]
-                await BuyItemRepository.create_many(buy_item_dto_list, session)
-                for item in purchased_items:
-                    item.is_sold = True
-                await ItemRepository.update(purchased_items, session)
-                await CartItemRepository.remove_from_cart(cart_item.id, session)
-                sold_items.append(cart_item)
-                msg += MessageService.create_message_with_bought_items(purchased_items)
-            user.consume_records = user.consume_records + cart_total
-            await UserRepository.update(user, session)
-            await session_commit(session)
-            await NotificationService.new_buy(sold_items, user, session)
-            return msg, kb_builder
-        elif unpacked_cb.confirmation is False:
+        if len(cart_items) == 0:
+            return Localizator.get_text(BotEntity.USER, "no_cart_items"), kb_builder
+        if unpacked_cb.confirmation and is_enough_money:
+            # The whole cart is bought in one short write transaction: the balance is charged and the items
+            # held for each cart line are sold, if anything is missing everything is rolled back.
+            is_enough_money = await UserRepository.charge(user.id, cart_total, session)
+            purchased_items = []
+            if is_enough_money:
+                for cart_item in cart_items:
+                    items = await ItemRepository.sell_reserved(cart_item.id, session)
+                    if len(items) < cart_item.quantity:
+                        # The holds were taken by another cart after they expired, available items are sold instead.
+                        items += await ItemRepository.claim_unsold(cart_item.category_id, cart_item.subcategory_id,
+                                                                   cart_item.quantity - len(items), session)
+                    if len(items) < cart_item.quantity:
+                        out_of_stock.append(cart_item)
+                    purchased_items.append(items)
+            if is_enough_money and len(out_of_stock) == 0:
+                buy_dto_list = [BuyDTO(buyer_id=user.id,
+                                       quantity=cart_item.quantity,
+                                       total_price=cart_item.line_total,
+                                       category_id=cart_item.category_id,
+                                       subcategory_id=cart_item.subcategory_id)
+                                for cart_item in cart_items]
+                buy_ids = await BuyRepository.create_many(buy_dto_list, session)
+                await DailyStatisticsRepository.add_buys(buy_dto_list, session)
+                await BuyItemRepository.create_many([BuyItemDTO(item_id=item.id, buy_id=buy_id)
+                                                     for buy_id, items in zip(buy_ids, purchased_items)
+                                                     for item in items], session)
+                await CartItemRepository.remove_many_from_cart([cart_item.id for cart_item in cart_items], session)
+                await StockSummaryRepository.subtract([StockSummaryDTO(category_id=cart_item.category_id,
+                                                                       subcategory_id=cart_item.subcategory_id,
+                                                                       available_qty=cart_item.quantity)
+                                                       for cart_item in cart_items], session)
+                CatalogCache.invalidate(session)
+                # The purchase is committed before the admins are notified about it.
+                await session_commit(session)
+                await NotificationService.new_buy(cart_items, user)
+                msg = "".join(MessageService.create_message_with_bought_items(items) for items in purchased_items)
+                return msg, kb_builder
+            await session_rollback(session)
+        if unpacked_cb.confirmation is False:
             kb_builder.row(unpacked_cb.get_back_button(0))
             return Localizator.get_text(BotEntity.USER, "purchase_confirmation_declined"), kb_builder
         elif is_enough_money is False:
@@ -169,7 +185,6 @@ class CartService:
         elif len(out_of_stock) > 0:
             kb_builder.row(unpacked_cb.get_back_button(0))
             msg = Localizator.get_text(BotEntity.USER, "out_of_stock")
-            for item in out_of_stock:
-                subcategory = await SubcategoryRepository.get_by_id(item.subcategory_id, session)
-                msg += get_translated(subcategory.name, subcategory.name_translations) + "\n"
+            for cart_item in out_of_stock:
+                msg += get_translated(cart_item.subcategory_name, cart_item.subcategory_name_translations) + "\n"
             return msg, kb_builder
@@ -0,0 +1,18 @@
+import logging
+
+from db import get_db_session, session_commit
+from repositories.dailyStatistics import DailyStatisticsRepository
+
+
+class DailyStatisticsService:
+
+    @staticmethod
+    async def check_and_rebuild() -> bool:
+        """Backfills the daily statistics from the raw rows if they went out of sync, returns whether it did."""
+        async with get_db_session() as session:
+            is_consistent = await DailyStatisticsRepository.is_consistent(session)
+            if is_consistent is False:
+                logging.warning("Daily statistics are inconsistent, rebuilding them")
+                await DailyStatisticsRepository.rebuild(session)
+                await session_commit(session)
+            return is_consistent is False
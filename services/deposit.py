@@ -1,17 +1,19 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import Session
 
 from models.deposit import DepositDTO
 from models.user import UserDTO
+from repositories.dailyStatistics import DailyStatisticsRepository
 from repositories.deposit import DepositRepository
 
 
 class DepositService:
 
     @staticmethod
-    async def create(deposit: DepositDTO, session: AsyncSession | Session) -> int:
-        return await DepositRepository.create(deposit, session)
+    async def create(deposit: DepositDTO, session: AsyncSession) -> int:
+        deposit_id = await DepositRepository.create(deposit, session)
+        await DailyStatisticsRepository.add_deposit(deposit, session)
+        return deposit_id
 
     @staticmethod
-    async def get_by_user_dto(user_dto: UserDTO, session: AsyncSession | Session) -> list[DepositDTO]:
+    async def get_by_user_dto(user_dto: UserDTO, session: AsyncSession) -> list[DepositDTO]:
         return await DepositRepository.get_by_user_dto(user_dto, session)
@@ -2,30 +2,23 @@ from json import load
 from pathlib import Path
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import Session
 
 from callbacks import AddType
-from db import session_commit
+from db import session_mark_dirty
 from enums.bot_entity import BotEntity
 from models.item import ItemDTO
 from repositories.category import CategoryRepository
 from repositories.item import ItemRepository
+from repositories.stockSummary import StockSummaryRepository
 from repositories.subcategory import SubcategoryRepository
+from utils.catalog_cache import CatalogCache
 from utils.localizator import Localizator
 
 
 class ItemService:
 
     @staticmethod
-    async def get_new(session: AsyncSession | Session) -> list[ItemDTO]:
-        return await ItemRepository.get_new(session)
-
-    @staticmethod
-    async def get_in_stock_items(session: AsyncSession | Session):
-        return await ItemRepository.get_in_stock(session)
-
-    @staticmethod
-    async def parse_items_json(path_to_file: str, session: AsyncSession | Session):
+    async def parse_items_json(path_to_file: str, session: AsyncSession):
         with open(path_to_file, 'r', encoding='utf-8') as file:
             items = load(file)
             items_list = []
@@ -49,7 +42,7 @@ class ItemService:
             return items_list
 
     @staticmethod
-    async def parse_items_txt(path_to_file: str, session: AsyncSession | Session):
+    async def parse_items_txt(path_to_file: str, session: AsyncSession):
         with open(path_to_file, 'r', encoding='utf-8') as file:
             lines = file.readlines()
             items_list = []
@@ -83,7 +76,7 @@ class ItemService:
             return items_list
 
     @staticmethod
-    async def add_items(path_to_file: str, add_type: AddType, session: AsyncSession | Session) -> str:
+    async def add_items(path_to_file: str, add_type: AddType, session: AsyncSession) -> str:
         try:
             items = []
             if add_type == AddType.JSON:
@@ -91,7 +84,9 @@ class ItemService:
             else:
                 items += await ItemService.parse_items_txt(path_to_file, session)
             await ItemRepository.add_many(items, session)
-            await session_commit(session)
+            await StockSummaryRepository.add_items(items, session)
+            CatalogCache.invalidate(session)
+            session_mark_dirty(session)
             return Localizator.get_text(BotEntity.ADMIN, "add_items_success").format(adding_result=len(items))
         except Exception as e:
             return Localizator.get_text(BotEntity.ADMIN, "add_items_err").format(adding_result=e)
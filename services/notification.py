@@ -4,19 +4,13 @@ from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
 from aiogram.types import InlineKeyboardMarkup, BufferedInputFile
 from aiogram.utils.keyboard import InlineKeyboardBuilder
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import Session
 
 from config import ADMIN_ID_LIST, TOKEN
 from enums.bot_entity import BotEntity
 from enums.cryptocurrency import Cryptocurrency
 from models.buy import RefundDTO
-from models.cartItem import CartItemDTO
-from models.item import ItemDTO
+from models.cartItem import CartItemPricedDTO
 from models.user import UserDTO
-from repositories.category import CategoryRepository
-from repositories.item import ItemRepository
-from repositories.subcategory import SubcategoryRepository
 from utils.localizator import Localizator
 from utils.translation_helper import get_translated
 
@@ -46,6 +40,9 @@ class NotificationService:
 
     @staticmethod
     async def new_deposit(deposit_amount: float, cryptocurrency: Cryptocurrency, fiat_amount: float, user_dto: UserDTO):
+        """The message contains the seed, user_dto must be loaded with get_by_tgid(..., use_cache=False)."""
+        if user_dto.seed is None:
+            raise ValueError("user_dto has no seed, a user from the user cache can't be used for a deposit")
         deposit_amount_fiat = round(fiat_amount, 2)
         user_button = await NotificationService.make_user_button(user_dto.telegram_username)
         if user_dto.telegram_username:
@@ -70,32 +67,27 @@ class NotificationService:
         await NotificationService.send_to_admins(message, user_button)
 
     @staticmethod
-    async def new_buy(sold_items: list[CartItemDTO], user: UserDTO, session: AsyncSession | Session):
+    async def new_buy(sold_items: list[CartItemPricedDTO], user: UserDTO):
         user_button = await NotificationService.make_user_button(user.telegram_username)
         cart_grand_total = 0.0
         message = ""
         for item in sold_items:
-            price = await ItemRepository.get_price(ItemDTO(subcategory_id=item.subcategory_id,
-                                                           category_id=item.category_id), session)
-            category = await CategoryRepository.get_by_id(item.category_id, session)
-            subcategory = await SubcategoryRepository.get_by_id(item.subcategory_id, session)
-            cart_item_total = price * item.quantity
-            cart_grand_total += cart_item_total
+            cart_grand_total += item.line_total
             if user.telegram_username:
                 message += Localizator.get_text(BotEntity.ADMIN, "notification_purchase_with_tgid").format(
                     username=user.telegram_username,
-                    total_price=cart_item_total,
+                    total_price=item.line_total,
                     quantity=item.quantity,
-                    category_name=get_translated(category.name, category.name_translations),
-                    subcategory_name=get_translated(subcategory.name, subcategory.name_translations),
+                    category_name=get_translated(item.category_name, item.category_name_translations),
+                    subcategory_name=get_translated(item.subcategory_name, item.subcategory_name_translations),
                     currency_sym=Localizator.get_currency_symbol()) + "\n"
             else:
                 message += Localizator.get_text(BotEntity.ADMIN, "notification_purchase_with_username").format(
                     telegram_id=user.telegram_id,
-                    total_price=cart_item_total,
+                    total_price=item.line_total,
                     quantity=item.quantity,
-                    category_name=get_translated(category.name, category.name_translations),
-                    subcategory_name=get_translated(subcategory.name, subcategory.name_translations),
+                    category_name=get_translated(item.category_name, item.category_name_translations),
+                    subcategory_name=get_translated(item.subcategory_name, item.subcategory_name_translations),
                     currency_sym=Localizator.get_currency_symbol()) + "\n"
         message += Localizator.get_text(BotEntity.USER, "cart_grand_total_string").format(
             cart_grand_total=cart_grand_total, currency_sym=Localizator.get_currency_symbol())
@@ -0,0 +1,56 @@
+import asyncio
+import logging
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import config
+from db import get_db_session, session_commit
+from models.cartItem import CartItemDTO
+from repositories.item import ItemRepository
+from utils.catalog_cache import CatalogCache
+
+
+class ReservationService:
+    sweeper_task: asyncio.Task | None = None
+
+    @staticmethod
+    async def hold(cart_items: list[CartItemDTO], session: AsyncSession) -> list[CartItemDTO]:
+        """Holds the items of the cart lines, returns the lines that could not be fully reserved."""
+        out_of_stock = []
+        for cart_item in cart_items:
+            held_qty = await ItemRepository.reserve(cart_item.id, cart_item.category_id, cart_item.subcategory_id,
+                                                    cart_item.quantity, session)
+            if held_qty < cart_item.quantity:
+                out_of_stock.append(cart_item)
+        return out_of_stock
+
+    @staticmethod
+    async def release_expired() -> int:
+        async with get_db_session() as session:
+            released_qty = await ItemRepository.release_expired_reservations(session)
+            if released_qty > 0:
+                CatalogCache.invalidate(session)
+            await session_commit(session)
+            return released_qty
+
+    @staticmethod
+    async def sweep():
+        while True:
+            await asyncio.sleep(config.RESERVATION_SWEEP_INTERVAL_SECONDS)
+            try:
+                released_qty = await ReservationService.release_expired()
+                if released_qty > 0:
+                    logging.info(f"Released {released_qty} expired item reservations")
+            except Exception as e:
+                logging.error(e)
+
+    @staticmethod
+    def start_sweeper():
+        if ReservationService.sweeper_task is None:
+            ReservationService.sweeper_task = asyncio.create_task(ReservationService.sweep())
+
+    @staticmethod
+    def stop_sweeper():
+        if ReservationService.sweeper_task is not None:
+            ReservationService.sweeper_task.cancel()
+            ReservationService.sweeper_task = None
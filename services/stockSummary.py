@@ -0,0 +1,20 @@
+import logging
+
+from db import get_db_session, session_commit
+from repositories.stockSummary import StockSummaryRepository
+from utils.catalog_cache import CatalogCache
+
+
+class StockSummaryService:
+
+    @staticmethod
+    async def check_and_rebuild() -> int:
+        """Rebuilds the stock summary from the items if they went out of sync, returns the number of stale rows."""
+        async with get_db_session() as session:
+            inconsistent = await StockSummaryRepository.count_inconsistent(session)
+            if inconsistent > 0:
+                logging.warning(f"Stock summary is inconsistent for {inconsistent} (sub-)categories, rebuilding it")
+                await StockSummaryRepository.rebuild(session)
+                CatalogCache.invalidate(session)
+                await session_commit(session)
+            return inconsistent
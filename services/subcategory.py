@@ -1,15 +1,15 @@
 from aiogram.types import CallbackQuery
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import Session
 
 from callbacks import AllCategoriesCallback
 from enums.bot_entity import BotEntity
 from handlers.common.common import add_pagination_buttons
-from models.item import ItemDTO
 from repositories.category import CategoryRepository
 from repositories.item import ItemRepository
 from repositories.subcategory import SubcategoryRepository
+from utils.catalog_cache import CatalogCache
+from utils.keyset_pagination import KeysetPagination
 from utils.localizator import Localizator
 from utils.translation_helper import get_translated
 
@@ -17,19 +17,21 @@ from utils.translation_helper import get_translated
 class SubcategoryService:
 
     @staticmethod
-    async def get_buttons(callback: CallbackQuery, session: AsyncSession | Session) -> tuple[str, InlineKeyboardBuilder]:
+    async def get_buttons(callback: CallbackQuery, session: AsyncSession) -> tuple[str, InlineKeyboardBuilder]:
         unpacked_cb = AllCategoriesCallback.unpack(callback.data)
+        return await CatalogCache.get(unpacked_cb, lambda: SubcategoryService.__render_buttons(unpacked_cb, session))
+
+    @staticmethod
+    async def __render_buttons(unpacked_cb: AllCategoriesCallback,
+                               session: AsyncSession) -> tuple[str, InlineKeyboardBuilder]:
         kb_builder = InlineKeyboardBuilder()
-        subcategories = await SubcategoryRepository.get_paginated_by_category_id(unpacked_cb.category_id,
-                                                                                 unpacked_cb.page, session)
+        subcategories, pagination = await SubcategoryRepository.get_paginated_with_stock(unpacked_cb.category_id,
+                                                                                         unpacked_cb.page, session)
         for subcategory in subcategories:
-            item = await ItemRepository.get_single(unpacked_cb.category_id, subcategory.id, session)
-            available_qty = await ItemRepository.get_available_qty(ItemDTO(category_id=unpacked_cb.category_id,
-                                                                           subcategory_id=subcategory.id), session)
             kb_builder.button(text=Localizator.get_text(BotEntity.USER, "subcategory_button").format(
                 subcategory_name=get_translated(subcategory.name, subcategory.name_translations),
-                subcategory_price=item.price,
-                available_quantity=available_qty,
+                subcategory_price=subcategory.price,
+                available_quantity=subcategory.available_qty,
                 currency_sym=Localizator.get_currency_symbol()),
                 callback_data=AllCategoriesCallback.create(
                     unpacked_cb.level + 1,
@@ -38,13 +40,14 @@ class SubcategoryService:
                 )
             )
         kb_builder.adjust(1)
-        kb_builder = await add_pagination_buttons(kb_builder, unpacked_cb,
-                                                  SubcategoryRepository.max_page(unpacked_cb.category_id, session),
-                                                  unpacked_cb.get_back_button())
+        # The page token belongs to the subcategories, the categories are shown from the first page.
+        back_callback = unpacked_cb.__copy__()
+        back_callback.page = KeysetPagination.FIRST_PAGE
+        kb_builder = await add_pagination_buttons(kb_builder, unpacked_cb, pagination, back_callback.get_back_button())
         return Localizator.get_text(BotEntity.USER, "subcategories"), kb_builder
 
     @staticmethod
-    async def get_select_quantity_buttons(callback: CallbackQuery, session: AsyncSession | Session) -> tuple[str, InlineKeyboardBuilder]:
+    async def get_select_quantity_buttons(callback: CallbackQuery, session: AsyncSession) -> tuple[str, InlineKeyboardBuilder]:
         unpacked_cb = AllCategoriesCallback.unpack(callback.data)
         item = await ItemRepository.get_single(unpacked_cb.category_id, unpacked_cb.subcategory_id, session)
         subcategory = await SubcategoryRepository.get_by_id(unpacked_cb.subcategory_id, session)
@@ -71,7 +74,7 @@ class SubcategoryService:
         return message_text, kb_builder
 
     @staticmethod
-    async def get_add_to_cart_buttons(callback: CallbackQuery, session: AsyncSession | Session) -> tuple[str, InlineKeyboardBuilder]:
+    async def get_add_to_cart_buttons(callback: CallbackQuery, session: AsyncSession) -> tuple[str, InlineKeyboardBuilder]:
         unpacked_cb = AllCategoriesCallback.unpack(callback.data)
         item = await ItemRepository.get_single(unpacked_cb.category_id, unpacked_cb.subcategory_id, session)
         category = await CategoryRepository.get_by_id(unpacked_cb.category_id, session)
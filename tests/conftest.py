@@ -0,0 +1,46 @@
+import os
+
+import pytest
+
+# The bot's modules read the configuration when they are imported, so the test settings are set first.
+os.environ.update({
+    "RUNTIME_ENVIRONMENT": "PROD",
+    "WEBHOOK_PATH": "/",
+    "WEBAPP_HOST": "localhost",
+    "WEBAPP_PORT": "5000",
+    "TOKEN": "123456:test",
+    "ADMIN_ID_LIST": "1",
+    "SUPPORT_LINK": "https://t.me/support",
+    "DB_NAME": "test.db",
+    "DB_ENCRYPTION": "false",
+    "PAGE_ENTRIES": "5",
+    "BOT_LANGUAGE": "en",
+    "MULTIBOT": "false",
+    "CURRENCY": "USD",
+    "WEBHOOK_SECRET_TOKEN": "secret",
+    "REDIS_HOST": "localhost",
+    "REDIS_PASSWORD": "password",
+})
+
+import external_ip
+
+# config resolves the public webhook host on import, tests never go to the network.
+external_ip.get_sslipio_external_url = lambda: "https://localhost"
+
+
+def pytest_addoption(parser):
+    parser.addoption("--benchmark", action="store_true", help="also run the tests marked as benchmark")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "benchmark: compares the timings of a fast path with the path it replaced, "
+                                       "only run with --benchmark")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--benchmark"):
+        return
+    skip_benchmark = pytest.mark.skip(reason="benchmark, run with --benchmark")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip_benchmark)
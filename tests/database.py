@@ -0,0 +1,117 @@
+import asyncio
+from contextlib import contextmanager, asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable, Iterator
+
+import pytest
+from aiogram.filters.callback_data import CallbackData
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession, AsyncEngine
+from sqlalchemy.pool import StaticPool
+
+import config
+import db
+from migrations import run_migrations
+from models.category import Category
+from models.item import ItemDTO
+from models.subcategory import Subcategory
+from repositories.item import ItemRepository
+from repositories.stockSummary import StockSummaryRepository
+
+
+def run_with_database(scenario: Callable[[async_sessionmaker[AsyncSession], AsyncEngine], Awaitable[None]]):
+    """Runs the scenario against a new in-memory database created by the migrations."""
+    async def run():
+        # One shared connection, every connection to :memory: would open a database of its own.
+        engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+        try:
+            async with engine.connect() as connection:
+                await connection.run_sync(run_migrations)
+            await scenario(async_sessionmaker(engine, expire_on_commit=False), engine)
+        finally:
+            await engine.dispose()
+
+    asyncio.run(run())
+
+
+@asynccontextmanager
+async def file_database(monkeypatch: pytest.MonkeyPatch, db_name: str, wal: bool,
+                        read_pool_size: int = 5) -> AsyncIterator[async_sessionmaker[AsyncSession]]:
+    """
+    Creates data/<db_name> with the migrations and points db's engines at it like db does on startup:
+    a WAL writer with a pool of read-only connections, or one engine in rollback journal mode.
+    The sessions route their statements with RoutingSession, the files are deleted afterwards.
+    """
+    monkeypatch.setattr(db, "DB_NAME", db_name)
+    monkeypatch.setattr(config, "DB_WAL", wal)
+    writer = db.create_db_engine(pool_size=1, max_overflow=0) if wal else db.create_db_engine()
+    reader = writer
+    try:
+        async with writer.connect() as connection:
+            if wal:
+                await connection.exec_driver_sql("PRAGMA journal_mode=WAL")
+            await connection.run_sync(run_migrations)
+        if wal:
+            reader = db.create_db_engine(read_only=True, pool_size=read_pool_size, max_overflow=0)
+        monkeypatch.setattr(db, "engine", writer)
+        monkeypatch.setattr(db, "read_engine", reader)
+        yield async_sessionmaker(writer, sync_session_class=db.RoutingSession, expire_on_commit=False)
+    finally:
+        if reader is not writer:
+            await reader.dispose()
+        await writer.dispose()
+        for suffix in ["", "-wal", "-shm", "-journal"]:
+            Path(f"data/{db_name}{suffix}").unlink(missing_ok=True)
+
+
+@contextmanager
+def count_statements(engine: AsyncEngine) -> Iterator[list[str]]:
+    """Collects the SQL statements executed on the engine inside the block."""
+    statements = []
+
+    def before_cursor_execute(connection, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+def user_row(telegram_id: int, **values) -> dict:
+    """Column values of a user with unique addresses and seed, for inserts of many users."""
+    return {"telegram_id": telegram_id,
+            "telegram_username": f"user{telegram_id}",
+            **{f"{network}_address": f"{network}{telegram_id}" for network in ["btc", "ltc", "trx", "eth", "sol"]},
+            "seed": f"seed{telegram_id}",
+            **values}
+
+
+async def add_catalog(session: AsyncSession, subcategories_count: int, items_per_subcategory: int,
+                      price: float = 2.5) -> list[ItemDTO]:
+    """Adds items of one category the way ItemService.add_items does and commits them."""
+    await session.execute(insert(Category), [{"name": "category"}])
+    await session.execute(insert(Subcategory), [{"name": f"subcategory{number}", "name_translations": {}}
+                                                for number in range(1, subcategories_count + 1)])
+    items = [ItemDTO(category_id=1, subcategory_id=subcategory_id, private_data=f"data{subcategory_id}.{number}",
+                     price=price, description="description", description_translations={})
+             for subcategory_id in range(1, subcategories_count + 1)
+             for number in range(items_per_subcategory)]
+    await ItemRepository.add_many(items, session)
+    await StockSummaryRepository.add_items(items, session)
+    await session.commit()
+    return items
+
+
+class UserStub:
+    def __init__(self, telegram_id: int):
+        self.id = telegram_id
+
+
+class CallbackStub:
+    """The fields of a CallbackQuery the services read, the callback data and the user who pressed the button."""
+
+    def __init__(self, callback_data: CallbackData, telegram_id: int = 1):
+        self.data = callback_data.pack()
+        self.from_user = UserStub(telegram_id)
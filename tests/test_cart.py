@@ -0,0 +1,173 @@
+import asyncio
+
+from sqlalchemy import insert, select, func
+
+import config
+import db
+from callbacks import AllCategoriesCallback, CartCallback
+from enums.bot_entity import BotEntity
+from models.cartItem import CartItem
+from models.item import Item
+from models.user import User
+from repositories.item import ItemRepository
+from repositories.stockSummary import StockSummaryRepository
+from repositories.subcategory import SubcategoryRepository
+from services.cart import CartService
+from services.notification import NotificationService
+from services.reservation import ReservationService
+from tests.database import run_with_database, add_catalog, user_row, CallbackStub, file_database
+from utils.keyset_pagination import KeysetPagination
+from utils.localizator import Localizator
+
+
+async def new_buy(sold_items, user):
+    pass
+
+
+async def add_to_cart(telegram_id: int, quantity: int, session) -> str:
+    callback = CallbackStub(AllCategoriesCallback.create(4, category_id=1, subcategory_id=1, quantity=quantity),
+                            telegram_id)
+    msg = await CartService.add_to_cart(callback, session)
+    await session.commit()
+    return msg
+
+
+async def held_items(session) -> list[tuple[int, int]]:
+    """The (item id, cart line id) of the held items."""
+    stmt = select(Item.id, Item.reserved_cart_item_id).where(Item.reserved_cart_item_id != None).order_by(Item.id)
+    return [tuple(row) for row in (await session.execute(stmt)).all()]
+
+
+def test_add_to_cart_rejects_more_than_in_stock():
+    async def scenario(session_maker, engine):
+        async with session_maker() as session:
+            await add_catalog(session, 1, 3)
+            await session.execute(insert(User), [user_row(1)])
+            await session.commit()
+        async with session_maker() as session:
+            callback = CallbackStub(AllCategoriesCallback.create(4, category_id=1, subcategory_id=1, quantity=2))
+            assert await CartService.add_to_cart(callback, session) == Localizator.get_text(BotEntity.USER,
+                                                                                  "item_added_to_cart")
+            await session.commit()
+        async with session_maker() as session:
+            callback = CallbackStub(AllCategoriesCallback.create(4, category_id=1, subcategory_id=1, quantity=2))
+            msg = await CartService.add_to_cart(callback, session)
+            await session.commit()
+            cart_quantity = await session.scalar(select(CartItem.quantity))
+            held_qty = await session.scalar(select(func.count()).where(Item.reserved_cart_item_id != None))
+
+        assert msg == Localizator.get_text(BotEntity.USER, "not_enough_items_to_add").format(available_qty=1)
+        # The rejected add changed neither the cart line nor the holds.
+        assert (cart_quantity, held_qty) == (2, 2)
+
+    run_with_database(scenario)
+
+
+def test_catalog_shows_the_quantity_add_to_cart_accepts():
+    async def scenario(session_maker, engine):
+        async with session_maker() as session:
+            await add_catalog(session, 2, 3)
+            await session.execute(insert(User), [user_row(1)])
+            await session.commit()
+        async with session_maker() as session:
+            callback = CallbackStub(AllCategoriesCallback.create(4, category_id=1, subcategory_id=1, quantity=2))
+            await CartService.add_to_cart(callback, session)
+            await session.commit()
+        async with session_maker() as session:
+            stock = await StockSummaryRepository.get_in_stock(session)
+            subcategories, _ = await SubcategoryRepository.get_paginated_with_stock(1, KeysetPagination.FIRST_PAGE,
+                                                                                    session)
+
+        # Two items of subcategory 1 are held for the cart, they are not offered to other users.
+        assert [(row.subcategory_id, row.available_qty) for row in stock] == [(1, 1), (2, 3)]
+        assert [(subcategory.id, subcategory.available_qty) for subcategory in subcategories] == [(1, 1), (2, 3)]
+
+    run_with_database(scenario)
+
+
+def test_expired_holds_are_released_by_the_sweeper(monkeypatch):
+    # The holds expire as soon as they are taken and the sweeper runs without waiting.
+    monkeypatch.setattr(config, "RESERVATION_TTL_MINUTES", -1)
+    monkeypatch.setattr(config, "RESERVATION_SWEEP_INTERVAL_SECONDS", 0)
+
+    async def scenario():
+        # The sweeper is cancelled at any statement, that closes only its own connection of a file database.
+        async with file_database(monkeypatch, "test_sweeper.db", wal=True) as session_maker:
+            monkeypatch.setattr(db, "session_maker", session_maker)
+            async with session_maker() as session:
+                await add_catalog(session, 1, 3)
+                await session.execute(insert(User), [user_row(1), user_row(2)])
+                await session.commit()
+                await add_to_cart(1, 2, session)
+                assert await held_items(session) == [(1, 1), (2, 1)]
+                # An expired hold doesn't block the items, another cart takes them.
+                await add_to_cart(2, 3, session)
+                assert await held_items(session) == [(1, 2), (2, 2), (3, 2)]
+            ReservationService.start_sweeper()
+            try:
+                for _ in range(100):
+                    async with session_maker() as session:
+                        if len(await held_items(session)) == 0:
+                            break
+                    await asyncio.sleep(0.01)
+            finally:
+                ReservationService.stop_sweeper()
+            async with session_maker() as session:
+                assert await held_items(session) == []
+                assert await ItemRepository.release_expired_reservations(session) == 0
+
+    asyncio.run(scenario())
+
+
+def test_checkout_sells_available_items_for_an_expired_hold(monkeypatch):
+    monkeypatch.setattr(NotificationService, "new_buy", new_buy)
+
+    async def scenario(session_maker, engine):
+        async with session_maker() as session:
+            await add_catalog(session, 1, 4)
+            await session.execute(insert(User), [user_row(1, top_up_amount=100.0, consume_records=0.0),
+                                                 user_row(2)])
+            await session.commit()
+            monkeypatch.setattr(config, "RESERVATION_TTL_MINUTES", -1)
+            await add_to_cart(1, 2, session)
+            monkeypatch.setattr(config, "RESERVATION_TTL_MINUTES", 15)
+            # The second cart takes one of the expired holds of the first one.
+            await add_to_cart(2, 1, session)
+            assert await held_items(session) == [(1, 2), (2, 1)]
+        async with session_maker() as session:
+            callback = CallbackStub(CartCallback.create(3, confirmation=True))
+            msg, _ = await CartService.buy_processing(callback, session)
+            sold_ids = (await session.execute(select(Item.id).where(Item.is_sold == True))).scalars().all()
+            assert await held_items(session) == [(1, 2)]
+
+        # The item still held for the line and the first available one are sold.
+        assert sorted(sold_ids) == [2, 3]
+        assert "data1.1" in msg and "data1.2" in msg
+
+    run_with_database(scenario)
+
+
+def test_two_carts_compete_for_the_last_items(monkeypatch):
+    async def scenario():
+        async with file_database(monkeypatch, "test_cart.db", wal=True) as session_maker:
+            async with session_maker() as session:
+                await add_catalog(session, 1, 3)
+                await session.execute(insert(User), [user_row(1), user_row(2)])
+                await session.commit()
+
+            async def add(telegram_id: int) -> str:
+                async with session_maker() as session:
+                    return await add_to_cart(telegram_id, 2, session)
+
+            msgs = await asyncio.gather(add(1), add(2))
+            async with session_maker() as session:
+                cart_lines = await session.scalar(select(func.count()).select_from(CartItem))
+                held_qty = len(await held_items(session))
+
+        # The carts are written one after the other, the second one can't hold two of the remaining item.
+        assert sorted(msgs) == sorted([Localizator.get_text(BotEntity.USER, "item_added_to_cart"),
+                                       Localizator.get_text(BotEntity.USER, "not_enough_items_to_add").format(
+                                           available_qty=1)])
+        assert (cart_lines, held_qty) == (1, 2)
+
+    asyncio.run(scenario())
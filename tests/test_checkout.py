@@ -0,0 +1,75 @@
+import time
+
+import pytest
+from sqlalchemy import insert, select, func
+
+from callbacks import CartCallback
+from models.cartItem import CartItemDTO
+from models.item import Item
+from models.user import User
+from repositories.cart import CartRepository
+from repositories.item import ItemRepository
+from services.cart import CartService
+from services.notification import NotificationService
+from services.reservation import ReservationService
+from tests.database import run_with_database, count_statements, add_catalog, user_row, CallbackStub
+
+ORDER_SIZES = [1, 10, 500]
+
+
+async def new_buy(sold_items, user):
+    pass
+
+
+def test_claim_unsold_is_one_statement():
+    async def scenario(session_maker, engine):
+        async with session_maker() as session:
+            await add_catalog(session, 1, 600)
+            with count_statements(engine) as statements:
+                items = await ItemRepository.claim_unsold(1, 1, 500, session)
+            await session.commit()
+            sold_qty = await session.scalar(select(func.count()).where(Item.is_sold == True))
+
+        assert len(statements) == 1
+        assert [item.id for item in items] == list(range(1, 501))
+        assert sold_qty == 500
+
+    run_with_database(scenario)
+
+
+@pytest.mark.benchmark
+def test_checkout_statements_do_not_grow_with_the_order(monkeypatch):
+    # The admins are notified through the bot after the commit.
+    monkeypatch.setattr(NotificationService, "new_buy", new_buy)
+    statements_per_order = {}
+    seconds_per_order = {}
+
+    async def scenario(session_maker, engine):
+        async with session_maker() as session:
+            await add_catalog(session, 2, sum(ORDER_SIZES))
+            await session.execute(insert(User), [user_row(1, top_up_amount=100000.0, consume_records=0.0)])
+            cart = await CartRepository.get_or_create(1, session)
+            await session.commit()
+        for order_size in ORDER_SIZES:
+            async with session_maker() as session:
+                # Two cart lines, both are held when checkout starts.
+                cart_items = [await CartRepository.add_to_cart(CartItemDTO(cart_id=cart.id, category_id=1,
+                                                                           subcategory_id=subcategory_id,
+                                                                           quantity=order_size), session)
+                              for subcategory_id in [1, 2]]
+                await ReservationService.hold(cart_items, session)
+                await session.commit()
+            async with session_maker() as session:
+                callback = CallbackStub(CartCallback.create(3, confirmation=True))
+                started_at = time.perf_counter()
+                with count_statements(engine) as statements:
+                    msg, kb_builder = await CartService.buy_processing(callback, session)
+                seconds_per_order[order_size] = time.perf_counter() - started_at
+                statements_per_order[order_size] = len(statements)
+                assert msg.count("data") == 2 * order_size
+
+    run_with_database(scenario)
+    for order_size in ORDER_SIZES:
+        print(f"checkout of 2 x {order_size} items: {statements_per_order[order_size]} statements, "
+              f"{seconds_per_order[order_size] * 1000:.1f} ms")
+    assert len(set(statements_per_order.values())) == 1
@@ -0,0 +1,43 @@
+import datetime
+
+from sqlalchemy import insert, update
+
+from models.buy import Buy
+from models.dailyStatistics import DailySales
+from models.user import User
+from repositories.dailyStatistics import DailyStatisticsRepository
+from tests.database import run_with_database, user_row
+
+DAYS = [datetime.date(2026, 10, 16), datetime.date(2026, 10, 17)]
+
+
+def test_rollups_are_compared_per_day():
+    async def scenario(session_maker, engine):
+        async with session_maker() as session:
+            await session.execute(insert(User), [user_row(1, registered_at=datetime.datetime(2026, 10, 16, 12))])
+            await session.execute(insert(Buy), [{"buyer_id": 1, "quantity": quantity, "total_price": 0.1 * quantity,
+                                                 "buy_datetime": datetime.datetime.combine(day, datetime.time(12))}
+                                                for day in DAYS for quantity in [1, 2]])
+            await DailyStatisticsRepository.rebuild(session)
+            assert await DailyStatisticsRepository.is_consistent(session)
+            # The same totals, but a buy moved to the other day.
+            await session.execute(update(DailySales).where(DailySales.day == DAYS[0])
+                                  .values(buys_count=DailySales.buys_count - 1))
+            await session.execute(update(DailySales).where(DailySales.day == DAYS[1])
+                                  .values(buys_count=DailySales.buys_count + 1))
+            assert not await DailyStatisticsRepository.is_consistent(session)
+            await DailyStatisticsRepository.rebuild(session)
+            # The same totals, but revenue moved to the other day.
+            await session.execute(update(DailySales).where(DailySales.day == DAYS[0])
+                                  .values(revenue=DailySales.revenue - 0.1))
+            await session.execute(update(DailySales).where(DailySales.day == DAYS[1])
+                                  .values(revenue=DailySales.revenue + 0.1))
+            assert not await DailyStatisticsRepository.is_consistent(session)
+            await DailyStatisticsRepository.rebuild(session)
+            # A day whose buys were all refunded keeps its rollup row of zeros.
+            await session.execute(update(Buy).where(Buy.buy_datetime >= DAYS[1]).values(is_refunded=True))
+            await session.execute(update(DailySales).where(DailySales.day == DAYS[1])
+                                  .values(buys_count=0, items_sold=0, revenue=DailySales.revenue - 0.3))
+            assert await DailyStatisticsRepository.is_consistent(session)
+
+    run_with_database(scenario)
@@ -0,0 +1,89 @@
+import asyncio
+import gc
+import threading
+import time
+
+import pytest
+
+import config
+import db
+from repositories.item import ItemRepository
+from repositories.stockSummary import StockSummaryRepository
+from tests.database import add_catalog, file_database
+
+sqlcipher = pytest.importorskip("sqlcipher3.dbapi2")
+
+PARALLEL_SESSIONS = 8
+UPDATES = 80
+DB_NAME = "test_encrypted_mode.db"
+
+
+class SQLCipherRecorder:
+    """Connects with SQLCipher and records the threads that open the connections and execute the statements."""
+
+    def __init__(self):
+        self.threads = set()
+
+    def connect(self, *args, **kwargs):
+        self.threads.add(threading.get_ident())
+        connection = sqlcipher.connect(*args, **kwargs)
+        connection.set_trace_callback(lambda statement: self.threads.add(threading.get_ident()))
+        return connection
+
+
+@pytest.mark.benchmark
+def test_encrypted_sessions_run_off_the_event_loop(monkeypatch):
+    recorder = SQLCipherRecorder()
+    monkeypatch.setattr(db, "sqlcipher", recorder, raising=False)
+    monkeypatch.setattr(config, "DB_ENCRYPTION", True)
+    monkeypatch.setattr(config, "DB_PASS", "test")
+    timings = {}
+    loop_stalls = []
+    loop_threads = []
+
+    async def measure_loop_stalls(stop: asyncio.Event):
+        while not stop.is_set():
+            started_at = time.perf_counter()
+            await asyncio.sleep(0.001)
+            loop_stalls.append(time.perf_counter() - started_at - 0.001)
+
+    async def scenario():
+        loop_threads.append(threading.get_ident())
+        async with file_database(monkeypatch, DB_NAME, wal=True, read_pool_size=PARALLEL_SESSIONS) as session_maker:
+            async with session_maker() as session:
+                await add_catalog(session, 10, UPDATES)
+
+            async def handle_update(number: int):
+                # A catalog read and a purchase, like a user browsing and buying.
+                async with session_maker() as session:
+                    await StockSummaryRepository.get_in_stock(session)
+                    await ItemRepository.claim_unsold(1, 1 + number % 10, 1, session)
+                    await session.commit()
+
+            # Every pooled connection derives the key once, the warm-up keeps it out of the timings.
+            await asyncio.gather(*[handle_update(number) for number in range(PARALLEL_SESSIONS)])
+            # A full collection of the test process' heap stalls the loop by itself, it isn't part of the measurement.
+            gc.collect()
+            gc.freeze()
+            try:
+                stop = asyncio.Event()
+                loop_watcher = asyncio.create_task(measure_loop_stalls(stop))
+                started_at = time.perf_counter()
+                for number in range(UPDATES // 2):
+                    await handle_update(number)
+                timings["sequential"] = time.perf_counter() - started_at
+                started_at = time.perf_counter()
+                await asyncio.gather(*[handle_update(number) for number in range(UPDATES // 2)])
+                timings["parallel"] = time.perf_counter() - started_at
+                stop.set()
+                await loop_watcher
+            finally:
+                gc.unfreeze()
+
+    asyncio.run(scenario())
+    for name, seconds in timings.items():
+        print(f"{name}: {UPDATES // 2 / seconds:.0f} updates/s")
+    print(f"longest event loop stall: {max(loop_stalls) * 1000:.1f} ms")
+    # SQLCipher runs on the connections' worker threads, the loop only waits for the Python side of a statement.
+    assert len(recorder.threads) > 0
+    assert loop_threads[0] not in recorder.threads
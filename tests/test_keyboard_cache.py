@@ -0,0 +1,17 @@
+from aiogram import types
+
+from utils.keyboard_cache import KeyboardCache
+from utils.localizator import Localizator
+
+
+def build_menu() -> types.ReplyKeyboardMarkup:
+    return types.ReplyKeyboardMarkup(resize_keyboard=True, keyboard=[[types.KeyboardButton(text="menu")]])
+
+
+def test_cached_keyboards_are_not_shared():
+    Localizator.set_language("en")
+    built = KeyboardCache.get("test_menu", build_menu)
+    built.keyboard[0].append(types.KeyboardButton(text="added by a handler"))
+    cached = KeyboardCache.get("test_menu", build_menu)
+    cached.keyboard[0][0].text = "changed by a handler"
+    assert KeyboardCache.get("test_menu", build_menu) == build_menu()
@@ -0,0 +1,47 @@
+from sqlalchemy import insert, text
+
+import config
+from models.buy import Buy
+from models.category import Category
+from models.subcategory import Subcategory
+from models.user import User
+from repositories.buy import BuyRepository
+from tests.database import run_with_database, user_row
+from utils.keyset_pagination import KeysetPagination
+
+
+def test_purchase_history_pages_buys_of_the_same_second_once():
+    buys_count = 2 * config.PAGE_ENTRIES + 2
+
+    async def scenario(session_maker, engine):
+        async with session_maker() as session:
+            await session.execute(insert(User), [user_row(1)])
+            await session.execute(insert(Category), [{"name": "category"}])
+            await session.execute(insert(Subcategory), [{"name": "subcategory"}])
+            # One checkout inserts a buy per cart line within the same second,
+            # CURRENT_TIMESTAMP stores it without fractional seconds.
+            await session.execute(insert(Buy).values(buy_datetime=text("'2026-10-18 05:21:46'")),
+                                  [{"buyer_id": 1, "quantity": 1, "total_price": 1.0, "category_id": 1,
+                                    "subcategory_id": 1} for _ in range(buys_count)])
+            await session.commit()
+
+            forward_pages = []
+            page = KeysetPagination.FIRST_PAGE
+            # A page that repeats itself would never end, the walk stops after more pages than buys.
+            while page is not None and len(forward_pages) <= buys_count:
+                buys, pagination = await BuyRepository.get_purchase_history(1, page, session)
+                forward_pages.append([buy.id for buy in buys])
+                page = pagination.next_page if pagination.has_next else None
+            backward_pages = []
+            page = KeysetPagination.LAST_PAGE
+            while page is not None and len(backward_pages) <= buys_count:
+                buys, pagination = await BuyRepository.get_purchase_history(1, page, session)
+                backward_pages.insert(0, [buy.id for buy in buys])
+                page = pagination.previous_page if pagination.has_previous else None
+
+        newest_first = list(range(buys_count, 0, -1))
+        assert sum(forward_pages, []) == newest_first
+        assert sum(backward_pages, []) == newest_first
+        assert len(forward_pages) == 3
+
+    run_with_database(scenario)
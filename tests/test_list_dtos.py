@@ -0,0 +1,90 @@
+import time
+
+import pytest
+from sqlalchemy import insert, select
+
+from models.category import Category
+from models.stockSummary import StockSummary, StockSummaryNamedDTO
+from models.subcategory import Subcategory
+from models.user import User, UserDTO
+from repositories.stockSummary import StockSummaryRepository
+from repositories.user import UserRepository
+from tests.database import run_with_database, user_row
+
+ROWS = 100
+BENCHMARK_ROWS = 100_000
+
+
+async def timed(coroutine) -> tuple[list, float]:
+    started_at = time.perf_counter()
+    result = await coroutine
+    return result, time.perf_counter() - started_at
+
+
+async def validated_in_stock(session) -> list[StockSummaryNamedDTO]:
+    # The rows of the same query converted with model_validate, the path list queries used before.
+    stmt = (select(StockSummary.category_id,
+                   StockSummary.subcategory_id,
+                   Category.name.label("category_name"),
+                   Subcategory.name.label("subcategory_name"),
+                   StockSummary.available_qty,
+                   StockSummary.price)
+            .join(Category, Category.id == StockSummary.category_id)
+            .join(Subcategory, Subcategory.id == StockSummary.subcategory_id)
+            .where(StockSummary.available_qty > 0)
+            .order_by(StockSummary.category_id, StockSummary.subcategory_id))
+    rows = await session.execute(stmt)
+    return [StockSummaryNamedDTO.model_validate(row, from_attributes=True) for row in rows]
+
+
+async def validated_active(session) -> list[UserDTO]:
+    users = await session.execute(select(User).where(User.can_receive_messages == True))
+    return [UserDTO.model_validate(user, from_attributes=True) for user in users.scalars()]
+
+
+async def add_rows(session, rows: int):
+    await session.execute(insert(Category), [{"name": "category"}])
+    await session.execute(insert(Subcategory), [{"name": f"subcategory{number}", "name_translations": {}}
+                                                for number in range(rows)])
+    await session.execute(insert(StockSummary), [{"category_id": 1, "subcategory_id": number,
+                                                  "available_qty": 1, "price": 1.0}
+                                                 for number in range(1, rows + 1)])
+    await session.execute(insert(User), [user_row(telegram_id, can_receive_messages=True)
+                                         for telegram_id in range(1, rows + 1)])
+    await session.commit()
+
+
+def test_in_stock_listing_and_broadcast_targets_match_validated_dtos():
+    async def scenario(session_maker, engine):
+        async with session_maker() as session:
+            await add_rows(session, ROWS)
+        async with session_maker() as session:
+            stock = await StockSummaryRepository.get_in_stock(session)
+            validated_stock = await validated_in_stock(session)
+            users = await UserRepository.get_active(session)
+            validated_users = await validated_active(session)
+
+        assert len(stock) == ROWS
+        assert stock == validated_stock
+        assert [(user.id, user.telegram_id) for user in users] == \
+               [(user.id, user.telegram_id) for user in validated_users]
+
+    run_with_database(scenario)
+
+
+@pytest.mark.benchmark
+def test_in_stock_listing_and_broadcast_targets_skip_validation():
+    timings = {}
+
+    async def scenario(session_maker, engine):
+        async with session_maker() as session:
+            await add_rows(session, BENCHMARK_ROWS)
+        async with session_maker() as session:
+            _, timings["get_in_stock"] = await timed(StockSummaryRepository.get_in_stock(session))
+            _, timings["get_in_stock validated"] = await timed(validated_in_stock(session))
+            _, timings["get_active"] = await timed(UserRepository.get_active(session))
+            _, timings["get_active validated"] = await timed(validated_active(session))
+
+    run_with_database(scenario)
+    for name, seconds in timings.items():
+        print(f"{name} at {BENCHMARK_ROWS} rows: {seconds:.2f} s")
@@ -0,0 +1,67 @@
+import builtins
+import json
+import os
+import shutil
+import time
+
+import utils.localizator
+from enums.bot_entity import BotEntity
+from utils.localizator import Localizator, L10N_FOLDER
+
+CALLS = 2000
+
+
+def get_text_from_file(entity: BotEntity, key: str) -> str:
+    # The path get_text took before the catalog: the whole file was read and parsed on every call.
+    with open(L10N_FOLDER / "en.json", "r", encoding="UTF-8") as f:
+        return json.load(f)[entity.name.lower()][key]
+
+
+def test_get_text_is_a_catalog_lookup(monkeypatch):
+    keys = [(BotEntity.USER, "all_categories"), (BotEntity.COMMON, "confirm"), (BotEntity.ADMIN, "send_everyone")]
+    Localizator.set_language("en")
+    assert all(Localizator.get_text(*key) == get_text_from_file(*key) for key in keys)
+    opened_files = []
+    real_open = builtins.open
+
+    def counting_open(file, *args, **kwargs):
+        opened_files.append(file)
+        return real_open(file, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, "open", counting_open)
+    timings = {}
+    for name, get_text in [("file", get_text_from_file), ("catalog", Localizator.get_text)]:
+        opened_files.clear()
+        started_at = time.perf_counter()
+        for call in range(CALLS):
+            get_text(*keys[call % len(keys)])
+        timings[name] = (time.perf_counter() - started_at) / CALLS
+
+    print(f"get_text from file: {timings['file'] * 1e6:.1f} us, from the catalog: {timings['catalog'] * 1e6:.2f} us")
+    # Once the catalog is loaded, no l10n file is read until one of them is modified.
+    assert opened_files == []
+
+
+def test_modified_file_reloads_the_catalog(tmp_path, monkeypatch):
+    Localizator.get_version()
+    # The loaded catalog of the l10n folder is restored after the test.
+    for attribute in ["_catalog", "_currencies", "_currency_list_texts", "_mtimes", "_last_check", "version"]:
+        monkeypatch.setattr(Localizator, attribute, getattr(Localizator, attribute))
+    shutil.copy(L10N_FOLDER / "en.json", tmp_path / "en.json")
+    monkeypatch.setattr(utils.localizator, "L10N_FOLDER", tmp_path)
+    Localizator._last_check = 0.0
+    version = Localizator.get_version()
+    assert Localizator.get_text(BotEntity.COMMON, "confirm", "en") != "Reloaded"
+
+    with open(tmp_path / "en.json", "r", encoding="UTF-8") as f:
+        translations = json.load(f)
+    translations["common"]["confirm"] = "Reloaded"
+    with open(tmp_path / "en.json", "w", encoding="UTF-8") as f:
+        json.dump(translations, f)
+    # The mtime must differ from the copied file's, whatever the resolution of the file system.
+    stat = (tmp_path / "en.json").stat()
+    os.utime(tmp_path / "en.json", (stat.st_atime, stat.st_mtime + 10))
+    Localizator._last_check = 0.0
+
+    assert Localizator.get_text(BotEntity.COMMON, "confirm", "en") == "Reloaded"
+    assert Localizator.get_version() == version + 1
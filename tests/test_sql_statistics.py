@@ -0,0 +1,43 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from tests.database import run_with_database
+from utils import sql_statistics
+from utils.sql_statistics import SQLStatistics, get_statement_shape
+
+
+class ConnectionStub:
+    def __init__(self):
+        self.info = {}
+
+
+def test_failed_statement_drops_its_start_time(monkeypatch):
+    monkeypatch.setattr(SQLStatistics, "_stats", {})
+
+    async def scenario(session_maker, engine):
+        SQLStatistics.register(engine.sync_engine)
+        async with engine.connect() as connection:
+            with pytest.raises(OperationalError):
+                await connection.execute(text("SELECT * FROM missing_table"))
+            await connection.execute(text("SELECT 1"))
+            start_times = (await connection.get_raw_connection()).info["query_start_time"]
+
+        assert start_times == []
+        assert list(SQLStatistics._stats) == ["SELECT ?"]
+
+    run_with_database(scenario)
+
+
+def test_statement_shapes_are_bounded(monkeypatch):
+    monkeypatch.setattr(SQLStatistics, "_stats", {})
+    monkeypatch.setattr(sql_statistics, "MAX_SHAPES", 2)
+    assert (get_statement_shape("INSERT INTO items (a, b) VALUES (?, ?), (?, ?), (?, ?)")
+            == get_statement_shape("INSERT INTO items (a, b) VALUES (?, ?)"))
+    connection = ConnectionStub()
+    for table in ["users", "items", "buys", "deposits"]:
+        SQLStatistics._before_cursor_execute(connection, None, None, None, None, False)
+        SQLStatistics._after_cursor_execute(connection, None, f"SELECT * FROM {table}", None, None, False)
+
+    assert list(SQLStatistics._stats) == ["SELECT * FROM users", "SELECT * FROM items", sql_statistics.OTHER_SHAPES]
+    assert SQLStatistics._stats[sql_statistics.OTHER_SHAPES].count == 2
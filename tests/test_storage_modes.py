@@ -0,0 +1,84 @@
+import asyncio
+import time
+
+import pytest
+from sqlalchemy import select, text
+
+from models.category import Category
+from models.item import ItemDTO
+from repositories.item import ItemRepository
+from repositories.stockSummary import StockSummaryRepository
+from tests.database import add_catalog, file_database
+
+READERS = 4
+IMPORTED_ITEMS = 20000
+ANSWER_SECONDS = 0.3
+
+
+def test_raw_sql_writes_go_to_the_writer(monkeypatch):
+    async def scenario():
+        async with file_database(monkeypatch, "test_routing.db", wal=True) as session_maker:
+            async with session_maker() as session:
+                await session.execute(text("SELECT count(*) FROM categories"))
+                assert not session.sync_session.uses_writer
+                await session.execute(select(Category).execution_options(writer=True))
+                assert session.sync_session.uses_writer
+                await session.rollback()
+                # A read-only connection fails with "attempt to write a readonly database".
+                await session.execute(text("INSERT INTO categories (name, name_translations) VALUES ('category', '{}')"))
+                assert session.sync_session.uses_writer
+                await session.execute(text(" update categories SET name = 'renamed'"))
+                await session.commit()
+            async with session_maker() as session:
+                assert (await session.execute(select(Category.name))).scalars().all() == ["renamed"]
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.benchmark
+def test_wal_reads_are_not_blocked_by_writes(monkeypatch):
+    read_latencies = {}
+    throughputs = {}
+
+    async def scenario(wal: bool):
+        db_name = "test_wal.db" if wal else "test_rollback_journal.db"
+        async with file_database(monkeypatch, db_name, wal, read_pool_size=READERS) as session_maker:
+            async with session_maker() as session:
+                await add_catalog(session, 10, 10)
+            # An import larger than SQLite's default 2 MB page cache.
+            items = [ItemDTO(category_id=1, subcategory_id=1 + number % 10, private_data=f"new{number}",
+                             price=2.5, description="description", description_translations={})
+                     for number in range(IMPORTED_ITEMS)]
+            latencies = read_latencies[db_name] = []
+            committed = asyncio.Event()
+
+            async def browse():
+                while not committed.is_set():
+                    started_at = time.perf_counter()
+                    async with session_maker() as session:
+                        await StockSummaryRepository.get_in_stock(session)
+                    latencies.append(time.perf_counter() - started_at)
+
+            async with session_maker() as session:
+                await ItemRepository.add_many(items, session)
+                await StockSummaryRepository.add_items(items, session)
+                # The handler answers the admin before DBSessionMiddleware commits the import,
+                # the catalog is browsed in the meantime.
+                started_at = time.perf_counter()
+                readers = asyncio.gather(*[browse() for _ in range(READERS)])
+                await asyncio.sleep(ANSWER_SECONDS)
+                await session.commit()
+                committed.set()
+            await readers
+            throughputs[db_name] = len(latencies) / (time.perf_counter() - started_at)
+
+    asyncio.run(scenario(wal=False))
+    asyncio.run(scenario(wal=True))
+    for db_name, latencies in read_latencies.items():
+        print(f"{db_name}: {throughputs[db_name]:.0f} reads/s while the import commits, "
+              f"longest read {max(latencies) * 1000:.1f} ms")
+    # In rollback journal mode the spilled import holds the exclusive lock until its commit,
+    # WAL readers keep reading the last committed snapshot.
+    assert max(read_latencies["test_rollback_journal.db"]) > ANSWER_SECONDS
+    assert max(read_latencies["test_wal.db"]) < ANSWER_SECONDS
+    assert throughputs["test_wal.db"] > throughputs["test_rollback_journal.db"]
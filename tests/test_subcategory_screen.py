@@ -0,0 +1,22 @@
+import config
+from callbacks import AllCategoriesCallback
+from services.subcategory import SubcategoryService
+from tests.database import run_with_database, count_statements, add_catalog, CallbackStub
+
+
+def test_subcategory_page_is_one_query():
+    async def scenario(session_maker, engine):
+        async with session_maker() as session:
+            await add_catalog(session, config.PAGE_ENTRIES + 2, 3)
+            callback = CallbackStub(AllCategoriesCallback.create(1, category_id=1))
+            with count_statements(engine) as statements:
+                msg, kb_builder = await SubcategoryService.get_buttons(callback, session)
+
+        assert len(statements) == 1
+        rows = kb_builder.as_markup().inline_keyboard
+        subcategory_buttons = [row[0].text for row in rows[:config.PAGE_ENTRIES]]
+        assert all("subcategory" in text and "2.5" in text and "3" in text for text in subcategory_buttons)
+        # Pagination and back button rows follow the page of subcategories.
+        assert len(rows) == config.PAGE_ENTRIES + 2
+
+    run_with_database(scenario)
@@ -0,0 +1,65 @@
+import copy
+
+from sqlalchemy import insert, select
+
+from models.item import Item
+from models.user import User, UserDTO
+from repositories.item import ItemRepository
+from repositories.user import UserRepository
+from tests.database import run_with_database, count_statements, user_row, add_catalog
+
+
+def test_only_assigned_and_updated_fields_are_changed():
+    user = UserDTO.model_validate(user_row(1, language="en"))
+    assert user.get_changes() == {}
+    user.language = "de"
+    user.currency = user.currency
+    assert user.get_changes() == {"language": "de"}
+
+    copied = user.model_copy(update={"currency": "EUR"})
+    shallow_copy = copy.copy(user)
+    user.telegram_username = "renamed"
+    assert copied.get_changes() == {"language": "de", "currency": "EUR"}
+    assert shallow_copy.get_changes() == {"language": "de"}
+    assert user.get_changes() == {"language": "de", "telegram_username": "renamed"}
+
+
+def test_dto_rebuilt_from_a_dict_updates_the_assigned_column():
+    async def scenario(session_maker, engine):
+        async with session_maker() as session:
+            await session.execute(insert(User), [user_row(1, language="en", top_up_amount=10.0)])
+            user = UserDTO.model_validate(user_row(1, language="en", top_up_amount=0.0))
+            user.language = "de"
+            with count_statements(engine) as statements:
+                await UserRepository.update(user, session)
+            stored = (await session.execute(select(User.language, User.top_up_amount))).one()
+
+        assert len(statements) == 1 and "SET language=?" in statements[0]
+        assert tuple(stored) == ("de", 10.0)
+
+    run_with_database(scenario)
+
+
+def test_item_update_groups_the_changes_by_statement():
+    async def scenario(session_maker, engine):
+        async with session_maker() as session:
+            await add_catalog(session, 1, 5)
+            items = [await ItemRepository.get_by_id(item_id, session) for item_id in range(1, 6)]
+            # The same change of two items, different prices of two others, the fifth item is unchanged.
+            items[0].is_new = False
+            items[1].is_new = False
+            items[2].price = 3.0
+            items[3].price = 4.0
+            with count_statements(engine) as statements:
+                await ItemRepository.update(items, session)
+            await session.commit()
+            rows = (await session.execute(select(Item.id, Item.is_new, Item.price).order_by(Item.id))).all()
+
+        assert len(statements) == 2
+        assert any("WHERE items.id IN" in statement for statement in statements)
+        assert any("WHERE items.id = ?" in statement for statement in statements)
+        assert [tuple(row) for row in rows] == [(1, False, 2.5), (2, False, 2.5), (3, True, 3.0), (4, True, 4.0),
+                                                (5, True, 2.5)]
+        assert all(item.get_changes() == {} for item in items)
+
+    run_with_database(scenario)
@@ -0,0 +1,72 @@
+import asyncio
+import datetime
+
+import pytest
+from aiogram import Bot, Dispatcher, Router
+from aiogram.client.session.base import BaseSession
+from aiogram.types import Message, Update
+from sqlalchemy import select, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import db
+from db import session_mark_dirty
+from middleware.database import DBSessionMiddleware, CommitBeforeRequestMiddleware
+from models.user import User
+from tests.database import file_database, user_row
+
+
+class TelegramStub(BaseSession):
+    """Answers every Bot API request with a sent message and records the users committed at that moment."""
+
+    def __init__(self, session_maker):
+        super().__init__()
+        self.session_maker = session_maker
+        self.committed_users = []
+
+    async def make_request(self, bot, method, timeout=None):
+        async with self.session_maker() as session:
+            self.committed_users.append(await session.scalar(select(func.count()).select_from(User)))
+        return Message.model_validate({"message_id": 2, "date": datetime.datetime.now(),
+                                       "chat": {"id": 1, "type": "private"}, "text": method.text})
+
+    async def stream_content(self, url, headers=None, timeout=30, chunk_size=65536, raise_for_status=True):
+        yield b""
+
+    async def close(self):
+        pass
+
+
+def message_update(text: str) -> Update:
+    return Update.model_validate({"update_id": 1, "message": {
+        "message_id": 1, "date": datetime.datetime.now(), "text": text,
+        "chat": {"id": 1, "type": "private"}, "from": {"id": 1, "is_bot": False, "first_name": "user"}}})
+
+
+def test_changes_are_committed_before_the_answer(monkeypatch):
+    router = Router()
+
+    @router.message()
+    async def register(message: Message, session: AsyncSession):
+        session.add(User(**user_row(int(message.text))))
+        session_mark_dirty(session)
+        await message.answer("added")
+
+    dispatcher = Dispatcher()
+    dispatcher.include_router(router)
+    dispatcher.message.outer_middleware(DBSessionMiddleware())
+
+    async def scenario():
+        async with file_database(monkeypatch, "test_unit_of_work.db", wal=True) as session_maker:
+            monkeypatch.setattr(db, "session_maker", session_maker)
+            telegram = TelegramStub(session_maker)
+            telegram.middleware(CommitBeforeRequestMiddleware())
+            bot = Bot("123456:test", session=telegram)
+            await dispatcher.feed_update(bot, message_update("1"))
+            assert telegram.committed_users == [1]
+            # The user exists already, the answer isn't sent when the commit fails.
+            with pytest.raises(IntegrityError):
+                await dispatcher.feed_update(bot, message_update("1"))
+            assert telegram.committed_users == [1]
+
+    asyncio.run(scenario())
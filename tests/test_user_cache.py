@@ -0,0 +1,57 @@
+import json
+
+from sqlalchemy import insert
+
+import config
+from db import session_commit
+from models.user import User
+from repositories.user import UserRepository
+from tests.database import run_with_database, count_statements, user_row
+from utils.user_cache import UserCache
+
+
+class RedisStub:
+    def __init__(self):
+        self.values = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+
+
+def test_balances_are_read_from_the_database(monkeypatch):
+    redis = RedisStub()
+    monkeypatch.setattr(UserCache, "_redis", redis)
+    monkeypatch.setattr(config, "USER_CACHE_TTL_SECONDS", 30)
+
+    async def scenario(session_maker, engine):
+        async with session_maker() as session:
+            await session.execute(insert(User), [user_row(1, top_up_amount=10.0, consume_records=0.0)])
+            await session.commit()
+        async with session_maker() as session:
+            stale_user = await UserRepository.get_by_tgid(1, session)
+        cached_user = json.loads(redis.values["user:1"])
+        assert cached_user.keys().isdisjoint(UserCache.UNCACHED_FIELDS)
+        async with session_maker() as session:
+            assert await UserRepository.charge(stale_user.id, 4.0, session)
+            await session_commit(session)
+        assert "user:1" not in redis.values
+        # A concurrent update that loaded the user before the charge was committed caches it afterwards.
+        await UserCache.set(stale_user)
+        async with session_maker() as session:
+            with count_statements(engine) as statements:
+                user = await UserRepository.get_by_tgid(1, session)
+                assert user.telegram_username == "user1"
+                assert user.consume_records is None
+                user = await UserRepository.get_by_tgid(1, session, use_cache=False)
+                assert await UserRepository.get_by_tgid(1, session, use_cache=False) is user
+        assert len(statements) == 1
+        assert (user.top_up_amount, user.consume_records, user.seed) == (10.0, 4.0, "seed1")
+
+    run_with_database(scenario)
@@ -0,0 +1,97 @@
+import asyncio
+import json
+from typing import Awaitable, Callable
+
+from aiogram.types import InlineKeyboardMarkup
+from aiogram.utils.keyboard import InlineKeyboardBuilder
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import config
+from callbacks import AllCategoriesCallback
+from db import session_after_commit
+from utils.localizator import Localizator
+
+CatalogPage = tuple[str, InlineKeyboardBuilder]
+
+
+class CatalogCache:
+    """
+    Rendered category and subcategory pages in Redis, keyed by the catalog version, language, currency,
+    level, category id and page token. Changes of the stock and of the items held for carts bump the version
+    after they are committed, pages of older versions are never read again and expire after the TTL.
+    Concurrent misses of the same page in the process wait for one render.
+    """
+    VERSION_KEY = "catalog:version"
+    _redis: Redis | None = None
+    _renders: dict[str, asyncio.Future] = {}
+    # The l10n catalog version the process rendered with, a reload of the l10n files bumps the version as well.
+    _l10n_version: int = -1
+
+    @staticmethod
+    def init(redis: Redis):
+        CatalogCache._redis = redis
+
+    @staticmethod
+    def __is_enabled() -> bool:
+        return CatalogCache._redis is not None and config.CATALOG_CACHE_TTL_SECONDS > 0
+
+    @staticmethod
+    async def __get_version() -> int:
+        l10n_version = Localizator.get_version()
+        if CatalogCache._l10n_version != l10n_version:
+            CatalogCache._l10n_version = l10n_version
+            return await CatalogCache._redis.incr(CatalogCache.VERSION_KEY)
+        return int(await CatalogCache._redis.get(CatalogCache.VERSION_KEY) or 0)
+
+    @staticmethod
+    async def bump_version():
+        if CatalogCache.__is_enabled():
+            await CatalogCache._redis.incr(CatalogCache.VERSION_KEY)
+
+    @staticmethod
+    def invalidate(session: AsyncSession):
+        """Bumps the version once the transaction that changed the stock is committed."""
+        session_after_commit(session, CatalogCache.bump_version)
+
+    @staticmethod
+    def __pack(page: CatalogPage) -> str:
+        text, kb_builder = page
+        return json.dumps({"text": text,
+                           "keyboard": kb_builder.as_markup().model_dump(mode="json", exclude_none=True)})
+
+    @staticmethod
+    def __unpack(page: bytes) -> CatalogPage:
+        page = json.loads(page)
+        markup = InlineKeyboardMarkup.model_validate(page["keyboard"])
+        return page["text"], InlineKeyboardBuilder.from_markup(markup)
+
+    @staticmethod
+    async def get(unpacked_cb: AllCategoriesCallback, render: Callable[[], Awaitable[CatalogPage]]) -> CatalogPage:
+        if not CatalogCache.__is_enabled():
+            return await render()
+        version = await CatalogCache.__get_version()
+        key = (f"catalog:{version}:{Localizator.get_language()}:{Localizator.get_currency()}:"
+               f"{unpacked_cb.level}:{unpacked_cb.category_id}:{unpacked_cb.page}")
+        page = await CatalogCache._redis.get(key)
+        if page is not None:
+            return CatalogCache.__unpack(page)
+        pending_render = CatalogCache._renders.get(key)
+        if pending_render is not None:
+            page = await asyncio.shield(pending_render)
+            # Every waiting update unpacks its own keyboard builder.
+            if page is not None:
+                return CatalogCache.__unpack(page)
+            return await render()
+        pending_render = asyncio.get_running_loop().create_future()
+        CatalogCache._renders[key] = pending_render
+        packed_page = None
+        try:
+            page = await render()
+            packed_page = CatalogCache.__pack(page)
+            await CatalogCache._redis.set(key, packed_page, ex=config.CATALOG_CACHE_TTL_SECONDS)
+            return page
+        finally:
+            # A failed render doesn't fail the waiting updates, they render the page themselves.
+            pending_render.set_result(packed_page)
+            del CatalogCache._renders[key]
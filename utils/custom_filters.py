@@ -1,11 +1,13 @@
 from aiogram import types
 from aiogram.filters import BaseFilter
 from aiogram.types import Message
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from config import ADMIN_ID_LIST
-from db import get_db_session
+from enums.bot_entity import BotEntity
 from models.user import UserDTO
 from services.user import UserService
+from utils.localizator import Localizator
 
 
 class AdminIdFilter(BaseFilter):
@@ -15,7 +17,40 @@ class AdminIdFilter(BaseFilter):
 
 
 class IsUserExistFilter(BaseFilter):
+    """Looks the user up in the update's session and passes it to the handler data as user."""
+    async def __call__(self, message: Message, session: AsyncSession) -> bool | dict[str, UserDTO]:
+        user = await UserService.get(UserDTO(telegram_id=message.from_user.id), session)
+        if user is None:
+            return False
+        return {"user": user}
+
+
+class ReplyButtonFilter(BaseFilter):
+    """
+    Matches a reply keyboard button by its label in any of the bot languages.
+    Every instance registers its (entity, key) route, labels of all registered routes
+    are indexed once per l10n catalog version, so matching a message is a single dict lookup.
+    """
+    _registered_routes: set[tuple[BotEntity, str]] = set()
+    _label_index: dict[str, tuple[BotEntity, str]] = {}
+    _index_version: int = -1
+
+    def __init__(self, entity: BotEntity, key: str):
+        self.route = (entity, key)
+        ReplyButtonFilter._registered_routes.add(self.route)
+        ReplyButtonFilter._index_version = -1
+
+    @staticmethod
+    def resolve(text: str | None) -> tuple[BotEntity, str] | None:
+        version = Localizator.get_version()
+        if ReplyButtonFilter._index_version != version:
+            label_index = {}
+            for language in Localizator.get_languages():
+                for entity, key in ReplyButtonFilter._registered_routes:
+                    label_index[Localizator.get_text(entity, key, language)] = (entity, key)
+            ReplyButtonFilter._label_index = label_index
+            ReplyButtonFilter._index_version = version
+        return ReplyButtonFilter._label_index.get(text)
+
     async def __call__(self, message: Message) -> bool:
-        async with get_db_session() as session:
-            is_exist = await UserService.get(UserDTO(telegram_id=message.from_user.id), session)
-            return is_exist is not None
+        return ReplyButtonFilter.resolve(message.text) == self.route
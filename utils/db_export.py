@@ -0,0 +1,68 @@
+import asyncio
+import zlib
+from pathlib import Path
+from typing import BinaryIO
+
+import config
+from db import read_engine
+
+# Telegram bots can upload documents up to 50 MB, bigger exports are sent in several parts.
+MAX_PART_SIZE = 49 * 1024 * 1024
+CHUNK_SIZE = 1024 * 1024
+
+
+class DBExporter:
+    """
+    Exports a consistent snapshot of the live database as gzip parts on disk,
+    memory usage is bounded by CHUNK_SIZE no matter how big the database is.
+    """
+
+    @staticmethod
+    async def create_snapshot(snapshot_path: Path) -> None:
+        # VACUUM INTO copies the database inside one read transaction, so the snapshot is consistent
+        # while the bot keeps writing. It runs in the worker thread of the connection,
+        # with SQLCipher the snapshot is encrypted with the same key.
+        async with read_engine.connect() as conn:
+            await conn.exec_driver_sql("VACUUM INTO ?", (str(snapshot_path),))
+
+    @staticmethod
+    def compress(snapshot_path: Path, gzip_path: Path) -> list[Path]:
+        """
+        Gzips the snapshot chunk by chunk into parts of at most MAX_PART_SIZE bytes,
+        concatenated parts form a single .gz file.
+        """
+        parts: list[Path] = []
+        part_file: BinaryIO | None = None
+
+        def write(data: bytes):
+            nonlocal part_file
+            while data:
+                if part_file is None or part_file.tell() >= MAX_PART_SIZE:
+                    if part_file is not None:
+                        part_file.close()
+                    parts.append(gzip_path.with_name(f"{gzip_path.name}.part{len(parts) + 1:03}"))
+                    part_file = open(parts[-1], "wb")
+                free_space = MAX_PART_SIZE - part_file.tell()
+                part_file.write(data[:free_space])
+                data = data[free_space:]
+
+        compressor = zlib.compressobj(level=6, wbits=31)
+        try:
+            with open(snapshot_path, "rb") as snapshot:
+                while chunk := snapshot.read(CHUNK_SIZE):
+                    write(compressor.compress(chunk))
+            write(compressor.flush())
+        finally:
+            if part_file is not None:
+                part_file.close()
+        if len(parts) == 1:
+            parts = [parts[0].rename(gzip_path)]
+        return parts
+
+    @staticmethod
+    async def export(export_dir: Path) -> list[Path]:
+        snapshot_path = export_dir / config.DB_NAME
+        await DBExporter.create_snapshot(snapshot_path)
+        parts = await asyncio.to_thread(DBExporter.compress, snapshot_path, export_dir / f"{config.DB_NAME}.gz")
+        snapshot_path.unlink()
+        return parts
@@ -0,0 +1,33 @@
+from typing import Callable, TypeVar
+
+from aiogram.types import TelegramObject
+
+from utils.localizator import Localizator
+
+T = TypeVar("T", bound=TelegramObject)
+
+
+class KeyboardCache:
+    """
+    Keeps built keyboards and buttons per (language, is_admin, keyboard id) serialized to JSON.
+    aiogram markups are mutable, every get validates a new instance, so a handler that changes
+    its keyboard doesn't change the one other updates get.
+    The whole cache is dropped when the l10n catalog is reloaded.
+    """
+    _cache: dict[tuple[str, bool, str], tuple[type[TelegramObject], str]] = {}
+    _version: int = -1
+
+    @staticmethod
+    def get(keyboard_id: str, build: Callable[[], T], is_admin: bool = False) -> T:
+        version = Localizator.get_version()
+        if KeyboardCache._version != version:
+            KeyboardCache._cache = {}
+            KeyboardCache._version = version
+        cache_key = (Localizator.get_language(), is_admin, keyboard_id)
+        packed = KeyboardCache._cache.get(cache_key)
+        if packed is None:
+            keyboard = build()
+            KeyboardCache._cache[cache_key] = (type(keyboard), keyboard.model_dump_json(exclude_none=True))
+            return keyboard
+        keyboard_type, keyboard_json = packed
+        return keyboard_type.model_validate_json(keyboard_json)
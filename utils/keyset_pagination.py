@@ -0,0 +1,64 @@
+from sqlalchemy import Select, tuple_, Label
+
+import config
+
+
+class KeysetPagination:
+    """
+    Paginates a query by a unique sort key instead of OFFSET. The page token kept in the callback data holds
+    the boundary key: "" is the first page, ">key" the page after key, "<key" the page before key and "<" the last page.
+    PAGE_ENTRIES + 1 rows are fetched, the extra row tells whether there is a page in the direction of travel,
+    so neither deep pages nor the pagination buttons need a count query.
+    The keys are integer or string columns, their values are compared the same way they are stored.
+    """
+    FIRST_PAGE = ""
+    LAST_PAGE = "<"
+
+    def __init__(self, page: str, *keys, descending: bool = False):
+        self.page = page
+        self.keys = keys
+        self.descending = descending
+        self.is_backward = page.startswith("<")
+        self.has_previous = False
+        self.has_next = False
+        self.previous_page: str | None = None
+        self.next_page: str | None = None
+
+    def apply(self, stmt: Select) -> Select:
+        # Going backward the rows are fetched in reverse order and reversed again in build().
+        is_ascending = self.descending == self.is_backward
+        boundary = self.page[1:]
+        if boundary:
+            values = [KeysetPagination.__decode(value, key) for value, key in zip(boundary.split(","), self.keys)]
+            if len(self.keys) == 1:
+                key, value = self.keys[0], values[0]
+            else:
+                key, value = tuple_(*self.keys), tuple_(*values)
+            stmt = stmt.where(key > value if is_ascending else key < value)
+        order_by = [key.asc() if is_ascending else key.desc() for key in self.keys]
+        return stmt.order_by(*order_by).limit(config.PAGE_ENTRIES + 1)
+
+    def build(self, rows: list) -> list:
+        """Cuts the rows fetched with apply() to the page and sets the tokens of the neighbouring pages."""
+        has_more = len(rows) > config.PAGE_ENTRIES
+        rows = list(rows[:config.PAGE_ENTRIES])
+        if self.is_backward:
+            rows.reverse()
+            self.has_previous = has_more
+            self.has_next = self.page != KeysetPagination.LAST_PAGE
+        else:
+            self.has_previous = self.page != KeysetPagination.FIRST_PAGE
+            self.has_next = has_more
+        if len(rows) > 0:
+            self.previous_page = "<" + self.__encode(rows[0])
+            self.next_page = ">" + self.__encode(rows[-1])
+        else:
+            self.has_previous = self.has_next = False
+        return rows
+
+    def __encode(self, row) -> str:
+        return ",".join(str(getattr(row, key.name if isinstance(key, Label) else key.key)) for key in self.keys)
+
+    @staticmethod
+    def __decode(value: str, key):
+        return key.type.python_type(value)
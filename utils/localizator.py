@@ -1,26 +1,111 @@
 import json
 import contextvars
+import time
+from pathlib import Path
+from typing import NamedTuple
+
 import config
 from enums.bot_entity import BotEntity
+from enums.currency import Currency, NOT_AMEX
 
 
 _language_var = contextvars.ContextVar("language", default=config.BOT_LANGUAGE)
 _currency_var = contextvars.ContextVar("currency", default=config.CURRENCY.value)
 
+L10N_FOLDER = Path("l10n")
+# How often (in seconds) the l10n folder is checked for modified files.
+RELOAD_CHECK_INTERVAL = 1.0
+
+_ENTITY_SECTIONS = {
+    BotEntity.ADMIN: "admin",
+    BotEntity.USER: "user",
+    BotEntity.COMMON: "common",
+}
+
+
+class CurrencyInfo(NamedTuple):
+    code: str
+    symbol: str
+    name: str
+    not_amex: bool
+    selection_text: str
+
 
 class Localizator:
+    # {language: {BotEntity: {key: text}}}, replaced as a whole on reload.
+    _catalog: dict[str, dict[BotEntity, dict]] = {}
+    # {language: {currency code: CurrencyInfo}} and {language: currency selection list}, built with the catalog.
+    _currencies: dict[str, dict[str, CurrencyInfo]] = {}
+    _currency_list_texts: dict[str, str] = {}
+    _mtimes: dict[str, float] = {}
+    _last_check: float = 0.0
+    # Increases every time the catalog is reloaded, caches built from l10n texts compare against it.
+    version: int = 0
+
+    @staticmethod
+    def _scan_mtimes() -> dict[str, float]:
+        return {lang_file.stem: lang_file.stat().st_mtime for lang_file in L10N_FOLDER.glob("*.json")}
+
+    @staticmethod
+    def _build_currency_table(common: dict) -> dict[str, CurrencyInfo]:
+        symbols = common.get("currency_symbols", {})
+        names = common.get("currency_names", {})
+        not_amex = set(common.get("not_amex", [currency.value for currency in NOT_AMEX]))
+        # Keep the order of currency_names, it is the order of the selection list.
+        codes = list(names.keys()) + [currency.value for currency in Currency if currency.value not in names]
+        currencies = {}
+        for code in codes:
+            name = names.get(code, code)
+            currencies[code] = CurrencyInfo(code=code,
+                                            symbol=symbols.get(code, code),
+                                            name=name,
+                                            not_amex=code in not_amex,
+                                            selection_text=f"{code} - {name}{' *' if code in not_amex else ''}")
+        return currencies
+
+    @staticmethod
+    def _load_catalog(mtimes: dict[str, float]) -> None:
+        catalog = {}
+        currencies = {}
+        currency_list_texts = {}
+        for language in mtimes:
+            with open(L10N_FOLDER / f"{language}.json", "r", encoding="UTF-8") as f:
+                translations = json.load(f)
+            catalog[language] = {entity: translations[section] for entity, section in _ENTITY_SECTIONS.items()}
+            common = catalog[language][BotEntity.COMMON]
+            currencies[language] = Localizator._build_currency_table(common)
+            currency_list_texts[language] = "\n".join(currencies[language][code].selection_text
+                                                      for code in common.get("currency_names", {}))
+        Localizator._catalog = catalog
+        Localizator._currencies = currencies
+        Localizator._currency_list_texts = currency_list_texts
+        Localizator._mtimes = mtimes
+        Localizator.version += 1
+
+    @staticmethod
+    def _get_catalog() -> dict[str, dict[BotEntity, dict]]:
+        now = time.monotonic()
+        if now - Localizator._last_check >= RELOAD_CHECK_INTERVAL:
+            Localizator._last_check = now
+            mtimes = Localizator._scan_mtimes()
+            if mtimes != Localizator._mtimes:
+                Localizator._load_catalog(mtimes)
+        return Localizator._catalog
 
     @staticmethod
-    def get_text(entity: BotEntity, key: str) -> str:
-        language = _language_var.get()
-        localization_filename = f"./l10n/{language}.json"
-        with open(localization_filename, "r", encoding="UTF-8") as f:
-            if entity == BotEntity.ADMIN:
-                return json.loads(f.read())["admin"][key]
-            elif entity == BotEntity.USER:
-                return json.loads(f.read())["user"][key]
-            else:
-                return json.loads(f.read())["common"][key]
+    def get_version() -> int:
+        Localizator._get_catalog()
+        return Localizator.version
+
+    @staticmethod
+    def get_languages() -> list[str]:
+        return list(Localizator._get_catalog().keys())
+
+    @staticmethod
+    def get_text(entity: BotEntity, key: str, language: str | None = None) -> str:
+        if language is None:
+            language = _language_var.get()
+        return Localizator._get_catalog()[language][entity][key]
 
     @staticmethod
     def set_language(language: str) -> None:
@@ -39,21 +124,29 @@ class Localizator:
         return _currency_var.get()
 
     @staticmethod
-    def get_currency_symbol(currency: str | None = None):
+    def get_currency_info(currency: str | None = None) -> CurrencyInfo:
         if currency is None:
             currency = Localizator.get_currency()
-        symbols = Localizator.get_text(BotEntity.COMMON, "currency_symbols")
-        return symbols.get(currency, currency)
+        currency_info = Localizator._get_currencies()[_language_var.get()].get(currency)
+        if currency_info is None:
+            currency_info = CurrencyInfo(code=currency, symbol=currency, name=currency, not_amex=False,
+                                         selection_text=currency)
+        return currency_info
+
+    @staticmethod
+    def _get_currencies() -> dict[str, dict[str, CurrencyInfo]]:
+        Localizator._get_catalog()
+        return Localizator._currencies
+
+    @staticmethod
+    def get_currency_symbol(currency: str | None = None):
+        return Localizator.get_currency_info(currency).symbol
 
     @staticmethod
     def get_currency_text(currency: str | None = None):
-        if currency is None:
-            currency = Localizator.get_currency()
-        names = Localizator.get_text(BotEntity.COMMON, "currency_names")
-        return names.get(currency, currency)
+        return Localizator.get_currency_info(currency).name
 
     @staticmethod
     def get_currency_list_text() -> str:
-        names = Localizator.get_text(BotEntity.COMMON, "currency_names")
-        lines = [f"{code} - {name}{' *' if code in Localizator.get_text(BotEntity.COMMON, 'not_amex') else ''}" for code, name in names.items()]
-        return "\n".join(lines)
+        Localizator._get_catalog()
+        return Localizator._currency_list_texts[_language_var.get()]
@@ -0,0 +1,26 @@
+from typing import Iterable
+
+# Telegram doesn't accept longer text messages.
+MESSAGE_MAX_LENGTH = 4096
+
+
+def split_message(lines: Iterable[str], prefix: str = "", suffix: str = "") -> list[str]:
+    """
+    Joins the lines into as few messages as possible, every message is wrapped into prefix and suffix
+    (e.g. an HTML tag that must be closed in each message) and a line is only split if it doesn't fit
+    into a message on its own.
+    """
+    max_length = MESSAGE_MAX_LENGTH - len(prefix) - len(suffix)
+    messages = []
+    current = ""
+    for line in lines:
+        if len(current) + len(line) > max_length and current:
+            messages.append(prefix + current + suffix)
+            current = ""
+        while len(line) > max_length:
+            messages.append(prefix + line[:max_length] + suffix)
+            line = line[max_length:]
+        current += line
+    if current or len(messages) == 0:
+        messages.append(prefix + current + suffix)
+    return messages
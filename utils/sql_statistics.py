@@ -0,0 +1,132 @@
+import html
+import logging
+import random
+import re
+import time
+from functools import lru_cache
+
+from sqlalchemy import event, Engine
+
+import config
+
+# Upper bounds (ms) of the timing histogram buckets, the last bucket catches everything slower.
+HISTOGRAM_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000)
+# Shapes beyond the limit are counted together, so statements that don't normalize can't grow the stats forever.
+MAX_SHAPES = 1000
+OTHER_SHAPES = "(other statements)"
+
+_whitespace_re = re.compile(r"\s+")
+_string_literal_re = re.compile(r"'(?:[^']|'')*'")
+_number_literal_re = re.compile(r"\b\d+(?:\.\d+)?\b")
+_placeholder_list_re = re.compile(r"\((?:\s*\?\s*,)*\s*\?\s*\)")
+_values_rows_re = re.compile(r"(\([^()]*\))(?:\s*,\s*\1)+")
+
+
+@lru_cache(maxsize=1024)
+def get_statement_shape(statement: str) -> str:
+    """
+    Normalizes SQL so that statements differing only by literals, by the length of IN (...) lists
+    or by the number of rows of a multi-row VALUES share one shape.
+    """
+    shape = _whitespace_re.sub(" ", statement).strip()
+    shape = _string_literal_re.sub("?", shape)
+    shape = _number_literal_re.sub("?", shape)
+    shape = _values_rows_re.sub(r"\1", shape)
+    return _placeholder_list_re.sub("(?, ...)", shape)
+
+
+class StatementStats:
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+
+    def add(self, elapsed_ms: float):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        for i, upper_bound in enumerate(HISTOGRAM_BUCKETS_MS):
+            if elapsed_ms <= upper_bound:
+                self.buckets[i] += 1
+                return
+        self.buckets[-1] += 1
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound of the bucket holding the given fraction of calls."""
+        threshold = self.count * fraction
+        seen = 0
+        for i, bucket_count in enumerate(self.buckets[:-1]):
+            seen += bucket_count
+            if seen >= threshold:
+                return min(HISTOGRAM_BUCKETS_MS[i], self.max_ms)
+        return self.max_ms
+
+
+class SQLStatistics:
+    _stats: dict[str, StatementStats] = {}
+    _started_at: float = time.time()
+    # Telegram updates seen by DBSessionMiddleware and how many of them checked out a database connection.
+    _updates_count: int = 0
+    _db_updates_count: int = 0
+    logger = logging.getLogger("sql.slow_query")
+
+    @staticmethod
+    def register(engine: Engine) -> None:
+        event.listen(engine, "before_cursor_execute", SQLStatistics._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", SQLStatistics._after_cursor_execute)
+        event.listen(engine, "handle_error", SQLStatistics._handle_error)
+
+    @staticmethod
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @staticmethod
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - conn.info["query_start_time"].pop()) * 1000
+        shape = get_statement_shape(statement)
+        stats = SQLStatistics._stats.get(shape)
+        if stats is None:
+            key = shape if len(SQLStatistics._stats) < MAX_SHAPES else OTHER_SHAPES
+            stats = SQLStatistics._stats.setdefault(key, StatementStats())
+        stats.add(elapsed_ms)
+        if (elapsed_ms >= config.DB_SLOW_QUERY_THRESHOLD_MS
+                and random.random() < config.DB_SLOW_QUERY_SAMPLE_RATE):
+            SQLStatistics.logger.warning("Slow query (%.1f ms): %s", elapsed_ms, shape)
+
+    @staticmethod
+    def _handle_error(exception_context):
+        # A failed statement never reaches after_cursor_execute, its start time would stay on the pooled connection.
+        connection = exception_context.connection
+        if connection is not None and exception_context.execution_context is not None:
+            start_times = connection.info.get("query_start_time")
+            if start_times:
+                start_times.pop()
+
+    @staticmethod
+    def count_update(used_db: bool) -> None:
+        SQLStatistics._updates_count += 1
+        if used_db:
+            SQLStatistics._db_updates_count += 1
+
+    @staticmethod
+    def get_summary(limit: int = 10, shape_length: int = 200) -> str:
+        """Top statement shapes by total time, formatted as HTML for a Telegram message."""
+        stats = sorted(SQLStatistics._stats.items(), key=lambda shape_stats: shape_stats[1].total_ms,
+                       reverse=True)
+        total_count = sum(statement_stats.count for _, statement_stats in stats)
+        total_ms = sum(statement_stats.total_ms for _, statement_stats in stats)
+        uptime_minutes = (time.time() - SQLStatistics._started_at) / 60
+        summary = (f"<b>{total_count} statements, {len(stats)} shapes, {total_ms:.0f} ms total "
+                   f"in {uptime_minutes:.0f} min</b>\n"
+                   f"<b>{SQLStatistics._db_updates_count} of {SQLStatistics._updates_count} updates "
+                   f"used the database</b>\n\n")
+        for shape, statement_stats in stats[:limit]:
+            if len(shape) > shape_length:
+                shape = shape[:shape_length] + "..."
+            summary += (f"<b>{statement_stats.count}x, total {statement_stats.total_ms:.0f} ms, "
+                        f"avg {statement_stats.total_ms / statement_stats.count:.1f} ms, "
+                        f"p95 ≤{statement_stats.percentile(0.95):.0f} ms, "
+                        f"max {statement_stats.max_ms:.1f} ms</b>\n"
+                        f"<code>{html.escape(shape)}</code>\n\n")
+        return summary
@@ -0,0 +1,51 @@
+from redis.asyncio import Redis
+
+import config
+from models.user import UserDTO
+
+
+class UserCache:
+    """
+    Short-lived copies of users in Redis keyed by telegram id, so most updates find their user without a query.
+    The copies are deleted after the transaction that changed the user is committed, the TTL bounds
+    how long a copy read by a concurrent update right before that commit stays stale.
+    Balances and the seed are never written to Redis, users from the cache have them set to None.
+    """
+    # A stale balance could let a checkout pass its pre-check, the money fields are always read from the database.
+    UNCACHED_FIELDS = {"top_up_amount", "consume_records", "btc_balance", "ltc_balance", "sol_balance",
+                       "usdt_trc20_balance", "usdt_erc20_balance", "usdc_erc20_balance", "last_balance_refresh",
+                       "seed"}
+    _redis: Redis | None = None
+
+    @staticmethod
+    def init(redis: Redis):
+        UserCache._redis = redis
+
+    @staticmethod
+    def __is_enabled() -> bool:
+        return UserCache._redis is not None and config.USER_CACHE_TTL_SECONDS > 0
+
+    @staticmethod
+    def __key(telegram_id: int) -> str:
+        return f"user:{telegram_id}"
+
+    @staticmethod
+    async def get(telegram_id: int) -> UserDTO | None:
+        if not UserCache.__is_enabled():
+            return None
+        user = await UserCache._redis.get(UserCache.__key(telegram_id))
+        if user is None:
+            return None
+        return UserDTO.model_validate_json(user)
+
+    @staticmethod
+    async def set(user_dto: UserDTO):
+        if UserCache.__is_enabled():
+            await UserCache._redis.set(UserCache.__key(user_dto.telegram_id),
+                                       user_dto.model_dump_json(exclude=UserCache.UNCACHED_FIELDS),
+                                       ex=config.USER_CACHE_TTL_SECONDS)
+
+    @staticmethod
+    async def delete(telegram_id_list: list[int]):
+        if UserCache.__is_enabled() and telegram_id_list:
+            await UserCache._redis.delete(*[UserCache.__key(telegram_id) for telegram_id in telegram_id_list])